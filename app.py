@@ -1,16 +1,46 @@
 import dash
-from dash import Dash, html, dcc, Input, Output, State, callback_context
+from dash import Dash, html, dcc, Input, Output, State, Patch, callback_context
 import dash_bootstrap_components as dbc
 import pandas as pd
+import glob
+import hmac
+import json
 import os
-from flask import Flask
+import signal
+import importlib.util
+import time
+import uuid
+from flask import Flask, Response, request, abort, jsonify, send_from_directory, stream_with_context
 
 # Import components and pages
 from components.sidebar import create_sidebar, create_navbar
-from components.filters import create_filter_section, apply_filters
-from pages.overview import create_overview_layout
-from pages.customer_details import create_customer_details_layout, create_customer_detail_card
-from pages.analytics import create_analytics_layout
+from components.filters import create_filter_section, filter_option_list, FILTER_DROPDOWNS
+from components.table_query import query_table
+from components.search import create_search_bar, create_search_results
+from pages.overview import create_overview_layout, overview_kpis, OVERVIEW_FIGURES
+from pages.customer_details import (
+    create_customer_details_layout, create_customer_detail_card, create_table_page, lookup_options,
+)
+from pages.analytics import (
+    create_analytics_layout, create_leaderboard, create_leaderboard_placeholder, analytics_stats, analytics_insights,
+    ANALYTICS_FIGURES,
+)
+from data.loader import source_columns, to_records
+from data.snapshot import SNAPSHOT_DIR
+from data.dataset import DatasetManager, BACKENDS
+from data.name_index import NAME_FIELDS
+from data.filter_cache import FilterCache
+from data.leaderboard import LEADERBOARD_METRICS, LEADERBOARD_SIZES, top_k
+from data.sampling import AGGREGATE_MODES
+from data.filter_state import (
+    STORE_MODES, make_filter_spec, filter_key, make_store_handle, decode_ids,
+    decode_store_handle, spec_from_key,
+)
+from data.export import EXPORT_FORMATS, EXPORT_WRITERS, write_export
+from monitoring.metrics import CallbackMetrics, instrument_callbacks
+from monitoring.timing import init_request_timing, phase
+from web.http_cache import init_http_caching
+from web.jobs import JOB_DIR, JobSlots, create_job_manager, job_callback
 
 # Create Flask server first
 server = Flask(__name__)
@@ -35,39 +65,305 @@ app = Dash(
     eager_loading=True
 )
 
-# Add minimal headers - let Chrome decide
-@server.after_request
-def add_security_headers(response):
-    # Disable caching to ensure fresh content
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
-    return response
-
 # Expose server for Gunicorn
 server = app.server
 
+# Long-lived caching for fingerprinted bundles/assets, ETags for layout and
+# dependencies, no-store for callbacks; compressed JSON/JS/CSS responses
+init_http_caching(app)
+
+# Server-Timing headers per phase, plus a JSON log line for callbacks slower than SLOW_REQUEST_MS
+init_request_timing(server, slow_threshold_ms=float(os.getenv('SLOW_REQUEST_MS', 500)))
+
+# Per-callback latency / payload / error metrics and background job durations.
+# With METRICS_DIR set (shared by all gunicorn workers, required for job metrics)
+# /metrics reports the totals across workers.
+callback_metrics = CallbackMetrics(directory=os.getenv('METRICS_DIR') or None)
+
 # Load data
-data_path = os.path.join('data', 'customers.csv')
-if os.path.exists(data_path):
-    df = pd.read_csv(data_path)
-else:
+data_path = os.getenv('CUSTOMER_DATA_PATH', os.path.join('data', 'customers.csv'))
+if not os.path.exists(data_path):
     # Generate sample data if CSV doesn't exist
     print("Generating sample data...")
     from data.data_generator import generate_customer_data
-    df = generate_customer_data(30)
-    os.makedirs('data', exist_ok=True)
-    df.to_csv(data_path, index=False)
+    os.makedirs(os.path.dirname(data_path) or '.', exist_ok=True)
+    generate_customer_data(30).to_csv(data_path, index=False)
     print(f"Sample data saved to {data_path}")
 
-# Store original data
-original_df = df.copy()
+# Filtered row positions keyed by normalized filter state and dataset version
+filter_cache = FilterCache(
+    maxsize=int(os.getenv('FILTER_CACHE_SIZE', 256)),
+    ttl=float(os.getenv('FILTER_CACHE_TTL', 900)),
+)
+
+# Page aggregates (CubeSlice) per store payload, shared by the per-component callbacks
+summary_cache = FilterCache(
+    maxsize=int(os.getenv('FILTER_CACHE_SIZE', 256)),
+    ttl=float(os.getenv('FILTER_CACHE_TTL', 900)),
+)
+
+# Filter dropdown match counts per filter state (facet index popcounts)
+option_count_cache = FilterCache(
+    maxsize=int(os.getenv('FILTER_CACHE_SIZE', 256)),
+    ttl=float(os.getenv('FILTER_CACHE_TTL', 900)),
+)
+
+# Top customers per filter state and leaderboard metric
+leaderboard_cache = FilterCache(
+    maxsize=int(os.getenv('FILTER_CACHE_SIZE', 256)),
+    ttl=float(os.getenv('FILTER_CACHE_TTL', 900)),
+)
+
+# Sample rows and estimated aggregates per filter state (AGGREGATE_MODE=approximate)
+sample_cache = FilterCache(
+    maxsize=int(os.getenv('FILTER_CACHE_SIZE', 256)),
+    ttl=float(os.getenv('FILTER_CACHE_TTL', 900)),
+)
+
+# Rendered overview / analytics pages per page and store payload, so navigating
+# back to a page under the same filters skips the render job
+page_layout_cache = FilterCache(
+    maxsize=int(os.getenv('PAGE_CACHE_SIZE', 16)),
+    ttl=float(os.getenv('FILTER_CACHE_TTL', 900)),
+)
+
+# Exact page payloads (AGGREGATE_MODE=approximate) per page and store payload;
+# exact-page-store only references one, each component reads its own value here
+exact_page_cache = FilterCache(
+    maxsize=int(os.getenv('EXACT_PAGE_CACHE_SIZE', 16)),
+    ttl=float(os.getenv('FILTER_CACHE_TTL', 900)),
+)
+
+# Filter states re-computed for a new dataset version before it is swapped in
+RELOAD_WARM_KEYS = 32
+
+# filtered-data-store holds a filter token (default) or a compressed Sr_No list,
+# never the rows themselves
+store_mode = os.getenv('FILTER_STORE_MODE', 'token')
+if store_mode not in STORE_MODES:
+    raise ValueError(f"FILTER_STORE_MODE must be one of {STORE_MODES}, got {store_mode!r}")
+
+def filtered_rows(spec, dataset=None):
+    """Row positions matching a filter spec (served from the filter cache when possible)"""
+    dataset = dataset or datasets.current
+    with phase('filter'):
+        return filter_cache.get_or_compute(
+            filter_key(spec),
+            dataset.version,
+            lambda: dataset.select(spec),
+        )
+
+def make_store_data(spec):
+    """filtered-data-store payload for a filter spec in the configured store mode"""
+    if store_mode == 'ids':
+        dataset = datasets.current
+        ids = dataset.df['Sr_No'].to_numpy()[filtered_rows(spec, dataset)]
+        return make_store_handle(spec, mode='ids', ids=ids)
+    return make_store_handle(spec)
+
+def resolve_store_data(store_data, dataset=None):
+    """Row positions referenced by a filtered-data-store payload"""
+    dataset = dataset or datasets.current
+    if not store_data:
+        return filtered_rows(make_filter_spec(), dataset)
+    if store_data.get('mode') == 'ids':
+        with phase('filter'):
+            positions = dataset.sr_no_index.get_indexer(decode_ids(store_data['ids']))
+            return positions[positions >= 0]
+    return filtered_rows(store_data.get('filters') or {}, dataset)
+
+def store_filter_spec(store_data):
+    """Filter spec carried by a store payload (None for 'ids' handles)"""
+    if not store_data:
+        return make_filter_spec()
+    if store_data.get('mode') == 'ids':
+        return None
+    return store_data.get('filters') or {}
+
+def store_cache_key(store_data):
+    """Cache key for a store payload: its filter key, or its Sr_No list for 'ids' handles"""
+    spec = store_filter_spec(store_data)
+    return filter_key(spec) if spec is not None else ('ids', store_data['ids'])
+
+def page_summary(store_data, dataset=None, approximate=False):
+    """Aggregates for a store payload, without building its row frame
+
+    Every page component callback resolves the same payload, so the summary is
+    cached; it only costs a cube slice, a SQL aggregation (DATA_BACKEND=sqlite)
+    or a roll-up of the rows once per filter. With ``approximate`` (and a
+    sampled dataset) it is a SampleSlice.
+    """
+    return page_data(store_data, dataset, approximate, frame=False)[1]
+
+def page_data(store_data, dataset=None, approximate=False, frame=True):
+    """Filtered rows and their aggregates (see page_summary) for a store payload
+
+    With ``approximate`` (and a sampled dataset) they are the matching sample
+    rows and a SampleSlice. With ``frame=False`` the rows are None.
+    """
+    dataset = dataset or datasets.current
+    if approximate and dataset.sample is not None:
+        spec = store_filter_spec(store_data)
+        # Resolved outside the aggregate phase, so filter time is not counted twice
+        rows = None if spec is not None else resolve_store_data(store_data, dataset)
+        with phase('aggregate'):
+            return sample_cache.get_or_compute(
+                store_cache_key(store_data),
+                dataset.version,
+                lambda: dataset.estimate(spec, rows),
+            )
+    rows = resolve_store_data(store_data, dataset)
+    spec = store_filter_spec(store_data)
+    with phase('aggregate'):
+        summary = summary_cache.get_or_compute(
+            store_cache_key(store_data),
+            dataset.version,
+            lambda: dataset.summarize(spec, rows),
+        )
+    return (dataset.df.iloc[rows] if frame else None), summary
+
+def worker_warm_keys(version):
+    """Filter keys the gunicorn workers used most recently for ``version``, newest first
+
+    Files written for other versions are left over from earlier reloads and
+    are removed.
+    """
+    states = []
+    for path in glob.glob(os.path.join(warm_keys_dir, '*.json')):
+        try:
+            with open(path) as fh:
+                state = json.load(fh)
+            if state['version'] != version:
+                os.remove(path)
+                continue
+            states.append((os.path.getmtime(path), state['keys']))
+        except (OSError, ValueError):
+            continue  # Worker replaced its file mid-read
+    ordered = sorted(states, key=lambda state: state[0], reverse=True)
+    keys = [filter_key(spec_from_key(key)) for _, worker_keys in ordered for key in worker_keys]
+    return list(dict.fromkeys(keys))
+
+def warm_caches(old, new):
+    """Recompute the most recently used filter states for a dataset about to be swapped in
+
+    A preloaded gunicorn master serves no requests itself: it warms the states
+    its workers persisted, and the replacement workers it forks next inherit
+    the warm caches.
+    """
+    if reload_in_master:
+        keys = summary_keys = worker_warm_keys(old.version)[:RELOAD_WARM_KEYS]
+    else:
+        keys = filter_cache.recent_keys(old.version, RELOAD_WARM_KEYS)
+        summary_keys = summary_cache.recent_keys(old.version, RELOAD_WARM_KEYS)
+    for key in keys:
+        filtered_rows(spec_from_key(key), new)
+    for key in summary_keys:
+        if key[0] != 'ids':  # Sr_No lists are tied to the rows of the old version
+            page_summary(make_store_handle(spec_from_key(key)), new)
+
+def drop_stale_cache_entries(old, new):
+    filter_cache.retain_version(new.version)
+    summary_cache.retain_version(new.version)
+    option_count_cache.retain_version(new.version)
+    leaderboard_cache.retain_version(new.version)
+    sample_cache.retain_version(new.version)
+    exact_page_cache.retain_version(new.version)
+    page_layout_cache.retain_version(new.version)
+
+# Typed, categorical frame with Region / HQ_City / License_Tokens precomputed,
+# plus its facet index and aggregate cube. The CSV is parsed once per content
+# hash into an Arrow snapshot; later boots memory-map the snapshot. The file
+# hash is the dataset version. Callbacks take one reference to the current
+# dataset per request; a changed file is rebuilt in the background and swapped in.
+# DATA_BACKEND=sqlite answers filters and aggregates from an indexed SQLite copy instead.
+data_backend = os.getenv('DATA_BACKEND', 'pandas')
+if data_backend not in BACKENDS:
+    raise ValueError(f"DATA_BACKEND must be one of {BACKENDS}, got {data_backend!r}")
+# LOOKUP_FIELDS (comma-separated) are the columns the customer typeahead searches
+lookup_fields = tuple(
+    field.strip() for field in os.getenv('LOOKUP_FIELDS', ','.join(NAME_FIELDS)).split(',') if field.strip()
+)
+# AGGREGATE_MODE=approximate renders KPIs and charts from a stratified sample of
+# about APPROX_SAMPLE_ROWS rows (with 95% confidence intervals), then swaps in the
+# exact values computed by a background job once the filters stop changing for
+# APPROX_SETTLE_SECONDS. Datasets no larger than the sample stay exact.
+aggregate_mode = os.getenv('AGGREGATE_MODE', 'exact')
+if aggregate_mode not in AGGREGATE_MODES:
+    raise ValueError(f"AGGREGATE_MODE must be one of {AGGREGATE_MODES}, got {aggregate_mode!r}")
+APPROX_SAMPLE_ROWS = int(os.getenv('APPROX_SAMPLE_ROWS', 200000))
+APPROX_SETTLE_SECONDS = float(os.getenv('APPROX_SETTLE_SECONDS', 1.5))
+datasets = DatasetManager(
+    data_path,
+    snapshot_dir=os.getenv('DATA_SNAPSHOT_DIR', SNAPSHOT_DIR),
+    prepare=[warm_caches],
+    on_swap=[drop_stale_cache_entries],
+    backend=data_backend,
+    name_fields=lookup_fields,
+    sample_rows=APPROX_SAMPLE_ROWS if aggregate_mode == 'approximate' else 0,
+)
+# Under a preloaded gunicorn master (DATA_RELOAD_MODE=master, set by
+# gunicorn.conf.py) the master watches and reloads; workers only serve
+reload_in_master = os.getenv('DATA_RELOAD_MODE') == 'master'
+if not reload_in_master:
+    datasets.watch(float(os.getenv('DATA_WATCH_INTERVAL', 60)))
+
+# Suggestions listed by the customer typeahead
+CUSTOMER_LOOKUP_LIMIT = 10
+
+# Page renders and exports run as background jobs (with dash[diskcache] installed)
+# in processes forked from the worker, so they never hold a request thread;
+# at most JOB_CONCURRENCY of them run at once across all workers
+job_dir = os.getenv('JOB_DIR', JOB_DIR)
+job_manager = create_job_manager(job_dir)
+job_slots = JobSlots(job_dir, int(os.getenv('JOB_CONCURRENCY', 2)))
+
+# Under a preloaded gunicorn master, each worker writes its most recently used
+# filter states here at most every WARM_KEYS_INTERVAL seconds, for the master
+# to warm on its next reload (see warm_caches)
+warm_keys_dir = os.path.join(job_dir, 'warm-keys')
+WARM_KEYS_INTERVAL = 10
+_warm_keys_written = {'at': 0.0}
+
+@server.after_request
+def persist_warm_keys(response):
+    if reload_in_master and time.monotonic() - _warm_keys_written['at'] >= WARM_KEYS_INTERVAL:
+        _warm_keys_written['at'] = time.monotonic()
+        version = datasets.current.version
+        keys = filter_cache.recent_keys(version, RELOAD_WARM_KEYS)
+        if keys:
+            os.makedirs(warm_keys_dir, exist_ok=True)
+            path = os.path.join(warm_keys_dir, f'{os.getpid()}.json')
+            with open(f'{path}.tmp', 'w') as fh:
+                json.dump({'version': version, 'keys': keys}, fh)
+            os.replace(f'{path}.tmp', path)
+    return response
+
+# Finished export files, downloadable for EXPORT_FILE_TTL seconds
+export_dir = os.path.join(job_dir, 'exports')
+os.makedirs(export_dir, exist_ok=True)
+EXPORT_FILE_TTL = 3600
+
+def create_empty_alert():
+    return dbc.Alert(
+        [
+            html.I(className="bi bi-exclamation-triangle-fill me-2"),
+            "No customers match the selected filters. Please adjust your filter criteria."
+        ],
+        color="warning",
+        className="m-4"
+    )
 
 # Define the app layout - HORIZONTAL FILTERS
 app.layout = html.Div(
     [
         dcc.Location(id='url', refresh=False),
-        dcc.Store(id='filtered-data-store', data=df.to_dict('records')),
+        # A token handle stays valid across reloads (an 'ids' list would pin the boot-time
+        # rows); update_filtered_data replaces it with the configured mode on load
+        dcc.Store(id='filtered-data-store', data=make_store_handle(make_filter_spec())),
+        # Page rendered by display_page, and the exact aggregates computed after it (approximate mode)
+        dcc.Store(id='page-render-store'),
+        dcc.Store(id='page-job-store'),
+        dcc.Store(id='exact-page-store'),
 
         # Navbar for mobile
         html.Div(
@@ -101,8 +397,20 @@ app.layout = html.Div(
                                     }),
                             className="main-heading-container"
                         ),
+                        # Global full-text search (combined with the active filters)
+                        create_search_bar(),
                         # Horizontal filters at top (conditionally rendered per page)
                         html.Div(id='filters-container'),
+                        # Empty-result notice (updated on every filter change)
+                        html.Div(id='page-alert'),
+                        # Notice while KPIs and charts show sample estimates (approximate mode)
+                        html.Div(id='aggregate-status', className="px-3"),
+                        # Page render progress (shown while a render job runs)
+                        html.Div(
+                            dbc.Progress(id='page-progress', value=0, striped=True, animated=True, className="m-4"),
+                            id='page-progress-container',
+                            style={'display': 'none'}
+                        ),
                         # Page content below filters
                         html.Div(id='page-content', className="content-area")
                     ],
@@ -136,12 +444,54 @@ def update_filters_visibility(pathname):
     if pathname == '/customers':
         return html.Div()  # Empty div - no filters on Customer Details page
     else:
-        # Show filters on Overview and Analytics pages
+        # Show filters on Overview and Analytics pages; the options and their
+        # unfiltered counts are computed once per dataset version
+        dataset = datasets.current
         return html.Div(
-            create_filter_section(original_df),
+            create_filter_section(dataset.filter_options, dataset.option_totals),
             className="filters-section-horizontal"
         )
 
+# Callback for the live match count next to every filter option
+@app.callback(
+    [Output(dropdown_id, 'options') for dropdown_id in FILTER_DROPDOWNS.values()],
+    [Input(dropdown_id, 'value') for dropdown_id in FILTER_DROPDOWNS.values()]
+    + [Input('filter-opt-potential', 'value'), Input('exact-page-store', 'data')],
+    prevent_initial_call=True
+)
+def update_filter_options(industries, clouds, regions, opt_types, licenses, opt_range, exact):
+    # Each facet's counts apply the other facets' selections, not its own
+    dataset = datasets.current
+    spec = make_filter_spec(industries, clouds, regions, opt_types, licenses, opt_range)
+    approximate = approximate_aggregates(dataset)
+    if callback_context.triggered_id == 'exact-page-store':
+        # Exact counts computed once the filters settled (approximate mode)
+        if exact and store_cache_key(exact['store']) == filter_key(spec):
+            exact = current_exact(exact, exact['store'], dataset)
+        else:
+            exact = None
+        if exact is None or exact['option_counts'] is None:
+            return [dash.no_update] * len(FILTER_DROPDOWNS)
+        counts, approximate = exact['option_counts'], False
+    elif approximate:
+        with phase('aggregate'):
+            counts = option_count_cache.get_or_compute(
+                ('estimate', filter_key(spec)),
+                dataset.version,
+                lambda: dataset.estimate_option_counts(spec),
+            )
+    else:
+        with phase('filter'):
+            counts = option_count_cache.get_or_compute(
+                filter_key(spec),
+                dataset.version,
+                lambda: dataset.option_counts(spec),
+            )
+    return [
+        filter_option_list(dataset.filter_options[facet], counts[facet], spec[facet], approximate)
+        for facet in FILTER_DROPDOWNS
+    ]
+
 # Callback for filtering data
 @app.callback(
     Output('filtered-data-store', 'data'),
@@ -161,50 +511,392 @@ def update_filtered_data(industries, clouds, regions, opt_types, licenses, opt_r
 
     # Check if reset button was clicked
     if ctx.triggered and ctx.triggered[0]['prop_id'] == 'reset-filters-btn.n_clicks':
-        return original_df.to_dict('records')
+        return make_store_data(make_filter_spec())
+
+    # Store a compact handle; rows are resolved server-side (and cached) on use
+    spec = make_filter_spec(industries, clouds, regions, opt_types, licenses, opt_range)
+    return make_store_data(spec)
 
-    # Apply filters
-    filtered_df = apply_filters(original_df, industries, clouds, regions, opt_types, licenses, opt_range)
+def share_job_result(name, cache, key, version, value):
+    """Store a job's result in ``cache`` for later requests
 
-    return filtered_df.to_dict('records')
+    A background job runs in a process forked from the worker, so the value
+    also goes to the job manager's disk cache (under ``name``), which every
+    worker can read.
+    """
+    cache.put(key, version, value)
+    if job_manager is not None:
+        job_manager.handle.set((name, version, key), value, expire=cache.ttl)
 
-# Callback for page routing and content - OPTIMIZED
+def shared_job_result(name, cache, key, version):
+    """A value stored by share_job_result, or None once it has expired"""
+    value = cache.get(key, version)
+    if value is None and job_manager is not None:
+        value = job_manager.handle.get((name, version, key))
+        if value is not None:
+            cache.put(key, version, value)
+    return value
+
+# Callback for page routing - renders the page shell once per navigation;
+# filter changes are applied by the per-component callbacks below. The
+# customer table shell and pages rendered before under the same filters are
+# served in the request; other pages are rendered by render_page.
 @app.callback(
-    Output('page-content', 'children'),
-    [
-        Input('url', 'pathname'),
-        Input('filtered-data-store', 'data')
-    ],
+    [Output('page-content', 'children'), Output('page-render-store', 'data'), Output('page-job-store', 'data')],
+    [Input('url', 'pathname')],
+    [State('filtered-data-store', 'data')],
     prevent_initial_call=False
 )
 def display_page(pathname, filtered_data):
-    # Convert stored data back to DataFrame
-    if not filtered_data:
-        filtered_data = original_df.to_dict('records')
+    dataset = datasets.current
+    rendered = {'pathname': pathname, 'store': filtered_data}
+    if pathname == '/customers':
+        # Page builders only read derived columns, so no defensive copy is needed
+        return create_customer_details_layout(dataset.df), rendered, dash.no_update
+    layout = shared_job_result(
+        'page-layout', page_layout_cache, (pathname, store_cache_key(filtered_data)), dataset.version,
+    )
+    if layout is None:
+        return dash.no_update, dash.no_update, rendered
+    return layout, rendered, dash.no_update
 
-    df = pd.DataFrame(filtered_data)
+# Renders the overview / analytics page as a background job; navigating again
+# cancels a render still in progress
+@job_callback(
+    app, job_manager,
+    [Output('page-content', 'children', allow_duplicate=True), Output('page-render-store', 'data', allow_duplicate=True)],
+    [Input('page-job-store', 'data')],
+    progress=[Output('page-progress', 'value'), Output('page-progress', 'label')],
+    running=[(Output('page-progress-container', 'style'), {'display': 'block'}, {'display': 'none'})],
+    metrics=callback_metrics,
+    prevent_initial_call=True
+)
+def render_page(set_progress, rendered):
+    with job_slots.acquire(on_wait=lambda: set_progress((0, "Waiting for a free slot..."))):
+        dataset = datasets.current
+        pathname, filtered_data = rendered['pathname'], rendered['store']
 
-    if df.empty:
-        return html.Div(
+        # Aggregates come from the cube when the filter only touches cube dimensions
+        set_progress((20, "Filtering..."))
+        approximate = approximate_aggregates(dataset)
+        df, summary = page_data(filtered_data, dataset, approximate=approximate)
+        set_progress((50, "Building charts..."))
+        if pathname == '/analytics':
+            # The leaderboard ranks the exact rows (``df`` is only a sample in approximate
+            # mode); they come with the exact values once the filters settle
+            leaderboard = create_leaderboard_placeholder() if approximate else None
+            layout = create_analytics_layout(df, summary, leaderboard)
+        else:  # Default to overview
+            layout = create_overview_layout(df, summary)
+    share_job_result(
+        'page-layout', page_layout_cache, (pathname, store_cache_key(filtered_data)), dataset.version, layout,
+    )
+    return layout, rendered
+
+# A filter change while the render job ran reached the component callbacks before
+# the page's components existed, so the page mounted with the old filter's data.
+# Re-emitting the current filters makes every component callback catch up.
+@app.callback(
+    Output('filtered-data-store', 'data', allow_duplicate=True),
+    [Input('page-render-store', 'data')],
+    [State('filtered-data-store', 'data')],
+    prevent_initial_call=True
+)
+def refresh_stale_page(rendered, filtered_data):
+    if not rendered or rendered['store'] == filtered_data:
+        return dash.no_update
+    return filtered_data
+
+def approximate_aggregates(dataset=None):
+    """Whether page aggregates are estimated from the sample first (AGGREGATE_MODE=approximate)"""
+    return aggregate_mode == 'approximate' and (dataset or datasets.current).sample is not None
+
+def exact_page_payload(pathname, filtered_data, dataset):
+    """Exact row count, filter option counts, KPI/stat values, figure data and
+    (analytics) leaderboard rows for a page"""
+    df, summary = page_data(filtered_data, dataset)
+    spec = store_filter_spec(filtered_data)
+    payload = {
+        'count': len(df),
+        'option_counts': None if spec is None else {
+            facet: counts.tolist() for facet, counts in dataset.option_counts(spec).items()
+        },
+        'values': {},
+        'figures': {},
+        'leaderboard': None,
+    }
+    if pathname == '/customers':
+        return payload
+    if pathname == '/analytics':
+        values = analytics_stats(summary)
+        values['analytics-insights'] = analytics_insights(df, summary)
+        figures = ANALYTICS_FIGURES
+        matched = resolve_store_data(filtered_data, dataset)
+        payload['leaderboard'] = {
+            metric: top_k(dataset.df[metric].to_numpy(), matched, max(LEADERBOARD_SIZES), ascending).tolist()
+            for metric, (_, ascending) in LEADERBOARD_METRICS.items()
+        }
+    else:
+        values = overview_kpis(summary)
+        figures = OVERVIEW_FIGURES
+    payload['values'] = values
+    payload['figures'] = {graph_id: build(df, summary)['data'] for graph_id, build in figures.items()}
+    return payload
+
+def current_exact(exact, filtered_data, dataset=None):
+    """The exact page payload referenced by exact-page-store, if it was computed
+    for the current filters and dataset version"""
+    dataset = dataset or datasets.current
+    if not exact or exact['store'] != filtered_data or exact['version'] != dataset.version:
+        return None
+    key = (exact['pathname'], store_cache_key(filtered_data))
+    payload = shared_job_result('exact-page', exact_page_cache, key, dataset.version)
+    if payload is None:
+        # Recomputed in the request only if the payload has already expired
+        payload = exact_page_payload(exact['pathname'], filtered_data, dataset)
+        exact_page_cache.put(key, dataset.version, payload)
+    return payload
+
+def exact_page_value(exact, filtered_data, component_id, kind='values'):
+    """A component's exact value from the exact-page-store, if it was computed for the current filters"""
+    exact = current_exact(exact, filtered_data)
+    return None if exact is None else exact[kind].get(component_id)
+
+if aggregate_mode == 'approximate':
+    # Exact aggregates for the rendered page, computed in a background job once the
+    # filters have been still for APPROX_SETTLE_SECONDS; every filter change starts
+    # a new job, which cancels the previous one (sleeping or computing)
+    @job_callback(
+        app, job_manager,
+        Output('exact-page-store', 'data'),
+        [Input('page-render-store', 'data'), Input('filtered-data-store', 'data')],
+        [State('url', 'pathname')],
+        running=[(
+            Output('aggregate-status', 'children'),
             dbc.Alert(
                 [
-                    html.I(className="bi bi-exclamation-triangle-fill me-2"),
-                    "No customers match the selected filters. Please adjust your filter criteria."
+                    html.I(className="bi bi-hourglass-split me-2"),
+                    f"Estimated from a stratified sample of about {APPROX_SAMPLE_ROWS:,} customers "
+                    "(± = 95% confidence interval). Exact values load once the filters stop changing.",
                 ],
-                color="warning",
-                className="m-4"
-            )
+                color="light", className="py-2 small",
+            ),
+            None,
+        )],
+        metrics=callback_metrics,
+        prevent_initial_call=True
+    )
+    def refine_page(set_progress, rendered, filtered_data, pathname):
+        dataset = datasets.current
+        if dataset.sample is None:
+            return dash.no_update
+        if job_manager is not None:
+            time.sleep(APPROX_SETTLE_SECONDS)
+        with job_slots.acquire():
+            payload = exact_page_payload(pathname, filtered_data, dataset)
+        share_job_result(
+            'exact-page', exact_page_cache, (pathname, store_cache_key(filtered_data)), dataset.version, payload,
         )
+        return {'pathname': pathname, 'store': filtered_data, 'version': dataset.version}
 
-    # Create a copy to avoid modifying original data
-    df_copy = df.copy()
+# Callback for the global search: BM25-ranked customers among the filtered rows
+@app.callback(
+    Output('search-results', 'children'),
+    [Input('global-search', 'value'), Input('filtered-data-store', 'data')],
+    prevent_initial_call=True
+)
+def update_search_results(query, filtered_data):
+    if not query or not query.strip():
+        return None
+    dataset = datasets.current
+    rows = resolve_store_data(filtered_data, dataset)
+    with phase('filter'):
+        ranked, scores = dataset.text_index.search(query, rows=rows)
+    return create_search_results(dataset.df, ranked, scores, query, dataset.text_index.matched_terms(query))
 
-    if pathname == '/customers':
-        return create_customer_details_layout(df_copy)
-    elif pathname == '/analytics':
-        return create_analytics_layout(df_copy)
-    else:  # Default to overview
-        return create_overview_layout(df_copy)
+@app.callback(
+    Output('page-alert', 'children'),
+    [Input('filtered-data-store', 'data'), Input('exact-page-store', 'data')],
+    prevent_initial_call=False
+)
+def update_page_alert(filtered_data, exact):
+    if approximate_aggregates():
+        # Estimated from the sample until the exact count arrives
+        exact = current_exact(exact, filtered_data)
+        if exact is not None:
+            count = exact['count']
+        elif callback_context.triggered_id == 'exact-page-store':
+            return dash.no_update
+        else:
+            count = page_summary(filtered_data, approximate=True).count()
+    else:
+        count = len(resolve_store_data(filtered_data))
+    return create_empty_alert() if count == 0 else None
+
+def register_figure_callback(graph_id, build):
+    """Patch only the trace data of one graph when the filters change
+
+    Layout (titles, styling, uirevision) stays on the client, so the browser
+    keeps the user's zoom and legend state and the response stays small.
+    """
+    @app.callback(
+        Output(graph_id, 'figure'),
+        [Input('filtered-data-store', 'data'), Input('exact-page-store', 'data')],
+        prevent_initial_call=True
+    )
+    def update_figure(filtered_data, exact):
+        if callback_context.triggered_id == 'exact-page-store':
+            data = exact_page_value(exact, filtered_data, graph_id, 'figures')
+            if data is None:
+                return dash.no_update
+        else:
+            data = build(*page_data(filtered_data, approximate=approximate_aggregates()))['data']
+        patch = Patch()
+        patch['data'] = data
+        return patch
+    return update_figure
+
+def register_text_callback(component_id, compute):
+    """Update one KPI/stat value when the filters change"""
+    @app.callback(
+        Output(component_id, 'children'),
+        [Input('filtered-data-store', 'data'), Input('exact-page-store', 'data')],
+        prevent_initial_call=True
+    )
+    def update_text(filtered_data, exact):
+        if callback_context.triggered_id == 'exact-page-store':
+            value = exact_page_value(exact, filtered_data, component_id)
+            return dash.no_update if value is None else value
+        return compute(page_summary(filtered_data, approximate=approximate_aggregates()))[component_id]
+    return update_text
+
+for graph_id, build in {**OVERVIEW_FIGURES, **ANALYTICS_FIGURES}.items():
+    register_figure_callback(graph_id, build)
+
+for component_id in overview_kpis(datasets.current.summarize(make_filter_spec(), None)):
+    register_text_callback(component_id, overview_kpis)
+
+for component_id in analytics_stats(datasets.current.summarize(make_filter_spec(), None)):
+    register_text_callback(component_id, analytics_stats)
+
+@app.callback(
+    Output('analytics-insights', 'children'),
+    [Input('filtered-data-store', 'data'), Input('exact-page-store', 'data')],
+    prevent_initial_call=True
+)
+def update_analytics_insights(filtered_data, exact):
+    if callback_context.triggered_id == 'exact-page-store':
+        value = exact_page_value(exact, filtered_data, 'analytics-insights')
+        return dash.no_update if value is None else value
+    return analytics_insights(*page_data(filtered_data, approximate=approximate_aggregates()))
+
+def leaderboard_panel(filtered_data, metric, size, dataset=None):
+    """Leaderboard table for a store payload (exact rows, also in approximate mode)"""
+    dataset = dataset or datasets.current
+    ascending = LEADERBOARD_METRICS[metric][1]
+    # Resolved outside the aggregate phase, so filter time is not counted twice
+    matched = resolve_store_data(filtered_data, dataset)
+    with phase('aggregate'):
+        rows = leaderboard_cache.get_or_compute(
+            (store_cache_key(filtered_data), metric),
+            dataset.version,
+            lambda: top_k(dataset.df[metric].to_numpy(), matched, max(LEADERBOARD_SIZES), ascending),
+        )
+    return create_leaderboard(dataset.df, rows[:size or LEADERBOARD_SIZES[0]], metric)
+
+# Callback for the analytics leaderboard: partial selection (argpartition) over the
+# filtered rows; the longest leaderboard is cached per filter and metric. In
+# approximate mode the ranking comes with the exact values once the filters settle.
+@app.callback(
+    Output('leaderboard', 'children'),
+    [
+        Input('filtered-data-store', 'data'),
+        Input('exact-page-store', 'data'),
+        Input('leaderboard-metric', 'value'),
+        Input('leaderboard-size', 'value'),
+    ],
+    prevent_initial_call=True
+)
+def update_leaderboard(filtered_data, exact, metric, size):
+    if metric not in LEADERBOARD_METRICS:
+        return dash.no_update
+    dataset = datasets.current
+    if approximate_aggregates(dataset):
+        exact = current_exact(exact, filtered_data, dataset)
+        if exact is not None and exact['leaderboard']:
+            rows = exact['leaderboard'][metric][:size or LEADERBOARD_SIZES[0]]
+            return create_leaderboard(dataset.df, rows, metric)
+        if callback_context.triggered_id == 'filtered-data-store':
+            return create_leaderboard_placeholder()
+        if callback_context.triggered_id == 'exact-page-store':
+            return dash.no_update
+    return leaderboard_panel(filtered_data, metric, size, dataset)
+
+# Callback for server-side paging, sorting and filtering of the customer table
+@app.callback(
+    [
+        Output('customer-table', 'data'),
+        Output('customer-table', 'tooltip_data'),
+        Output('customer-table', 'page_count'),
+        Output('customer-table', 'page_current'),
+        Output('customer-table-summary', 'children'),
+    ],
+    [
+        Input('customer-table', 'page_current'),
+        Input('customer-table', 'page_size'),
+        Input('customer-table', 'sort_by'),
+        Input('customer-table', 'filter_query'),
+        Input('filtered-data-store', 'data'),
+    ],
+)
+def update_customer_table(page_current, page_size, sort_by, filter_query, filtered_data):
+    ctx = callback_context
+
+    # A new filter or sort order starts again from the first page
+    if ctx.triggered and ctx.triggered[0]['prop_id'] != 'customer-table.page_current':
+        page_current = 0
+
+    dataset = datasets.current
+    df = dataset.df.iloc[resolve_store_data(filtered_data, dataset)]
+    with phase('filter'):
+        page_df, page_count, page_current, total_rows = query_table(df, page_current, page_size, sort_by, filter_query)
+    records, tooltip_data = create_table_page(page_df)
+
+    return records, tooltip_data, page_count, page_current, f"{total_rows:,} customers"
+
+# Callbacks for the customer typeahead: fuzzy-ranked names as the user types,
+# and the chosen customer's detail card
+@app.callback(
+    Output('customer-lookup', 'options'),
+    [Input('customer-lookup', 'search_value')],
+    [State('customer-lookup', 'value'), State('customer-lookup', 'options')],
+    prevent_initial_call=True
+)
+def update_customer_lookup(search_value, selected, options):
+    if not search_value or not search_value.strip():
+        return dash.no_update
+    dataset = datasets.current
+    with phase('filter'):
+        matches = dataset.name_index.lookup(search_value, limit=CUSTOMER_LOOKUP_LIMIT)
+    new_options = lookup_options(dataset.df, matches, search_value)
+    # Keep the current selection's option so its label stays visible
+    if selected is not None and all(option['value'] != selected for option in new_options):
+        new_options += [option for option in options or [] if option['value'] == selected]
+    return new_options
+
+@app.callback(
+    Output('customer-detail-cards', 'children', allow_duplicate=True),
+    [Input('customer-lookup', 'value')],
+    prevent_initial_call=True
+)
+def display_looked_up_customer(sr_no):
+    if sr_no is None:
+        return dash.no_update
+    dataset = datasets.current
+    row = dataset.sr_no_index.get_indexer([sr_no])[0]
+    if row < 0:
+        return dbc.Alert("That customer is not in the current data.", color="warning", className="mt-4")
+    return create_customer_detail_card(to_records(dataset.df.iloc[[row]]))
 
 # Callback for customer detail card (on row selection in table)
 @app.callback(
@@ -225,17 +917,110 @@ def display_customer_details(selected_rows, table_data):
     selected_data = [table_data[i] for i in selected_rows]
     return create_customer_detail_card(selected_data)
 
-# Callback for CSV export
-@app.callback(
-    Output("download-csv", "data"),
-    [Input("export-csv-btn", "n_clicks")],
-    [State('filtered-data-store', 'data')],
-    prevent_initial_call=True,
+def remove_expired_exports():
+    cutoff = time.time() - EXPORT_FILE_TTL
+    for entry in os.scandir(export_dir):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+# Export job: writes the filtered customers to a file with progress, then offers
+# the download. Changing the filters, format or columns cancels a running export.
+@job_callback(
+    app, job_manager,
+    Output('export-status', 'children'),
+    [Input('export-btn', 'n_clicks')],
+    [
+        State('filtered-data-store', 'data'),
+        State('export-format', 'value'),
+        State('export-columns', 'value'),
+    ],
+    progress=[Output('export-progress', 'value'), Output('export-progress', 'label')],
+    running=[
+        (Output('export-btn', 'disabled'), True, False),
+        (Output('export-progress-container', 'style'), {'display': 'block'}, {'display': 'none'}),
+        (Output('export-cancel-btn', 'style'), {'display': 'block'}, {'display': 'none'}),
+    ],
+    cancel=[
+        Input('export-cancel-btn', 'n_clicks'),
+        Input('filtered-data-store', 'data'),
+        Input('export-format', 'value'),
+        Input('export-columns', 'value'),
+    ],
+    metrics=callback_metrics,
+    prevent_initial_call=True
 )
-def export_to_csv(n_clicks, filtered_data):
-    if n_clicks:
-        df = pd.DataFrame(filtered_data)
-        return dcc.send_data_frame(df.to_csv, "customer_intelligence_export.csv", index=False)
+def export_job(set_progress, n_clicks, filtered_data, export_format, columns):
+    export_format = export_format or 'csv'
+    if export_format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        return dbc.Alert("Parquet export requires pyarrow.", color="danger", className="mb-3")
+
+    with job_slots.acquire(on_wait=lambda: set_progress((0, "Waiting for a free slot..."))):
+        dataset = datasets.current
+        available = source_columns(dataset.df)
+        columns = [col for col in columns or [] if col in available] or available
+        rows = resolve_store_data(filtered_data, dataset)
+
+        def report(done, total):
+            set_progress((100 * done // total, f"{done:,} / {total:,} rows"))
+
+        remove_expired_exports()
+        extension, _ = EXPORT_FORMATS[export_format]
+        name = f'{uuid.uuid4().hex}.{extension}'
+        write_export(dataset.df, rows, columns, export_format, os.path.join(export_dir, name), on_chunk=report)
+
+    return dbc.Button(
+        [html.I(className="bi bi-file-earmark-arrow-down me-2"), f"Download {len(rows):,} customers ({extension})"],
+        href=app.get_relative_path(f'/export/files/{name}'),
+        external_link=True,
+        color="success",
+        size="sm",
+        className="mb-3"
+    )
+
+# Finished export job files
+@server.route('/export/files/<name>')
+def export_file(name):
+    extension = name.partition('.')[2]
+    if extension not in {ext for ext, _ in EXPORT_FORMATS.values()}:
+        abort(404)
+    return send_from_directory(
+        os.path.abspath(export_dir), name,
+        as_attachment=True, download_name=f'customer_intelligence_export.{extension}',
+    )
+
+# Streaming export of the filtered customers (CSV, gzip CSV or Parquet)
+@server.route('/export/customers')
+def export_customers():
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        abort(400, f"Unsupported export format {export_format!r}")
+    if export_format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        abort(501, "Parquet export requires pyarrow")
+
+    handle = request.args.get('handle')
+    try:
+        store_data = decode_store_handle(handle) if handle else None
+    except ValueError:
+        abort(400, "Invalid filter handle")
+
+    dataset = datasets.current
+    available = source_columns(dataset.df)
+    columns = [col for col in request.args.get('columns', '').split(',') if col] or available
+    unknown = [col for col in columns if col not in available]
+    if unknown:
+        abort(400, f"Unknown columns: {', '.join(unknown)}")
+
+    # Rows are resolved once up front; chunks are then serialized lazily as the client reads
+    rows = resolve_store_data(store_data, dataset)
+    extension, mimetype = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(EXPORT_WRITERS[export_format](dataset.df, rows, columns)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=customer_intelligence_export.{extension}'},
+    )
 
 # Callback to reset filters
 @app.callback(
@@ -255,11 +1040,55 @@ def reset_filters(n_clicks):
         return [], [], [], [], [], [0, 50]
     return dash.no_update
 
+# Admin-triggered dataset reload (disabled unless ADMIN_TOKEN is set)
+def require_admin():
+    token = os.getenv('ADMIN_TOKEN')
+    if not token:
+        abort(404)
+    # Constant-time comparison, so response timing does not leak the token
+    supplied = request.headers.get('Authorization', '').encode('utf-8')
+    if not hmac.compare_digest(supplied, f'Bearer {token}'.encode('utf-8')):
+        abort(403)
+
+@server.route('/admin/dataset', methods=['GET'])
+def dataset_status():
+    require_admin()
+    return jsonify(datasets.status())
+
+@server.route('/admin/reload', methods=['POST'])
+def reload_dataset():
+    """Rebuild from the data file; ``?wait=1`` blocks until swapped, ``?force=1`` reloads an unchanged file
+
+    Under a preloaded gunicorn master this signals the master instead (the
+    equivalent of ``kill -HUP``), which reloads and re-forks the workers,
+    but only when the file's contents changed; ``wait`` and ``force`` do not
+    apply there.
+    """
+    require_admin()
+    if reload_in_master:
+        started = datasets.file_changed()
+        if started:
+            os.kill(os.getppid(), signal.SIGHUP)
+        return jsonify({'started': started, **datasets.status()}), 202
+    force = request.args.get('force') == '1'
+    if request.args.get('wait') == '1':
+        swapped = datasets.reload(force=force)
+        return jsonify({'swapped': swapped, **datasets.status()})
+    started = datasets.request_reload(force=force)
+    return jsonify({'started': started, **datasets.status()}), 202
+
+instrument_callbacks(app, callback_metrics)
+
+@server.route('/metrics')
+def metrics():
+    return Response(callback_metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 # Run the app
 if __name__ == '__main__':
     print("\n" + "="*60)
     print("  Customer Intelligence Dashboard")
     print("="*60)
+    df = datasets.current.df
     print(f"\n  Loaded {len(df)} customer records")
     print(f"  Industries: {df['Industry_Vertical'].nunique()}")
     print(f"  Cloud Platforms: {df['Cloud_Platforms'].nunique()}")
@@ -0,0 +1,351 @@
+"""Benchmark the filter, aggregation, layout and callback paths at several dataset sizes
+
+Each size runs in its own subprocess (fresh imports, independent peak memory):
+
+    python benchmarks/run_benchmarks.py                      # 1k, 100k, 1M rows
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 --repeat 5
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+
+Every stage is timed ``--repeat`` times without tracing (wall time min/median)
+and once more under tracemalloc (peak Python/NumPy allocation). Results are
+written as JSON so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+DEFAULT_DATA_DIR = os.path.join(ROOT, 'benchmarks', '.data')
+DEFAULT_RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+def measure(fn, repeat, setup=None):
+    """Wall time (min/median over ``repeat`` runs) and traced peak memory of ``fn()``"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'wall_s_min': round(min(times), 6),
+        'wall_s_median': round(statistics.median(times), 6),
+        'peak_mb': round(peak / 2**20, 3),
+        'repeat': repeat,
+    }
+
+def dataset_path(data_dir, rows, seed):
+    """Generate (once) and return the CSV for a dataset size"""
+    from data.data_generator import write_customer_data
+
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'customers_{rows}_{seed}.csv')
+    if not os.path.exists(path):
+        tmp_path = f'{path}.tmp'
+        write_customer_data(tmp_path, rows, seed=seed, workers=os.cpu_count() or 1)
+        os.replace(tmp_path, path)
+    return path
+
+def filter_scenarios(df):
+    """Representative filter selections, picked from the data so they always match rows"""
+    industries = df['Industry_Vertical'].value_counts().index.tolist()
+    clouds = df['Cloud_Platforms'].value_counts().index.tolist()
+    regions = df['Region'].value_counts().index.tolist()
+    return {
+        'all': {},
+        'one_industry': {'industry': industries[:1]},
+        'multi_facet_range': {
+            'industry': industries[:3],
+            'cloud': clouds[:2],
+            'region': regions[:2],
+            'opt_range': [20, 40],
+        },
+        'license_pattern': {'license': ['SAP', 'Oracle']},
+    }
+
+def dash_update(client, output, inputs, state=()):
+    """POST one callback request the way the Dash renderer does
+
+    Background callbacks answer with a job handle; the job is polled until its
+    result arrives, so the measured time covers the whole render.
+    """
+    outputs = [dict(zip(('id', 'property'), item.rsplit('.', 1))) for item in output]
+    body = {
+        'output': output[0] if len(output) == 1 else '..' + '...'.join(output) + '..',
+        'outputs': outputs[0] if len(output) == 1 else outputs,
+        'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+        'state': [{'id': i, 'property': p, 'value': v} for i, p, v in state],
+        'changedPropIds': [f'{inputs[0][0]}.{inputs[0][1]}'],
+    }
+    response = client.post('/_dash-update-component', json=body)
+    if response.status_code not in (200, 204):
+        raise RuntimeError(f"{output} -> HTTP {response.status_code}")
+    job = response.get_json() if response.status_code == 200 else None
+    if job and 'job' in job:
+        poll_url = f"/_dash-update-component?cacheKey={job['cacheKey']}&job={job['job']}"
+        while True:
+            response = client.post(poll_url, json=body)
+            if response.status_code != 200 or 'response' in response.get_json():
+                break
+            time.sleep(0.005)
+    return response
+
+def navigate(client, app, pathname, store):
+    """Open a page the way the renderer does: display_page, then render_page when
+    the page was not rendered before under these filters"""
+    response = dash_update(
+        client, ['page-content.children', 'page-render-store.data', 'page-job-store.data'],
+        [('url', 'pathname', pathname)], [('filtered-data-store', 'data', store)])
+    job_store = response.get_json()['response'].get('page-job-store')
+    if job_store:
+        # render_page's outputs are allow_duplicate ones, registered under hashed ids
+        render_key = next(key for key in app.callback_map if key.startswith('..page-content.children@'))
+        response = dash_update(
+            client, render_key.strip('.').split('...'), [('page-job-store', 'data', job_store['data'])])
+    return response
+
+def _read_summary(summary):
+    """Aggregates the overview and analytics pages read from a summary"""
+    summary.count()
+    summary.mean('Total_Optimization_Potential')
+    summary.sum('Total_Potential_Savings_M')
+    summary.nunique('industry')
+    summary.value_counts('industry')
+    summary.value_counts('cloud')
+    summary.group('industry', {'Cloud_Optimization_Potential': 'mean', 'ELO_Optimization_Potential': 'mean'})
+
+def run_size(rows, data_dir, seed, repeat):
+    """All stages for one dataset size (runs inside the worker subprocess)"""
+    import numpy as np
+    from components.charts import figure_cache
+    from components.filters import apply_filters
+    from components.table_query import query_table
+    from data.cube import AggregateCube, summarize
+    from data.facet_index import FacetIndex, FACET_COLUMNS
+    from data.filter_state import make_filter_spec, filter_args
+    from data.loader import load_customer_data
+    from data.snapshot import load_dataset
+    from data.text_index import TextIndex
+    from data.name_index import NameIndex
+    from data.leaderboard import top_k
+    from data.sampling import StratifiedSample
+    from data.sql_backend import SqliteStore, sqlite_path
+    from pages.analytics import create_analytics_layout
+    from pages.customer_details import create_customer_details_layout
+    from pages.overview import create_overview_layout
+
+    path = dataset_path(data_dir, rows, seed)
+    snapshot_dir = os.path.join(data_dir, 'snapshots')
+    results = {}
+
+    results['load_csv'] = measure(lambda: load_customer_data(path), repeat)
+    load_dataset(path, snapshot_dir=snapshot_dir)  # Writes the snapshot once
+    results['load_snapshot'] = measure(lambda: load_dataset(path, snapshot_dir=snapshot_dir), repeat)
+
+    df = load_customer_data(path)
+    results['facet_index_build'] = measure(lambda: FacetIndex(df), repeat)
+    results['cube_build'] = measure(lambda: AggregateCube.from_frame(df), repeat)
+    index = FacetIndex(df)
+    cube = AggregateCube.from_frame(df)
+
+    results['text_index_build'] = measure(lambda: TextIndex(df), repeat)
+    text_index = TextIndex(df)
+    for query in ('"data center"', 'migrat* sap', 'license audit risk'):
+        results[f'text_search[{query}]'] = measure(lambda: text_index.search(query, limit=10), repeat)
+
+    results['name_index_build'] = measure(lambda: NameIndex(df), repeat)
+    name_index = NameIndex(df)
+    for query in ('pep', 'coca cola botling', 'halliburtn company'):
+        results[f'name_lookup[{query}]'] = measure(lambda: name_index.lookup(query, limit=10), repeat)
+
+    all_rows = np.arange(len(df))
+    savings = df['Total_Potential_Savings_M'].to_numpy()
+    results['leaderboard_top_k'] = measure(lambda: top_k(savings, all_rows, 100), repeat)
+    results['leaderboard_full_sort'] = measure(lambda: all_rows[np.argsort(-savings, kind='stable')][:100], repeat)
+
+    # Approximate mode (AGGREGATE_MODE=approximate): stratified sample and estimates from it
+    sample_rows = min(200000, len(df) // 10)
+    results['sample_build'] = measure(lambda: StratifiedSample(df, sample_rows), repeat)
+    sample = StratifiedSample(df, sample_rows)
+
+    # SQLite engine (DATA_BACKEND=sqlite): same filters and aggregates as SQL queries
+    db_path = sqlite_path(path, 'bench', snapshot_dir)
+    results['sqlite_build'] = measure(lambda: SqliteStore.build(df, db_path), 1)
+    store = SqliteStore(db_path)
+
+    for name, selection in filter_scenarios(df).items():
+        spec = make_filter_spec(*filter_args(selection))
+        results[f'apply_filters[{name}]'] = measure(
+            lambda: apply_filters(df, *filter_args(spec), index=index), repeat)
+        filtered = apply_filters(df, *filter_args(spec), index=index)
+        results[f'summarize[{name}]'] = measure(lambda: summarize(cube, spec, filtered), repeat)
+        results[f'option_counts[{name}]'] = measure(
+            lambda: [index.option_counts(facet, *filter_args(spec)) for facet in FACET_COLUMNS], repeat)
+        results[f'summarize_read[{name}]'] = measure(lambda: _read_summary(summarize(cube, spec, filtered)), repeat)
+        results[f'sample_estimate[{name}]'] = measure(
+            lambda: _read_summary(sample.slice(spec, sample.select(spec))), repeat)
+        results[f'sqlite_select[{name}]'] = measure(lambda: store.select_rows(spec), repeat)
+        # The pages read a handful of aggregates per summary; time that set, not just the slice
+        results[f'sqlite_summarize[{name}]'] = measure(lambda: _read_summary(store.slice(spec)), repeat)
+        results[f'sqlite_option_counts[{name}]'] = measure(
+            lambda: [store.option_counts(facet, spec) for facet in FACET_COLUMNS], repeat)
+
+    # Layout builders on the unfiltered data, with a cold figure cache each run
+    summary = cube.slice()
+    results['overview_layout'] = measure(
+        lambda: create_overview_layout(df, summary), repeat, setup=figure_cache.clear)
+    results['analytics_layout'] = measure(
+        lambda: create_analytics_layout(df, summary), repeat, setup=figure_cache.clear)
+    results['customer_details_layout'] = measure(lambda: create_customer_details_layout(df), repeat)
+    results['table_page_sorted'] = measure(
+        lambda: query_table(df, 0, 20, [{'column_id': 'Total_Potential_Savings_M', 'direction': 'desc'}],
+                            '{Industry_Vertical} icontains "a"'),
+        repeat)
+
+    # End to end through the Flask/Dash callback endpoint
+    os.environ['CUSTOMER_DATA_PATH'] = path
+    os.environ['DATA_SNAPSHOT_DIR'] = snapshot_dir
+    start = time.perf_counter()
+    import app as dash_app
+    results['app_boot'] = {'wall_s_min': round(time.perf_counter() - start, 6), 'repeat': 1}
+    client = dash_app.server.test_client()
+
+    selection = filter_scenarios(df)['multi_facet_range']
+    filter_values = [
+        ('filter-industry', 'value', selection['industry']),
+        ('filter-cloud', 'value', selection['cloud']),
+        ('filter-region', 'value', selection['region']),
+        ('filter-optimization', 'value', []),
+        ('filter-license', 'value', []),
+        ('filter-opt-potential', 'value', selection['opt_range']),
+        ('reset-filters-btn', 'n_clicks', None),
+    ]
+    store = dash_app.make_store_data(make_filter_spec(*filter_args(selection)))
+
+    def cold():
+        figure_cache.clear()
+        dash_app.filter_cache.clear()
+        dash_app.summary_cache.clear()
+        dash_app.page_layout_cache.clear()
+        if dash_app.job_manager is not None:
+            dash_app.job_manager.handle.clear()  # Job results, including shared page layouts
+
+    callbacks = {
+        'update_filtered_data': lambda: dash_update(client, ['filtered-data-store.data'], filter_values),
+        'display_page[/]': lambda: navigate(client, dash_app.app, '/', store),
+        'display_page[/analytics]': lambda: navigate(client, dash_app.app, '/analytics', store),
+        'update_figure[chart-scatter-optimization]': lambda: dash_update(
+            client, ['chart-scatter-optimization.figure'],
+            [('filtered-data-store', 'data', store), ('exact-page-store', 'data', None)]),
+        'update_text[kpi-avg-opt-potential]': lambda: dash_update(
+            client, ['kpi-avg-opt-potential.children'],
+            [('filtered-data-store', 'data', store), ('exact-page-store', 'data', None)]),
+        'update_customer_table': lambda: dash_update(
+            client,
+            ['customer-table.data', 'customer-table.tooltip_data', 'customer-table.page_count',
+             'customer-table.page_current', 'customer-table-summary.children'],
+            [('customer-table', 'page_current', 0), ('customer-table', 'page_size', 20),
+             ('customer-table', 'sort_by', [{'column_id': 'Engagement_Score', 'direction': 'desc'}]),
+             ('customer-table', 'filter_query', ''), ('filtered-data-store', 'data', store)]),
+        'export_csv': lambda: client.get('/export/customers?format=csv').get_data(),
+    }
+    for name, call in callbacks.items():
+        results[f'callback.{name}[cold]'] = measure(call, repeat, setup=cold)
+        results[f'callback.{name}[warm]'] = measure(call, repeat)
+
+    results['process_max_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_comparison(current, baseline):
+    """Median wall-time ratio per stage against an earlier results file"""
+    for size, stages in current['results'].items():
+        previous = baseline.get('results', {}).get(size, {})
+        print(f"\n{size} rows (baseline {baseline.get('commit')} -> {current.get('commit')})")
+        for stage, values in stages.items():
+            if not isinstance(values, dict) or stage not in previous:
+                continue
+            old = previous[stage].get('wall_s_median', previous[stage].get('wall_s_min'))
+            new = values.get('wall_s_median', values.get('wall_s_min'))
+            if old and new:
+                print(f"  {stage:55s} {old:10.4f}s -> {new:10.4f}s  x{old / new:6.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Where generated datasets are cached')
+    parser.add_argument('--output', default=None, help='Results JSON (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', default=None, help='Earlier results JSON to compare against')
+    parser.add_argument('--worker-size', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_size is not None:
+        os.chdir(ROOT)
+        json.dump(run_size(args.worker_size, args.data_dir, args.seed, args.repeat), sys.stdout)
+        return
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'results': {},
+    }
+    for rows in args.sizes:
+        print(f"Benchmarking {rows} rows...", file=sys.stderr)
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker-size', str(rows),
+             '--repeat', str(args.repeat), '--seed', str(args.seed), '--data-dir', os.path.abspath(args.data_dir)],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stderr)
+            raise SystemExit(f"Benchmark for {rows} rows failed")
+        report['results'][str(rows)] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            print_comparison(report, json.load(fh))
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,14 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from monitoring.timing import phase
 
 # Standard professional color palette
 COLORS = {
@@ -26,6 +34,114 @@ COLOR_SEQUENCE = [
     COLORS['accent2'], COLORS['accent3'], COLORS['accent4'], COLORS['danger']
 ]
 
+class FigureCache:
+    """Thread-safe LRU of serialized figure JSON, bounded by total size in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            figure_json = self._entries.get(key)
+            if figure_json is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return figure_json
+
+    def put(self, key, figure_json):
+        size = len(figure_json)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= len(self._entries.pop(key))
+            self._entries[key] = figure_json
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+figure_cache = FigureCache(int(os.getenv('CHART_CACHE_MAX_BYTES', 64 * 1024 * 1024)))
+
+def _frame_digest(df, columns):
+    """Content hash of the columns a chart reads"""
+    frame = df[list(dict.fromkeys(columns))]
+    digest = hashlib.sha1()
+    digest.update(repr([(col, str(dtype)) for col, dtype in frame.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def memoize_figure(*column_params, extra_columns=()):
+    """Cache a chart builder's output keyed by its input data and parameters
+
+    ``column_params`` name the builder arguments holding column names (a name or
+    a list of names); only those columns of ``df`` (plus ``extra_columns``) are
+    hashed. The figure is cached as serialized JSON and each call returns a fresh
+    figure dict, which dcc.Graph accepts directly.
+    """
+    def decorator(builder):
+        signature = inspect.signature(builder)
+
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            df = params.pop('df')
+
+            columns = list(extra_columns)
+            for name in column_params:
+                value = params[name]
+                columns.extend(value if isinstance(value, (list, tuple)) else [value])
+
+            key = (builder.__name__, _frame_digest(df, columns), repr(sorted(params.items())))
+            with phase('figure'):
+                figure_json = figure_cache.get(key)
+                if figure_json is None:
+                    figure_json = builder(*args, **kwargs).to_json()
+                    figure_cache.put(key, figure_json)
+                return json.loads(figure_json)
+
+        wrapper.uncached = builder
+        return wrapper
+
+    return decorator
+
+def _express_frame(df, columns):
+    """Select the columns a plotly.express chart needs, with categoricals as plain values
+
+    Plotly Express groups by every declared category, which fails for categories
+    that have no rows left after filtering.
+    """
+    frame = df[list(dict.fromkeys(columns))]
+    categorical = [col for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)]
+    if categorical:
+        frame = frame.astype({col: object for col in categorical})
+    return frame
+
+@memoize_figure('x_col', 'y_col')
 def create_bar_chart(df, x_col, y_col, title, color=COLORS['primary']):
     """Create a simple bar chart with improved readability and spacing"""
     fig = go.Figure(data=[
@@ -49,6 +165,7 @@ def create_bar_chart(df, x_col, y_col, title, color=COLORS['primary']):
         xaxis_title=dict(text=x_col, font=dict(size=14, color='#212529')),
         yaxis_title=dict(text=y_col, font=dict(size=14, color='#212529')),
         template='plotly_white',
+        uirevision='filters',  # Keep zoom/legend state when callbacks swap in new data
         height=530,
         margin=dict(l=80, r=60, t=100, b=180),
         font=dict(family="Arial, sans-serif", size=12),
@@ -72,6 +189,7 @@ def create_bar_chart(df, x_col, y_col, title, color=COLORS['primary']):
 
     return fig
 
+@memoize_figure('names_col', 'values_col')
 def create_pie_chart(df, names_col, values_col, title):
     """Create a pie chart with proper legend visibility and improved readability"""
     fig = go.Figure(data=[
@@ -96,6 +214,7 @@ def create_pie_chart(df, names_col, values_col, title):
     fig.update_layout(
         title=dict(text=title, x=0.5, xanchor='center', font=dict(size=16, color='#212529')),
         template='plotly_white',
+        uirevision='filters',
         height=520,
         margin=dict(l=40, r=220, t=100, b=60),
         font=dict(family="Arial, sans-serif", size=12),
@@ -116,6 +235,7 @@ def create_pie_chart(df, names_col, values_col, title):
 
     return fig
 
+@memoize_figure('x_col', 'y_cols')
 def create_grouped_bar_chart(df, x_col, y_cols, title):
     """Create a grouped bar chart with improved spacing and readability"""
     fig = go.Figure()
@@ -142,6 +262,7 @@ def create_grouped_bar_chart(df, x_col, y_cols, title):
         yaxis_title=dict(text="Optimization Potential (%)", font=dict(size=13, color='#212529')),
         barmode='group',
         template='plotly_white',
+        uirevision='filters',
         height=620,
         margin=dict(l=80, r=60, t=100, b=240),
         font=dict(family="Arial, sans-serif", size=12),
@@ -177,6 +298,7 @@ def create_grouped_bar_chart(df, x_col, y_cols, title):
 
     return fig
 
+@memoize_figure('x_col', 'y_cols')
 def create_stacked_bar_chart(df, x_col, y_cols, title):
     """Create a stacked bar chart with proper spacing and no overlapping"""
     fig = go.Figure()
@@ -203,6 +325,7 @@ def create_stacked_bar_chart(df, x_col, y_cols, title):
         yaxis_title=dict(text="Optimization Potential (%)", font=dict(size=13, color='#212529')),
         barmode='stack',
         template='plotly_white',
+        uirevision='filters',
         height=580,
         margin=dict(l=80, r=60, t=100, b=200),
         font=dict(family="Arial, sans-serif", size=12),
@@ -238,10 +361,11 @@ def create_stacked_bar_chart(df, x_col, y_cols, title):
 
     return fig
 
+@memoize_figure('x_col', 'y_col', 'color_col', extra_columns=('Customer_Name',))
 def create_scatter_chart(df, x_col, y_col, color_col, title):
     """Create a scatter plot with proper visibility"""
     fig = px.scatter(
-        df,
+        _express_frame(df, [x_col, y_col, color_col, 'Customer_Name']),
         x=x_col,
         y=y_col,
         color=color_col,
@@ -256,6 +380,7 @@ def create_scatter_chart(df, x_col, y_col, color_col, title):
         xaxis_title=dict(text=x_col, font=dict(size=13, color='#212529')),
         yaxis_title=dict(text=y_col, font=dict(size=13, color='#212529')),
         template='plotly_white',
+        uirevision='filters',
         height=550,
         margin=dict(l=60, r=200, t=80, b=60),
         font=dict(family="Arial, sans-serif", size=12),
@@ -283,6 +408,7 @@ def create_scatter_chart(df, x_col, y_col, color_col, title):
 
     return fig
 
+@memoize_figure('x_col', 'y_col')
 def create_horizontal_bar_chart(df, x_col, y_col, title, color=COLORS['primary']):
     """Create a horizontal bar chart with improved readability and spacing"""
     fig = go.Figure(data=[
@@ -307,6 +433,7 @@ def create_horizontal_bar_chart(df, x_col, y_col, title, color=COLORS['primary']
         xaxis_title=dict(text=x_col, font=dict(size=14, color='#212529')),
         yaxis_title=dict(text=y_col, font=dict(size=14, color='#212529')),
         template='plotly_white',
+        uirevision='filters',
         height=max(550, len(df) * 42),  # Dynamic height with better spacing
         margin=dict(l=280, r=120, t=100, b=80),
         font=dict(family="Arial, sans-serif", size=12),
@@ -339,10 +466,11 @@ def create_kpi_card_data(value, title, delta=None, delta_color="green"):
         'delta_color': delta_color
     }
 
+@memoize_figure('path_cols', 'values_col')
 def create_sunburst_chart(df, path_cols, values_col, title):
     """Create a sunburst chart for hierarchical data"""
     fig = px.sunburst(
-        df,
+        _express_frame(df, path_cols + [values_col]),
         path=path_cols,
         values=values_col,
         title=title,
@@ -351,6 +479,7 @@ def create_sunburst_chart(df, path_cols, values_col, title):
 
     fig.update_layout(
         template='plotly_white',
+        uirevision='filters',
         height=500,
         margin=dict(l=40, r=40, t=60, b=40),
         font=dict(family="Arial, sans-serif", size=12),
@@ -358,6 +487,7 @@ def create_sunburst_chart(df, path_cols, values_col, title):
 
     return fig
 
+@memoize_figure('x_col', 'y_col', 'z_col')
 def create_heatmap(df, x_col, y_col, z_col, title):
     """Create a heatmap"""
     pivot_df = df.pivot(index=y_col, columns=x_col, values=z_col)
@@ -376,6 +506,7 @@ def create_heatmap(df, x_col, y_col, z_col, title):
     fig.update_layout(
         title=title,
         template='plotly_white',
+        uirevision='filters',
         height=max(400, len(pivot_df.index) * 30),
         margin=dict(l=150, r=40, t=60, b=100),
         font=dict(family="Arial, sans-serif", size=12),
@@ -384,10 +515,11 @@ def create_heatmap(df, x_col, y_col, z_col, title):
 
     return fig
 
+@memoize_figure('path_cols', 'values_col')
 def create_treemap(df, path_cols, values_col, title):
     """Create a treemap for hierarchical data"""
     fig = px.treemap(
-        df,
+        _express_frame(df, path_cols + [values_col]),
         path=path_cols,
         values=values_col,
         title=title,
@@ -397,6 +529,7 @@ def create_treemap(df, path_cols, values_col, title):
 
     fig.update_layout(
         template='plotly_white',
+        uirevision='filters',
         height=500,
         margin=dict(l=40, r=40, t=60, b=40),
         font=dict(family="Arial, sans-serif", size=12),
@@ -1,20 +1,45 @@
 import dash_bootstrap_components as dbc
 from dash import html, dcc
+from data.facet_index import FacetIndex
 
-def create_filter_section(df):
-    """Create the filter section with HORIZONTAL multi-select dropdowns"""
+# Filter facet -> dropdown component id
+FILTER_DROPDOWNS = {
+    'industry': 'filter-industry',
+    'cloud': 'filter-cloud',
+    'region': 'filter-region',
+    'optimization': 'filter-optimization',
+    'license': 'filter-license',
+}
 
-    # Extract unique values for each filter
-    industries = sorted(df['Industry_Vertical'].unique().tolist())
-    cloud_platforms = sorted(df['Cloud_Platforms'].unique().tolist())
-    regions = sorted(df['Geographical_Presence'].str.extract(r'operates across (.+)$')[0].unique().tolist())
-    opt_types = sorted(df['Optimization_Type'].unique().tolist())
+def filter_option_list(values, counts=None, selected=(), approximate=False):
+    """Dropdown options for a facet
 
-    # Extract license ecosystems (split comma-separated values)
-    all_licenses = set()
-    for licenses in df['License_Ecosystem'].dropna():
-        all_licenses.update([lic.strip() for lic in licenses.split(',')])
-    license_systems = sorted(list(all_licenses))
+    With ``counts`` (matching rows per value under the other active filters)
+    each label shows its count, and values that would match nothing are
+    disabled unless already selected. ``approximate`` counts (sample
+    estimates) are marked with ≈ and never disable a value.
+    """
+    if counts is None:
+        return [{'label': value, 'value': value} for value in values]
+    selected = set(selected or ())
+    prefix = "≈" if approximate else ""
+    return [
+        {
+            'label': f"{value} ({prefix}{int(count):,})",
+            'value': value,
+            'disabled': bool(count == 0 and value not in selected and not approximate),
+        }
+        for value, count in zip(values, counts)
+    ]
+
+def create_filter_section(options, counts=None):
+    """Create the filter section with HORIZONTAL multi-select dropdowns
+
+    ``options`` maps each facet to its sorted values (Dataset.filter_options,
+    computed once per dataset version); ``counts`` to their row counts.
+    """
+    counts = counts or {}
+    dropdown_options = {facet: filter_option_list(values, counts.get(facet)) for facet, values in options.items()}
 
     filters = html.Div(
         [
@@ -26,7 +51,7 @@ def create_filter_section(df):
                             html.Label("Industry Vertical", className="filter-label"),
                             dcc.Dropdown(
                                 id='filter-industry',
-                                options=[{'label': ind, 'value': ind} for ind in industries],
+                                options=dropdown_options['industry'],
                                 value=[],
                                 multi=True,
                                 placeholder="Select industries...",
@@ -41,7 +66,7 @@ def create_filter_section(df):
                             html.Label("Cloud Platform", className="filter-label"),
                             dcc.Dropdown(
                                 id='filter-cloud',
-                                options=[{'label': cloud, 'value': cloud} for cloud in cloud_platforms],
+                                options=dropdown_options['cloud'],
                                 value=[],
                                 multi=True,
                                 placeholder="Select cloud platforms...",
@@ -55,7 +80,7 @@ def create_filter_section(df):
                             html.Label("Geographic Region", className="filter-label"),
                             dcc.Dropdown(
                                 id='filter-region',
-                                options=[{'label': region, 'value': region} for region in regions],
+                                options=dropdown_options['region'],
                                 value=[],
                                 multi=True,
                                 placeholder="Select regions...",
@@ -69,7 +94,7 @@ def create_filter_section(df):
                             html.Label("Optimization Type", className="filter-label"),
                             dcc.Dropdown(
                                 id='filter-optimization',
-                                options=[{'label': opt, 'value': opt} for opt in opt_types],
+                                options=dropdown_options['optimization'],
                                 value=[],
                                 multi=True,
                                 placeholder="Select optimization types...",
@@ -90,7 +115,7 @@ def create_filter_section(df):
                             html.Label("License Ecosystem", className="filter-label"),
                             dcc.Dropdown(
                                 id='filter-license',
-                                options=[{'label': lic, 'value': lic} for lic in license_systems],
+                                options=dropdown_options['license'],
                                 value=[],
                                 multi=True,
                                 placeholder="Select license systems...",
@@ -137,36 +162,14 @@ def create_filter_section(df):
 
     return filters
 
-def apply_filters(df, industries, clouds, regions, opt_types, licenses, opt_range):
-    """Apply all filters to the dataframe"""
-    filtered_df = df.copy()
-
-    # Industry filter
-    if industries and len(industries) > 0:
-        filtered_df = filtered_df[filtered_df['Industry_Vertical'].isin(industries)]
-
-    # Cloud platform filter
-    if clouds and len(clouds) > 0:
-        filtered_df = filtered_df[filtered_df['Cloud_Platforms'].isin(clouds)]
-
-    # Region filter
-    if regions and len(regions) > 0:
-        filtered_df = filtered_df[filtered_df['Geographical_Presence'].str.contains('|'.join(regions), case=False, na=False)]
-
-    # Optimization type filter
-    if opt_types and len(opt_types) > 0:
-        filtered_df = filtered_df[filtered_df['Optimization_Type'].isin(opt_types)]
-
-    # License ecosystem filter (check if any of the selected licenses are in the comma-separated string)
-    if licenses and len(licenses) > 0:
-        license_pattern = '|'.join(licenses)
-        filtered_df = filtered_df[filtered_df['License_Ecosystem'].str.contains(license_pattern, case=False, na=False)]
+def apply_filters(df, industries, clouds, regions, opt_types, licenses, opt_range, index=None):
+    """Apply all filters to the dataframe
 
-    # Optimization potential range filter
-    if opt_range and len(opt_range) == 2:
-        filtered_df = filtered_df[
-            (filtered_df['Total_Optimization_Potential'] >= opt_range[0]) &
-            (filtered_df['Total_Optimization_Potential'] <= opt_range[1])
-        ]
+    Filtering is answered from a FacetIndex (bitmap OR within a facet, AND across
+    facets). Pass the index built at load time; one is built on the fly otherwise.
+    """
+    if index is None:
+        index = FacetIndex(df)
 
-    return filtered_df
+    rows = index.select(industries, clouds, regions, opt_types, licenses, opt_range)
+    return df.iloc[rows]
@@ -0,0 +1,80 @@
+import re
+import dash_bootstrap_components as dbc
+from dash import html
+from data.text_index import TEXT_FIELDS
+
+# Ranked customers listed under the search box
+SEARCH_RESULT_LIMIT = 10
+
+FIELD_LABELS = {
+    'Pain_Points': "Pain points",
+    'Trigger_Event': "Trigger event",
+    'Overview': "Overview",
+    'Product_Offering': "Product offering",
+}
+
+def create_search_bar():
+    """Global full-text search box with its (initially empty) results panel"""
+    return html.Div(
+        [
+            dbc.InputGroup(
+                [
+                    dbc.InputGroupText(html.I(className="bi bi-search")),
+                    dbc.Input(
+                        id='global-search',
+                        type='search',
+                        placeholder='Search pain points, triggers, overviews and offerings - "exact phrase", prefix*',
+                        debounce=True,
+                    ),
+                ],
+                size="sm",
+            ),
+            html.Div(id='search-results', className="mt-2"),
+        ],
+        className="px-3 mb-3"
+    )
+
+def highlight(text, terms):
+    """Text with every word in ``terms`` (lower-case index terms) wrapped in <mark>"""
+    parts = []
+    for piece in re.split(r'([A-Za-z0-9]+)', str(text)):
+        parts.append(html.Mark(piece) if piece.lower() in terms else piece)
+    return parts
+
+def create_search_results(df, rows, scores, query, terms):
+    """Card listing the best-ranked customers for a query
+
+    ``rows`` / ``scores`` are every match in rank order; only the first
+    SEARCH_RESULT_LIMIT are shown, each with the fields the query matched.
+    """
+    if len(rows) == 0:
+        return dbc.Alert(f"No customers match {query} under the current filters.", color="light", className="mb-0")
+
+    top = df.iloc[rows[:SEARCH_RESULT_LIMIT]]
+    items = []
+    for (_, customer), score in zip(top.iterrows(), scores[:SEARCH_RESULT_LIMIT]):
+        snippets = [
+            html.Div([html.Strong(f"{FIELD_LABELS[field]}: "), *highlight(customer[field], terms)], className="small")
+            for field in TEXT_FIELDS
+            if field in customer and terms & set(re.findall(r'[a-z0-9]+', str(customer[field]).lower()))
+        ]
+        items.append(dbc.ListGroupItem(
+            [
+                html.Div(
+                    [
+                        html.Strong(customer['Customer_Name']),
+                        html.Span(f" - {customer['Industry_Vertical']}", className="text-muted"),
+                        dbc.Badge(f"{score:.2f}", color="secondary", className="ms-2", title="BM25 score"),
+                    ]
+                ),
+                *snippets,
+            ]
+        ))
+
+    return dbc.Card(
+        [
+            dbc.CardHeader(f"{len(rows):,} customers match {query} (top {min(len(rows), SEARCH_RESULT_LIMIT)} shown)"),
+            dbc.ListGroup(items, flush=True),
+        ],
+        className="shadow-sm"
+    )
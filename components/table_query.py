@@ -0,0 +1,159 @@
+import re
+import numpy as np
+import pandas as pd
+
+# DataTable filter operators -> canonical names
+OPERATORS = {
+    'eq': 'eq', '=': 'eq',
+    'ne': 'ne', '!=': 'ne',
+    'lt': 'lt', '<': 'lt',
+    'le': 'le', '<=': 'le',
+    'gt': 'gt', '>': 'gt',
+    'ge': 'ge', '>=': 'ge',
+    'contains': 'contains',
+    'datestartswith': 'datestartswith',
+}
+
+# {column} [i|s]operator value   |   {column} is blank
+_TERM = re.compile(
+    r"""^\{(?P<column>[^}]+)\}\s*
+        (?:
+            (?P<unary>is\s+(?:blank|nil|not\s+blank|not\s+nil))
+          | (?P<case>[is]?)(?P<op>eq|ne|lt|le|gt|ge|contains|datestartswith|<=|>=|!=|=|<|>)\s*
+            (?P<value>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`(?:[^`\\]|\\.)*`|.+)
+        )\s*$""",
+    re.VERBOSE | re.IGNORECASE,
+)
+
+_SPLIT_OR = re.compile(r"""\s+(?:\|\||or)\s+(?=(?:[^"'`]|"[^"]*"|'[^']*'|`[^`]*`)*$)""", re.IGNORECASE)
+_SPLIT_AND = re.compile(r"""\s+(?:&&|and)\s+(?=(?:[^"'`]|"[^"]*"|'[^']*'|`[^`]*`)*$)""", re.IGNORECASE)
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+def parse_filter_query(filter_query):
+    """Parse DataTable filter-query syntax into OR-groups of AND-ed terms
+
+    Each term is ``(column, operator, value, case_insensitive)``. Terms that
+    cannot be parsed are skipped, like the native table ignores invalid filters.
+    """
+    groups = []
+    for group in _SPLIT_OR.split((filter_query or '').strip()):
+        terms = []
+        for part in _SPLIT_AND.split(group.strip()):
+            part = part.strip().strip('()').strip()
+            match = _TERM.match(part)
+            if not match:
+                continue
+            if match.group('unary'):
+                negate = 'not' in match.group('unary').lower()
+                terms.append((match.group('column'), 'notblank' if negate else 'blank', None, False))
+            else:
+                operator = OPERATORS[match.group('op').lower()]
+                case_insensitive = match.group('case').lower() == 'i'
+                terms.append((match.group('column'), operator, _unquote(match.group('value')), case_insensitive))
+        if terms:
+            groups.append(terms)
+    return groups
+
+def _text_predicate(values, operator, value, case_insensitive):
+    """Vectorized comparison of a string array against a filter value"""
+    values = pd.Series(values, dtype=object).fillna('').astype(str)
+    if case_insensitive:
+        values, value = values.str.lower(), value.lower()
+    if operator == 'contains':
+        return values.str.contains(value, regex=False).to_numpy()
+    if operator == 'datestartswith':
+        return values.str.startswith(value).to_numpy()
+    compare = {
+        'eq': np.equal, 'ne': np.not_equal, 'lt': np.less,
+        'le': np.less_equal, 'gt': np.greater, 'ge': np.greater_equal,
+    }[operator]
+    return compare(values.to_numpy(), value)
+
+def _term_mask(series, operator, value, case_insensitive):
+    if operator in ('blank', 'notblank'):
+        blank = series.isna().to_numpy()
+        if series.dtype == object:
+            blank |= (series.fillna('').astype(str).str.strip() == '').to_numpy()
+        return ~blank if operator == 'notblank' else blank
+
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        values = series.to_numpy()
+        if operator in ('contains', 'datestartswith'):
+            return _text_predicate(values, operator, value, case_insensitive)
+        try:
+            number = float(value)
+        except ValueError:
+            return np.zeros(len(series), dtype=bool)
+        compare = {
+            'eq': np.equal, 'ne': np.not_equal, 'lt': np.less,
+            'le': np.less_equal, 'gt': np.greater, 'ge': np.greater_equal,
+        }[operator]
+        return compare(values, number)
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Evaluate once per category, then broadcast through the codes
+        category_hits = _text_predicate(series.cat.categories.to_numpy(), operator, value, case_insensitive)
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, category_hits[codes], False)
+
+    return _text_predicate(series.to_numpy(), operator, value, case_insensitive)
+
+def filter_mask(df, filter_query):
+    """Boolean row mask for a DataTable filter query"""
+    groups = parse_filter_query(filter_query)
+    if not groups:
+        return None
+    mask = np.zeros(len(df), dtype=bool)
+    for terms in groups:
+        group_mask = np.ones(len(df), dtype=bool)
+        for column, operator, value, case_insensitive in terms:
+            if column not in df.columns:
+                continue
+            group_mask &= _term_mask(df[column], operator, value, case_insensitive)
+        mask |= group_mask
+    return mask
+
+def sort_order(df, sort_by, positions):
+    """Order of ``positions`` under a DataTable ``sort_by`` spec (stable, blanks last)"""
+    sort_by = [item for item in (sort_by or []) if item.get('column_id') in df.columns]
+    if not sort_by:
+        return None
+    columns = [item['column_id'] for item in sort_by]
+    # Only the sort columns of the remaining rows are copied
+    keys = df[columns].iloc[positions].reset_index(drop=True)
+    return keys.sort_values(
+        columns,
+        ascending=[item.get('direction', 'asc') == 'asc' for item in sort_by],
+        kind='stable',
+        na_position='last',
+    ).index.to_numpy()
+
+def query_table(df, page_current, page_size, sort_by=None, filter_query=None):
+    """Apply DataTable filtering, sorting and paging server-side
+
+    Returns ``(page_df, page_count, page_current, total_rows)`` with
+    ``page_current`` clamped to the available pages; only the visible page is
+    materialized.
+    """
+    page_size = max(int(page_size or 20), 1)
+    positions = np.arange(len(df))
+
+    mask = filter_mask(df, filter_query)
+    if mask is not None:
+        positions = positions[mask]
+
+    if sort_by:
+        order = sort_order(df, sort_by, positions)
+        if order is not None:
+            positions = positions[order]
+
+    total_rows = len(positions)
+    page_count = max((total_rows + page_size - 1) // page_size, 1)
+    page_current = min(max(int(page_current or 0), 0), page_count - 1)
+    start = page_current * page_size
+    return df.iloc[positions[start:start + page_size]], page_count, page_current, total_rows
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+from data.facet_index import pattern_matcher, PATTERN_FACETS, RANGE_COLUMN
+
+# Cube dimension -> source column
+DIMENSIONS = {
+    'industry': 'Industry_Vertical',
+    'cloud': 'Cloud_Platforms',
+    'region': 'Region',
+    'optimization': 'Optimization_Type',
+}
+
+# Opt-potential bucket dimension (integer part of Total_Optimization_Potential)
+BUCKET = 'opt_bucket'
+
+# Metrics pre-aggregated as count / sum / sum of squares
+MEASURES = [
+    'Cloud_Optimization_Potential',
+    'ELO_Optimization_Potential',
+    'Total_Optimization_Potential',
+    'Annual_IT_Spend_M',
+    'Current_Cloud_Spend_M',
+    'Current_License_Spend_M',
+    'Total_Potential_Savings_M',
+    'Monthly_Savings_K',
+]
+
+class CubeSlice:
+    """Rolled-up view of the cube cells that match a filter
+
+    Mirrors the pandas calls the pages used to run on raw rows (len, mean, sum,
+    value_counts, groupby().agg) but works on aggregated cells.
+    """
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    def count(self):
+        return int(self.cells['count'].sum())
+
+    def sum(self, measure):
+        return float(self.cells[f'{measure}__sum'].sum())
+
+    def mean(self, measure):
+        n = self.cells[f'{measure}__n'].sum()
+        return float(self.cells[f'{measure}__sum'].sum() / n) if n else float('nan')
+
+    def std(self, measure):
+        """Sample standard deviation (ddof=1), like Series.std()"""
+        n = self.cells[f'{measure}__n'].sum()
+        if n < 2:
+            return float('nan')
+        total = self.cells[f'{measure}__sum'].sum()
+        squares = self.cells[f'{measure}__sumsq'].sum()
+        return float(np.sqrt(max(squares - total * total / n, 0.0) / (n - 1)))
+
+    def nunique(self, dimension):
+        counts = self.cells.groupby(dimension, observed=True)['count'].sum()
+        return int((counts > 0).sum())
+
+    def value_counts(self, dimension):
+        """Row counts per dimension value, largest first (like Series.value_counts)"""
+        counts = self.cells.groupby(dimension, observed=True)['count'].sum()
+        counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+        return counts.rename('Count').rename_axis(DIMENSIONS.get(dimension, dimension))
+
+    def group(self, dimension, aggregations):
+        """Per-dimension-value aggregates, e.g. ``{'Cloud_Optimization_Potential': 'mean'}``
+
+        Returns a frame indexed by the dimension values, sorted like groupby().
+        """
+        columns = []
+        for measure in aggregations:
+            columns += [f'{measure}__sum', f'{measure}__n']
+        sums = self.cells.groupby(dimension, observed=True)[columns].sum()
+        sums = sums[sums[[f'{measure}__n' for measure in aggregations]].sum(axis=1) > 0]
+
+        result = pd.DataFrame(index=sums.index)
+        for measure, how in aggregations.items():
+            if how == 'sum':
+                result[measure] = sums[f'{measure}__sum']
+            elif how == 'mean':
+                result[measure] = sums[f'{measure}__sum'] / sums[f'{measure}__n']
+            else:
+                raise ValueError(f"Unsupported aggregation {how!r}")
+        return result.rename_axis(DIMENSIONS.get(dimension, dimension))
+
+class AggregateCube:
+    """Counts, sums and sums of squares over Industry x Cloud x Region x Optimization type x opt bucket
+
+    Built once per dataset. Filters on the cube dimensions and the opt-potential
+    range are answered by selecting cells, so page aggregates cost
+    O(distinct dimension combinations) instead of O(rows).
+    """
+
+    def __init__(self, cells, integral_buckets):
+        self.cells = cells
+        self.integral_buckets = integral_buckets
+
+    @classmethod
+    def from_frame(cls, df, weights=None):
+        """Cube over the rows of ``df``; with ``weights``, each row counts ``weights[i]`` times
+
+        Weighted cells (fractional counts) hold population estimates from a
+        sample, see data.sampling.
+        """
+        values = df[RANGE_COLUMN].to_numpy(dtype='float64')
+        weight = np.ones(len(df)) if weights is None else np.asarray(weights, dtype='float64')
+        frame = pd.DataFrame({dimension: df[column] for dimension, column in DIMENSIONS.items()})
+        frame[BUCKET] = np.floor(values)
+        for measure in MEASURES:
+            metric = df[measure].to_numpy(dtype='float64')
+            frame[f'{measure}__sum'] = weight * metric
+            frame[f'{measure}__sumsq'] = weight * metric * metric
+            frame[f'{measure}__n'] = weight * ~np.isnan(metric)
+        frame['count'] = weight
+
+        keys = list(DIMENSIONS) + [BUCKET]
+        cells = frame.groupby(keys, observed=True, dropna=False, sort=False).sum().reset_index()
+        if weights is None:
+            cells = cells.astype({f'{measure}__n': 'int64' for measure in MEASURES} | {'count': 'int64'})
+
+        # The range filter is exact on buckets only when every value is a whole number
+        integral_buckets = bool(np.all(values[~np.isnan(values)] == np.floor(values[~np.isnan(values)])))
+        return cls(cells, integral_buckets)
+
+    def can_answer(self, spec):
+        """Whether a filter spec only touches cube dimensions"""
+        if spec is None:
+            return True
+        if spec.get('license'):
+            return False
+        return not spec.get('opt_range') or self.integral_buckets
+
+    def slice(self, spec=None):
+        """CubeSlice for a filter spec (see data.filter_state.make_filter_spec)"""
+        cells = self.cells
+        if not spec:
+            return CubeSlice(cells)
+
+        mask = np.ones(len(cells), dtype=bool)
+        for dimension in DIMENSIONS:
+            selected = spec.get(dimension)
+            if not selected:
+                continue
+            column = cells[dimension]
+            if dimension in PATTERN_FACETS:
+                matches = pattern_matcher(selected)
+                values = [value for value in column.dropna().unique() if matches(str(value))]
+            else:
+                values = selected
+            mask &= column.isin(values).to_numpy()
+
+        opt_range = spec.get('opt_range')
+        if opt_range:
+            low, high = opt_range
+            buckets = cells[BUCKET].to_numpy()
+            mask &= (buckets >= np.ceil(low)) & (buckets <= np.floor(high))
+
+        return CubeSlice(cells[mask])
+
+def summarize(cube, spec, rows_df):
+    """CubeSlice for the current filter: rolled up from the cube when it can
+    answer the spec, otherwise aggregated from the already-filtered rows"""
+    if cube is not None and spec is not None and cube.can_answer(spec):
+        return cube.slice(spec)
+    return AggregateCube.from_frame(rows_df).slice()
@@ -1,3 +1,5 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import random
 import numpy as np
@@ -148,6 +150,27 @@ decision_makers = [
 
 phone_prefixes = ["+1 (205)", "+1 (914)", "+1 (713)", "+1 (412)", "+1 (513)", "+1 (732)", "+1 (479)", "+1 (313)"]
 
+def _product_offering(industry):
+    """Product offering text for an industry (first matching keyword wins)"""
+    if "Food & Beverage" in industry or "CPG" in industry:
+        return "Manufacturing, distribution, supply chain management, retail execution, data & analytics"
+    elif "Energy" in industry or "Oil & Gas" in industry:
+        return "Oilfield services, digital operations, subsurface software, enterprise applications"
+    elif "Manufacturing" in industry:
+        return "Manufacturing operations, smart factory systems, supply chain, ERP systems"
+    elif "Healthcare" in industry or "Pharmaceuticals" in industry:
+        return "Healthcare services, pharmaceutical R&D, medical devices, patient systems"
+    elif "Retail" in industry:
+        return "Retail operations, e-commerce, supply chain, point-of-sale systems, analytics"
+    elif "Financial" in industry or "Banking" in industry:
+        return "Financial services, trading platforms, risk management, customer banking systems"
+    elif "Technology" in industry:
+        return "Product development, cloud services, R&D systems, enterprise platforms"
+    elif "Aerospace" in industry or "Defense" in industry:
+        return "Aerospace systems, defense programs, manufacturing, supply chain"
+    else:
+        return "Enterprise operations, digital transformation, IT infrastructure, analytics"
+
 def generate_customer_data(num_customers=30):
     """Generate synthetic customer intelligence data"""
     data = []
@@ -157,24 +180,7 @@ def generate_customer_data(num_customers=30):
         hq_city, region = locations[i % len(locations)]
 
         # Generate varied product offerings based on industry
-        if "Food & Beverage" in industry or "CPG" in industry:
-            product = "Manufacturing, distribution, supply chain management, retail execution, data & analytics"
-        elif "Energy" in industry or "Oil & Gas" in industry:
-            product = "Oilfield services, digital operations, subsurface software, enterprise applications"
-        elif "Manufacturing" in industry:
-            product = "Manufacturing operations, smart factory systems, supply chain, ERP systems"
-        elif "Healthcare" in industry or "Pharmaceuticals" in industry:
-            product = "Healthcare services, pharmaceutical R&D, medical devices, patient systems"
-        elif "Retail" in industry:
-            product = "Retail operations, e-commerce, supply chain, point-of-sale systems, analytics"
-        elif "Financial" in industry or "Banking" in industry:
-            product = "Financial services, trading platforms, risk management, customer banking systems"
-        elif "Technology" in industry:
-            product = "Product development, cloud services, R&D systems, enterprise platforms"
-        elif "Aerospace" in industry or "Defense" in industry:
-            product = "Aerospace systems, defense programs, manufacturing, supply chain"
-        else:
-            product = "Enterprise operations, digital transformation, IT infrastructure, analytics"
+        product = _product_offering(industry)
 
         cloud = random.choice(cloud_platforms)
         licenses = random.choice(license_ecosystems)
@@ -337,11 +343,242 @@ def generate_customer_data(num_customers=30):
 
     return pd.DataFrame(data)
 
-if __name__ == "__main__":
-    # Generate data
-    df = generate_customer_data(30)
+# Rows generated per chunk by the vectorized generator (bounds peak memory)
+CHUNK_ROWS = 100000
+
+def _pool_array(values):
+    return np.array(values, dtype=object)
+
+def _slug(company):
+    return company.lower().replace(' ', '').replace(',', '').replace('.', '')[:20]
+
+def _join(*parts):
+    """Element-wise string concatenation of arrays/scalars (object dtype)"""
+    out = np.full(len(next(p for p in parts if not isinstance(p, str))), '', dtype=object)
+    for part in parts:
+        out = out + (part if isinstance(part, str) else part.astype(str).astype(object))
+    return out
+
+def generate_customer_chunk(start, num_rows, seed=42):
+    """Generate rows ``start .. start + num_rows - 1`` with NumPy vectorized draws
+
+    Same columns and derived-metric formulas as generate_customer_data, but
+    every random column is drawn as one array from a Generator seeded by
+    ``(seed, start)``, so a chunk is reproducible on its own no matter which
+    process builds it. Companies cycle like the loop version; after the
+    first pass names get a division suffix so they stay distinguishable.
+    """
+    rng = np.random.default_rng([seed, start])
+    n = num_rows
+    rows = np.arange(start, start + n)
+
+    # Company / location cycle with the row number
+    company_idx = rows % len(companies)
+    location_idx = rows % len(locations)
+    cycle = rows // len(companies)
+    names = _pool_array([c[0] for c in companies])[company_idx]
+    slugs = _pool_array([_slug(c[0]) for c in companies])[company_idx]
+    suffix = np.where(cycle > 0, _join(' (Division ', cycle + 1, ')'), '')
+    slug_suffix = np.where(cycle > 0, cycle.astype(str).astype(object), '')
+    industry = _pool_array([c[2] for c in companies])[company_idx]
+
+    cloud_idx = rng.integers(0, len(cloud_platforms), n)
+    license_idx = rng.integers(0, len(license_ecosystems), n)
+    opt_idx = rng.integers(0, len(optimization_types), n)
+    cloud = _pool_array(cloud_platforms)[cloud_idx]
+    opt_type = _pool_array(optimization_types)[opt_idx]
+
+    # Optimization potential based on type
+    is_both = np.array(["Both" in t for t in optimization_types])[opt_idx]
+    is_cloud = np.array(["Cloud" in t for t in optimization_types])[opt_idx] & ~is_both
+    cloud_opt = np.select(
+        [is_both, is_cloud],
+        [rng.integers(15, 29, n), rng.integers(18, 31, n)],
+        0,
+    )
+    elo_opt = np.select(
+        [is_both, is_cloud],
+        [rng.integers(10, 21, n), 0],
+        rng.integers(12, 23, n),
+    )
+
+    prefixes = _pool_array(phone_prefixes)
+    phone = _join(prefixes[rng.integers(0, len(prefixes), n)], ' ', rng.integers(100, 1000, n), '-', rng.integers(1000, 10000, n))
+    fax = _join(prefixes[rng.integers(0, len(prefixes), n)], ' ', rng.integers(100, 1000, n), '-', rng.integers(1000, 10000, n))
+
+    # Financial metrics
+    annual_it_spend_m = rng.integers(50, 501, n)
+    current_cloud_spend_m = np.round(annual_it_spend_m * rng.uniform(0.15, 0.45, n), 2)
+    potential_cloud_savings_m = np.round(current_cloud_spend_m * (cloud_opt / 100), 2)
+    license_spend_m = np.round(annual_it_spend_m * rng.uniform(0.20, 0.40, n), 2)
+    potential_license_savings_m = np.round(license_spend_m * (elo_opt / 100), 2)
+    total_potential_savings_m = np.round(potential_cloud_savings_m + potential_license_savings_m, 2)
+
+    # Organization and license counts
+    num_employees = rng.integers(5000, 150001, n)
+    it_team_size = (num_employees * rng.uniform(0.02, 0.05, n)).astype(np.int64)
+    ms_licenses = rng.integers(5000, num_employees + 1)
+    sap_licenses = rng.integers(100, (num_employees * 0.3).astype(np.int64) + 1)
+    oracle_licenses = rng.integers(50, (num_employees * 0.2).astype(np.int64) + 1)
+
+    # Cloud resource metrics (only for the platforms in use)
+    monthly_cloud_k = np.round(current_cloud_spend_m * 1000 / 12, 1)
+    has_azure = np.array(["Azure" in c for c in cloud_platforms])[cloud_idx]
+    has_aws = np.array(["AWS" in c for c in cloud_platforms])[cloud_idx]
+    has_gcp = np.array(["GCP" in c for c in cloud_platforms])[cloud_idx]
+
+    # ROI metrics
+    implementation_cost_k = rng.integers(50, 301, n)
+    monthly_savings_k = np.round(total_potential_savings_m * 1000 / 12, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi_months = np.where(monthly_savings_k > 0, np.round(implementation_cost_k / monthly_savings_k, 1), 0.0)
+
+    return pd.DataFrame({
+        "Sr_No": rows + 1,
+        "Customer_Name": names + suffix,
+        "Overview": _pool_array([c[1] for c in companies])[company_idx],
+        "Geographical_Presence": _pool_array([f"HQ: {city}; operates across {region}" for city, region in locations])[location_idx],
+        "Product_Offering": _pool_array([_product_offering(c[2]) for c in companies])[company_idx],
+        "Industry_Vertical": industry,
+        "Cloud_Platforms": cloud,
+        "License_Ecosystem": _pool_array([", ".join(l) for l in license_ecosystems])[license_idx],
+        "Optimization_Type": opt_type,
+        "Pain_Points": _pool_array(pain_points)[rng.integers(0, len(pain_points), n)],
+        "Trigger_Event": _pool_array(trigger_events)[rng.integers(0, len(trigger_events), n)],
+        "Key_Stakeholders": _pool_array([", ".join(s) for s in stakeholders_pool])[rng.integers(0, len(stakeholders_pool), n)],
+        "Cloud_Optimization_Potential": cloud_opt,
+        "ELO_Optimization_Potential": elo_opt,
+        "Total_Optimization_Potential": cloud_opt + elo_opt,
+        "Decision_Maker": _pool_array(decision_makers)[rng.integers(0, len(decision_makers), n)],
+        "Phone": phone,
+        "Fax": fax,
+        "Email": _join("contact@", slugs, slug_suffix, ".com"),
+        "Website": _join("www.", slugs, slug_suffix, ".com"),
+
+        # Quantitative Financial Metrics (in Millions USD)
+        "Annual_IT_Spend_M": annual_it_spend_m,
+        "Current_Cloud_Spend_M": current_cloud_spend_m,
+        "Current_License_Spend_M": license_spend_m,
+        "Potential_Cloud_Savings_M": potential_cloud_savings_m,
+        "Potential_License_Savings_M": potential_license_savings_m,
+        "Total_Potential_Savings_M": total_potential_savings_m,
+
+        # Organization Metrics
+        "Number_of_Employees": num_employees,
+        "IT_Team_Size": it_team_size,
+
+        # Infrastructure Metrics
+        "Number_of_VMs": rng.integers(500, 5001, n),
+        "Physical_Servers": rng.integers(50, 801, n),
+        "Number_of_Databases": rng.integers(20, 301, n),
+        "Number_of_Applications": rng.integers(100, 1501, n),
+
+        # License Counts
+        "Microsoft_Licenses": ms_licenses,
+        "SAP_Licenses": sap_licenses,
+        "Oracle_Licenses": oracle_licenses,
+
+        # Cloud Resource Metrics
+        "Azure_VMs": np.where(has_azure, rng.integers(200, 2001, n), 0),
+        "Azure_Storage_TB": np.where(has_azure, rng.integers(50, 501, n), 0),
+        "Azure_Monthly_Spend_K": np.where(has_azure, monthly_cloud_k, 0),
+        "AWS_EC2_Instances": np.where(has_aws, rng.integers(200, 2001, n), 0),
+        "AWS_S3_Storage_TB": np.where(has_aws, rng.integers(50, 501, n), 0),
+        "AWS_Monthly_Spend_K": np.where(has_aws, monthly_cloud_k, 0),
+        "GCP_VMs": np.where(has_gcp, rng.integers(100, 1001, n), 0),
+        "GCP_Storage_TB": np.where(has_gcp, rng.integers(30, 301, n), 0),
+        "GCP_Monthly_Spend_K": np.where(has_gcp, monthly_cloud_k, 0),
+
+        # ROI Metrics (in Thousands USD)
+        "Implementation_Cost_K": implementation_cost_k,
+        "Monthly_Savings_K": monthly_savings_k,
+        "ROI_Payback_Months": roi_months,
+
+        # Engagement Metrics
+        "Last_Contact_Days_Ago": rng.integers(1, 181, n),
+        "Engagement_Score": rng.integers(1, 11, n),
+    })
+
+def _chunk_bounds(num_customers, chunk_rows):
+    return [(start, min(chunk_rows, num_customers - start)) for start in range(0, num_customers, chunk_rows)]
+
+def _build_chunk(args):
+    return generate_customer_chunk(*args)
+
+def _build_csv_chunk(args):
+    """A chunk as CSV text (with the header on the first chunk only)"""
+    start = args[0]
+    return generate_customer_chunk(*args).to_csv(index=False, header=start == 0)
+
+def iter_customer_chunks(num_customers, seed=42, chunk_rows=CHUNK_ROWS, workers=1, build=_build_chunk):
+    """Yield generated chunks in row order
+
+    ``build`` turns a ``(start, size, seed)`` task into what is yielded (a
+    DataFrame by default). With ``workers > 1`` tasks run in a process pool; at
+    most two chunks per worker are in flight, so memory stays bounded however
+    fast the consumer is. Output is identical for any worker count.
+    """
+    tasks = [(start, size, seed) for start, size in _chunk_bounds(num_customers, chunk_rows)]
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield build(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for task in tasks:
+            pending.append(pool.submit(build, task))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+def write_customer_data(path, num_customers, seed=42, chunk_rows=CHUNK_ROWS, workers=1):
+    """Stream generated customers to CSV or Parquet (chosen by extension), one chunk at a time
+
+    CSV formatting costs several times the generation itself, so with a pool
+    each worker formats its own chunk and only the text comes back; sending
+    DataFrames back to be formatted in this process made the pool slower than
+    a single process.
+    """
+    if path.endswith('.parquet'):
+        chunks = iter_customer_chunks(num_customers, seed, chunk_rows, workers)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression='snappy')
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        for text in iter_customer_chunks(num_customers, seed, chunk_rows, workers, _build_csv_chunk):
+            fh.write(text)
 
-    # Save to CSV
-    df.to_csv("customers.csv", index=False)
-    print(f"Generated {len(df)} customer records and saved to customers.csv")
-    print(f"\nSample data:\n{df.head()}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic customer intelligence data")
+    parser.add_argument("--rows", type=int, default=None,
+                        help="Number of customers; uses the vectorized chunked generator (default: 30 sample rows)")
+    parser.add_argument("--output", default="customers.csv", help="Output file (.csv or .parquet)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes generating (and CSV-formatting) chunks; worth raising on multi-core machines")
+    args = parser.parse_args()
+
+    if args.rows is None:
+        # Small sample dataset from the original row-by-row generator
+        df = generate_customer_data(30)
+        df.to_csv(args.output, index=False)
+        print(f"Generated {len(df)} customer records and saved to {args.output}")
+        print(f"\nSample data:\n{df.head()}")
+    else:
+        write_customer_data(args.output, args.rows, args.seed, args.chunk_rows, args.workers)
+        print(f"Generated {args.rows} customer records and saved to {args.output}")
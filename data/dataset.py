@@ -0,0 +1,246 @@
+import logging
+import os
+import threading
+import time
+import pandas as pd
+from data.cube import AggregateCube
+from data.facet_index import FacetIndex, FACET_COLUMNS
+from data.filter_state import filter_args
+from data.loader import file_fingerprint
+from data.name_index import NameIndex, NAME_FIELDS
+from data.sampling import StratifiedSample
+from data.text_index import TextIndex
+from data.snapshot import SNAPSHOT_DIR, load_dataset
+
+# Query engines answering filters and page aggregates
+BACKENDS = ('pandas', 'sqlite')
+
+logger = logging.getLogger(__name__)
+
+class Dataset:
+    """One immutable version of the customer data and everything derived from it
+
+    Callbacks take a single reference (``DatasetManager.current``) and use it
+    for the whole request, so a reload mid-request never mixes versions.
+    With ``sql`` (a data.sql_backend.SqliteStore) set, ``select``,
+    ``option_counts`` and ``summarize`` run as SQL queries and the facet index
+    and cube are not built. The row frame (memory-mapped from the snapshot),
+    the text and name indexes and the sample stay in memory either way.
+    ``name_fields`` are the columns the customer typeahead looks up. With
+    ``sample_rows`` set (and more rows than that), a stratified sample of about
+    that many rows backs ``estimate``.
+    """
+
+    def __init__(self, df, version, generation=0, sql=None, name_fields=NAME_FIELDS, sample_rows=0):
+        self.df = df
+        self.version = version
+        self.generation = generation
+        self.sql = sql
+        self.backend = 'pandas' if sql is None else 'sqlite'
+        self.loaded_at = time.time()
+        # Facet bitmaps used by apply_filters
+        self.facet_index = FacetIndex(df) if sql is None else None
+        # Pre-aggregated counts/sums over the filter dimensions for KPI and distribution charts
+        self.cube = AggregateCube.from_frame(df) if sql is None else None
+        # BM25 inverted index over the narrative columns (global search)
+        self.text_index = TextIndex(df)
+        # Prefix/trigram index over customer names (typeahead lookup)
+        self.name_index = NameIndex(df, name_fields)
+        # Industry x Cloud stratified sample for approximate aggregates
+        self.sample = StratifiedSample(df, sample_rows) if sample_rows and len(df) > sample_rows else None
+        # Sr_No -> row position, used to resolve 'ids' store handles
+        self.sr_no_index = pd.Index(df['Sr_No'])
+        # Build the lookup hash table now, so forked workers share it instead of each building one
+        self.sr_no_index.get_indexer(self.sr_no_index[:1])
+        # Filter dropdown values per facet and their unfiltered row counts
+        values = (self.facet_index or self.sql).values
+        self.filter_options = {facet: values(facet) for facet in FACET_COLUMNS}
+        self.option_totals = self.option_counts(None)
+
+    @classmethod
+    def load(cls, path, snapshot_dir=SNAPSHOT_DIR, generation=0, backend='pandas', name_fields=NAME_FIELDS,
+             sample_rows=0):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        df, version = load_dataset(path, snapshot_dir=snapshot_dir)
+        sql = None
+        if backend == 'sqlite':
+            from data.sql_backend import open_store
+            sql = open_store(df, path, version, snapshot_dir)
+        return cls(df, version, generation, sql, name_fields, sample_rows)
+
+    def select(self, spec):
+        """Row positions (ascending) matching a filter spec"""
+        if self.sql is not None:
+            return self.sql.select_rows(spec)
+        return self.facet_index.select(*filter_args(spec))
+
+    def option_counts(self, spec):
+        """Per facet, rows matching each ``filter_options`` value under the other facets' selections"""
+        if self.sql is not None:
+            return {facet: self.sql.option_counts(facet, spec) for facet in FACET_COLUMNS}
+        args = filter_args(spec or {})
+        return {facet: self.facet_index.option_counts(facet, *args) for facet in FACET_COLUMNS}
+
+    def estimate_option_counts(self, spec):
+        """``option_counts`` estimated from the sample"""
+        return {
+            facet: self.sample.option_counts(facet, spec, self.filter_options[facet]) for facet in FACET_COLUMNS
+        }
+
+    def estimate(self, spec, rows=None):
+        """Matching sample rows and their SampleSlice, for a filter spec (or row positions when spec is None)"""
+        matched = self.sample.select(spec) if spec is not None else self.sample.select_rows(rows)
+        return self.sample.frame.iloc[matched], self.sample.slice(spec, matched)
+
+    def summarize(self, spec, rows):
+        """Aggregates (CubeSlice interface) for a filter spec; the frame is only sliced
+        to the row positions ``rows`` when neither SQL nor the cube can answer the spec"""
+        if self.sql is not None and spec is not None:
+            return self.sql.slice(spec)
+        if self.cube is not None and spec is not None and self.cube.can_answer(spec):
+            return self.cube.slice(spec)
+        return AggregateCube.from_frame(self.df.iloc[rows]).slice()
+
+class DatasetManager:
+    """Holds the current Dataset and replaces it when the data file changes
+
+    A reload builds the new Dataset (snapshot, indexes, cube) in a background
+    thread while requests keep using the current one, runs the ``prepare``
+    hooks (e.g. pre-warming caches for the new version), swaps the reference
+    in one assignment and then runs the ``on_swap`` hooks (e.g. dropping
+    cache entries of the old version). Hooks receive ``(old, new)``.
+    ``generation`` counts successful swaps. The data file should be replaced
+    atomically (write elsewhere, then rename) so a reload never reads it
+    half-written.
+    """
+
+    def __init__(self, path, snapshot_dir=SNAPSHOT_DIR, prepare=(), on_swap=(), backend='pandas',
+                 name_fields=NAME_FIELDS, sample_rows=0):
+        self.path = path
+        self.snapshot_dir = snapshot_dir
+        self.prepare = list(prepare)
+        self.on_swap = list(on_swap)
+        self.backend = backend
+        self.name_fields = tuple(name_fields)
+        self.sample_rows = sample_rows
+        self._current = Dataset.load(
+            path, snapshot_dir, backend=backend, name_fields=self.name_fields, sample_rows=sample_rows,
+        )
+        self._file_state = self._stat()
+        self._lock = threading.Lock()
+        self._reload_thread = None
+        self._watch_thread = None
+        self.last_error = None
+
+    @property
+    def current(self):
+        return self._current
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def file_changed(self):
+        """Whether the data file's contents differ from the current version
+
+        The file is only hashed when its mtime, size or inode changed; a
+        touched file with the same contents is then remembered as unchanged.
+        """
+        state = self._stat()
+        if state is None or state == self._file_state:
+            return False
+        if file_fingerprint(self.path) == self._current.version:
+            self._file_state = state
+            return False
+        return True
+
+    def reload(self, force=False):
+        """Build and swap in the data file's current contents (blocking)
+
+        Returns True when a new version was swapped in; an unchanged content
+        hash is a no-op unless ``force`` is set.
+        """
+        with self._lock:
+            if not force and not self.file_changed():
+                return False
+            state = self._stat()
+            old = self._current
+            try:
+                dataset = Dataset.load(
+                    self.path, self.snapshot_dir, old.generation + 1, self.backend, self.name_fields, self.sample_rows,
+                )
+                for hook in self.prepare:
+                    hook(old, dataset)
+            except Exception as exc:
+                # Keep serving the current version; the next change retries
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                logger.exception("Dataset reload failed, keeping version %s", old.version)
+                return False
+            self.last_error = None
+            self._file_state = state
+            self._current = dataset
+            for hook in self.on_swap:
+                hook(old, dataset)
+            logger.info("Swapped in dataset version %s (generation %d, %d rows)",
+                        dataset.version, dataset.generation, len(dataset.df))
+            return True
+
+    def request_reload(self, force=False):
+        """Start a background reload unless one is already running; returns whether one was started"""
+        if self._reload_thread is not None and self._reload_thread.is_alive():
+            return False
+        self._reload_thread = threading.Thread(
+            target=self.reload, kwargs={'force': force}, name='dataset-reload', daemon=True,
+        )
+        self._reload_thread.start()
+        return True
+
+    def watch(self, interval, on_change=None):
+        """Poll the data file's mtime, size and inode every ``interval`` seconds and reload on change
+
+        ``on_change()`` replaces the background reload, e.g. to have a
+        preloaded gunicorn master reload and re-fork its workers.
+        """
+        if interval <= 0 or self._watch_thread is not None:
+            return
+        on_change = on_change or self.request_reload
+
+        def poll():
+            seen = self._file_state
+            while True:
+                time.sleep(interval)
+                state = self._stat()
+                if state not in (None, seen):
+                    seen = state
+                    on_change()
+
+        self._watch_thread = threading.Thread(target=poll, name='dataset-watch', daemon=True)
+        self._watch_thread.start()
+
+    def after_fork(self):
+        """Reset thread state in a forked worker (threads do not survive fork)
+
+        With a preloaded app the master builds the dataset once and workers
+        share its pages copy-on-write. Workers never reload: the master does,
+        then gunicorn replaces them with fresh forks (see gunicorn.conf.py).
+        """
+        self._lock = threading.Lock()
+        self._reload_thread = None
+        self._watch_thread = None
+
+    def status(self):
+        dataset = self._current
+        return {
+            'version': dataset.version,
+            'generation': dataset.generation,
+            'rows': len(dataset.df),
+            'backend': dataset.backend,
+            'sample_rows': len(dataset.sample) if dataset.sample is not None else 0,
+            'loaded_at': dataset.loaded_at,
+            'reloading': self._reload_thread is not None and self._reload_thread.is_alive(),
+            'last_error': self.last_error,
+        }
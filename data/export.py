@@ -0,0 +1,109 @@
+import io
+import os
+import zlib
+
+# format -> (file extension, mimetype)
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'csv.gz': ('csv.gz', 'application/gzip'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+EXPORT_CHUNK_ROWS = 50000
+
+def _chunks(df, rows, columns, chunk_rows, on_chunk=None):
+    """Slices of the selected rows/columns, materialized one chunk at a time
+
+    ``on_chunk(rows_done, rows_total)`` is called after each chunk is consumed.
+    """
+    data = df[columns]
+    for start in range(0, len(rows), chunk_rows):
+        yield data.iloc[rows[start:start + chunk_rows]]
+        if on_chunk is not None:
+            on_chunk(min(start + chunk_rows, len(rows)), len(rows))
+
+def iter_csv(df, rows, columns, chunk_rows=EXPORT_CHUNK_ROWS, on_chunk=None):
+    """Stream rows as UTF-8 CSV, one encoded chunk at a time"""
+    header = True
+    for chunk in _chunks(df, rows, columns, chunk_rows, on_chunk):
+        yield chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+    if header:
+        # No rows matched: still emit the header line
+        yield df[columns].iloc[:0].to_csv(index=False).encode('utf-8')
+
+def iter_csv_gzip(df, rows, columns, chunk_rows=EXPORT_CHUNK_ROWS, on_chunk=None):
+    """Stream gzip-compressed CSV (single gzip member, compressed incrementally)"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for block in iter_csv(df, rows, columns, chunk_rows, on_chunk):
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes can be drained between row groups"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+def iter_parquet(df, rows, columns, chunk_rows=EXPORT_CHUNK_ROWS, on_chunk=None):
+    """Stream a Parquet file, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _DrainableSink()
+    writer = None
+    try:
+        for chunk in _chunks(df, rows, columns, chunk_rows, on_chunk):
+            if writer is None:
+                # Schema comes from real data (object columns are typed by their values)
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(sink, table.schema, compression='snappy')
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            data = sink.drain()
+            if data:
+                yield data
+        if writer is None:
+            writer = pq.ParquetWriter(sink, pa.Schema.from_pandas(df[columns].iloc[:0], preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain()
+
+EXPORT_WRITERS = {
+    'csv': iter_csv,
+    'csv.gz': iter_csv_gzip,
+    'parquet': iter_parquet,
+}
+
+def write_export(df, rows, columns, export_format, path, on_chunk=None):
+    """Write an export to ``path`` (via a temporary file, so a partial file is never visible)"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as fh:
+            for block in EXPORT_WRITERS[export_format](df, rows, columns, on_chunk=on_chunk):
+                fh.write(block)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,172 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Filter facet -> column the bitmaps are built from
+FACET_COLUMNS = {
+    'industry': 'Industry_Vertical',
+    'cloud': 'Cloud_Platforms',
+    'region': 'Region',
+    'optimization': 'Optimization_Type',
+    'license': 'License_Tokens',
+}
+
+# Facets whose selections are matched as case-insensitive patterns (like str.contains)
+PATTERN_FACETS = {'region', 'license'}
+
+RANGE_COLUMN = 'Total_Optimization_Potential'
+
+# Number of set bits for every byte value
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def _group_rows(codes, n_values):
+    """Row positions for each code value, in row order"""
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(n_values + 1))
+    return [order[bounds[k]:bounds[k + 1]] for k in range(n_values)]
+
+def pattern_matcher(values):
+    """Compile a case-insensitive alternation the same way str.contains('|'.join(...)) did"""
+    pattern = '|'.join(values)
+    try:
+        regex = re.compile(pattern, re.IGNORECASE)
+        return regex.search
+    except re.error:
+        lowered = [value.lower() for value in values]
+        return lambda text: any(value in text.lower() for value in lowered)
+
+class FacetIndex:
+    """Inverted index from facet values to packed row bitmaps
+
+    Built once per dataset. A filter request ORs the bitmaps of the selected
+    values inside each facet and ANDs the facets together, so answering it costs
+    O(rows / 8) byte operations instead of one string scan per facet.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.n_bytes = (self.n_rows + 7) // 8
+        self.bitmaps = {}
+
+        for facet, column in FACET_COLUMNS.items():
+            if column == 'License_Tokens':
+                self.bitmaps[facet] = self._build_token_bitmaps(df[column])
+            else:
+                self.bitmaps[facet] = self._build_value_bitmaps(df[column])
+
+        self.range_values = df[RANGE_COLUMN].to_numpy()
+        self._range_bounds = (
+            (self.range_values.min(), self.range_values.max())
+            if self.n_rows and not pd.isna(self.range_values).any() else None
+        )
+
+    def _pack(self, rows):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def _build_value_bitmaps(self, series):
+        codes, uniques = pd.factorize(series, sort=True)
+        groups = _group_rows(codes, len(uniques))
+        return {value: self._pack(rows) for value, rows in zip(uniques, groups)}
+
+    def _build_token_bitmaps(self, series):
+        # One bitmap per distinct token tuple, then OR them into per-token bitmaps
+        codes, uniques = pd.factorize(series)
+        groups = _group_rows(codes, len(uniques))
+        bitmaps = {}
+        for tokens, rows in zip(uniques, groups):
+            tuple_bits = self._pack(rows)
+            for token in tokens:
+                if token in bitmaps:
+                    np.bitwise_or(bitmaps[token], tuple_bits, out=bitmaps[token])
+                else:
+                    bitmaps[token] = tuple_bits.copy()
+        return dict(sorted(bitmaps.items()))
+
+    def values(self, facet):
+        """Indexed values for a facet, sorted"""
+        return list(self.bitmaps[facet].keys())
+
+    def all_rows(self):
+        """Bitmap with every row set"""
+        return np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def no_rows(self):
+        return np.zeros(self.n_bytes, dtype=np.uint8)
+
+    def matching_values(self, facet, selected):
+        """Indexed values a selection resolves to"""
+        if facet in PATTERN_FACETS:
+            matches = pattern_matcher(selected)
+            return [value for value in self.bitmaps[facet] if matches(value)]
+        return [value for value in selected if value in self.bitmaps[facet]]
+
+    def facet_bits(self, facet, selected):
+        """OR of the bitmaps matching a selection, or None when the facet is unrestricted"""
+        if not selected:
+            return None
+        bits = self.no_rows()
+        for value in self.matching_values(facet, selected):
+            np.bitwise_or(bits, self.bitmaps[facet][value], out=bits)
+        return bits
+
+    def range_bits(self, opt_range):
+        """Bitmap for the opt-potential range, or None when it covers every row"""
+        if not opt_range or len(opt_range) != 2:
+            return None
+        low, high = opt_range
+        if self._range_bounds and low <= self._range_bounds[0] and high >= self._range_bounds[1]:
+            return None
+        return np.packbits((self.range_values >= low) & (self.range_values <= high))
+
+    def filter_bits(self, industries=None, clouds=None, regions=None, opt_types=None,
+                    licenses=None, opt_range=None, exclude=None):
+        """AND of all facet bitmaps; ``exclude`` skips one facet (used for option counts)"""
+        selections = {
+            'industry': industries,
+            'cloud': clouds,
+            'region': regions,
+            'optimization': opt_types,
+            'license': licenses,
+        }
+        parts = [self.facet_bits(facet, values) for facet, values in selections.items() if facet != exclude]
+        parts.append(self.range_bits(opt_range))
+
+        bits = None
+        for part in parts:
+            if part is None:
+                continue
+            bits = part.copy() if bits is None else np.bitwise_and(bits, part, out=bits)
+        return self.all_rows() if bits is None else bits
+
+    def option_counts(self, facet, industries=None, clouds=None, regions=None, opt_types=None,
+                      licenses=None, opt_range=None):
+        """Matching rows per indexed value of ``facet`` (in ``values`` order) under the other facets' selections
+
+        Each count is what selecting that value would match, so pattern facets
+        count every value the selection matches (e.g. "SAP" also matches "SAP HANA").
+        """
+        bits = self.filter_bits(industries, clouds, regions, opt_types, licenses, opt_range, exclude=facet)
+        return np.array(
+            [self.count(np.bitwise_and(self.option_bits(facet, value), bits)) for value in self.bitmaps[facet]],
+            dtype=np.int64,
+        )
+
+    def option_bits(self, facet, value):
+        """Rows that selecting ``value`` alone matches"""
+        if facet in PATTERN_FACETS:
+            return self.facet_bits(facet, [value])
+        return self.bitmaps[facet][value]
+
+    def rows(self, bits):
+        """Row positions (ascending) for a bitmap"""
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+    def count(self, bits):
+        return int(_POPCOUNT[bits].sum(dtype=np.int64))
+
+    def select(self, industries=None, clouds=None, regions=None, opt_types=None,
+               licenses=None, opt_range=None):
+        """Row positions matching a filter request"""
+        return self.rows(self.filter_bits(industries, clouds, regions, opt_types, licenses, opt_range))
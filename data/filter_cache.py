@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+class FilterCache:
+    """Thread-safe bounded LRU cache from filter key to row-position array
+    (or any other read-only value derived from the filtered rows)
+
+    Entries expire after ``ttl`` seconds (0 disables expiry). Every entry is
+    stored under the dataset version it was computed for, so requests still
+    running against an older version never see newer results (or vice versa).
+    ``retain_version`` drops every entry of other versions once a new dataset
+    is swapped in.
+    """
+
+    def __init__(self, maxsize=256, ttl=900):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get((version, key))
+            if entry is not None:
+                rows, stored_at = entry
+                if not self.ttl or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end((version, key))
+                    self.hits += 1
+                    return rows
+                del self._entries[(version, key)]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, rows):
+        if isinstance(rows, np.ndarray):
+            rows.setflags(write=False)  # Shared between callbacks
+        with self._lock:
+            if self.version is None:
+                self.version = version
+            self._entries[(version, key)] = (rows, time.monotonic())
+            self._entries.move_to_end((version, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def retain_version(self, version):
+        """Make ``version`` current and drop the entries of every other version"""
+        with self._lock:
+            self.version = version
+            for entry_key in [k for k in self._entries if k[0] != version]:
+                del self._entries[entry_key]
+
+    def recent_keys(self, version, limit):
+        """Most recently used keys of a version, newest first (used to pre-warm a new version)"""
+        with self._lock:
+            keys = [key for entry_version, key in reversed(self._entries) if entry_version == version]
+        return keys[:limit]
+
+    def get_or_compute(self, key, version, compute):
+        """Return cached rows for ``key``, computing and storing them on a miss"""
+        rows = self.get(key, version)
+        if rows is None:
+            rows = compute()
+            self.put(key, version, rows)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'version': self.version,
+            }
@@ -0,0 +1,102 @@
+import base64
+import json
+import zlib
+import numpy as np
+
+# Facet selections in a filter spec, in apply_filters argument order
+FACET_FIELDS = ('industry', 'cloud', 'region', 'optimization', 'license')
+
+# What filtered-data-store holds: the filter spec itself or the matching Sr_No ids
+STORE_MODES = ('token', 'ids')
+
+def make_filter_spec(industries=None, clouds=None, regions=None, opt_types=None,
+                     licenses=None, opt_range=None):
+    """Normalized, JSON-serializable filter state (sorted value sets per facet)"""
+    spec = {
+        field: sorted(set(values or ()))
+        for field, values in zip(FACET_FIELDS, (industries, clouds, regions, opt_types, licenses))
+    }
+    if opt_range and len(opt_range) == 2:
+        spec['opt_range'] = [float(opt_range[0]), float(opt_range[1])]
+    else:
+        spec['opt_range'] = None
+    return spec
+
+def filter_args(spec):
+    """Positional (industries, clouds, regions, opt_types, licenses, opt_range) for a spec"""
+    return tuple(spec.get(field) or [] for field in FACET_FIELDS) + (spec.get('opt_range'),)
+
+def filter_key(spec):
+    """Canonical, hashable cache key for a filter spec"""
+    spec = make_filter_spec(*filter_args(spec))
+    return tuple(tuple(spec[field]) for field in FACET_FIELDS) + (
+        tuple(spec['opt_range']) if spec['opt_range'] else None,
+    )
+
+def encode_ids(ids):
+    """Compress integer ids: sorted deltas -> zlib -> urlsafe base64"""
+    ids = np.unique(np.asarray(ids, dtype=np.int64))
+    deltas = np.diff(ids, prepend=0).astype('<u4')
+    return base64.urlsafe_b64encode(zlib.compress(deltas.tobytes(), 6)).decode('ascii')
+
+def decode_ids(encoded):
+    deltas = np.frombuffer(zlib.decompress(base64.urlsafe_b64decode(encoded)), dtype='<u4')
+    return np.cumsum(deltas, dtype=np.int64)
+
+def make_store_handle(spec, mode='token', ids=None):
+    """Compact filtered-data-store payload
+
+    ``token`` mode keeps only the filter spec; ``ids`` mode keeps the compressed
+    Sr_No list of the matching rows. Either way the server resolves the rows
+    against its in-memory dataset.
+    """
+    if mode == 'ids':
+        return {'mode': 'ids', 'count': int(len(ids)), 'ids': encode_ids(ids)}
+    return {'mode': 'token', 'filters': spec}
+
+def encode_store_handle(store_data):
+    """URL-safe text form of a store payload (used by the export route)"""
+    payload = json.dumps(store_data or {}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_store_handle(text):
+    """Store payload for ``encode_store_handle`` text, with its filter spec normalized
+
+    Raises ValueError for anything that is not a well-formed payload: bad
+    encoding or JSON, a wrong shape or value types, or corrupt ids.
+    """
+    padded = text + '=' * (-len(text) % 4)
+    store_data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    if not isinstance(store_data, dict):
+        raise ValueError("Store payload must be an object")
+    if not store_data:
+        return store_data
+
+    mode = store_data.get('mode', 'token')
+    if mode not in STORE_MODES:
+        raise ValueError(f"Unknown store mode {mode!r}")
+    if mode == 'ids':
+        try:
+            decode_ids(store_data['ids'])
+        except (KeyError, TypeError, zlib.error) as exc:
+            raise ValueError("Invalid ids in store payload") from exc
+        return store_data
+
+    filters = store_data.get('filters') or {}
+    if not isinstance(filters, dict):
+        raise ValueError("Store filters must be an object")
+    for field in FACET_FIELDS:
+        values = filters.get(field)
+        if values is not None and not (isinstance(values, list) and all(isinstance(v, str) for v in values)):
+            raise ValueError(f"Filter {field!r} must be a list of strings")
+    opt_range = filters.get('opt_range')
+    if opt_range is not None and not (
+        isinstance(opt_range, list) and len(opt_range) == 2
+        and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in opt_range)
+    ):
+        raise ValueError("Filter 'opt_range' must be two numbers")
+    return {**store_data, 'mode': 'token', 'filters': make_filter_spec(*filter_args(filters))}
+
+def spec_from_key(key):
+    """Filter spec for a ``filter_key`` tuple"""
+    return make_filter_spec(*key)
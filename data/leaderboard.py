@@ -0,0 +1,36 @@
+import numpy as np
+
+# Metric -> (label, ascending); ascending metrics rank their lowest values first
+LEADERBOARD_METRICS = {
+    'Total_Potential_Savings_M': ("Total Savings ($M)", False),
+    'Monthly_Savings_K': ("Monthly Savings ($K)", False),
+    'Engagement_Score': ("Engagement Score", False),
+    'ROI_Payback_Months': ("ROI Payback (months, fastest first)", True),
+}
+
+LEADERBOARD_DEFAULT_METRIC = 'Total_Potential_Savings_M'
+
+# Leaderboard lengths offered; the longest is computed once per filter and metric
+LEADERBOARD_SIZES = (10, 25, 50, 100)
+
+def top_k(values, rows, k, ascending=False):
+    """The ``k`` entries of ``rows`` with the best ``values[rows]``, best first
+
+    ``argpartition`` selects them in O(len(rows)) and only those ``k`` are
+    sorted. Ties keep the order of ``rows``; missing values rank last.
+    """
+    rows = np.asarray(rows)
+    if k <= 0 or not len(rows):
+        return rows[:0]
+    key = values[rows].astype(np.float64)
+    if not ascending:
+        key = -key
+    key[np.isnan(key)] = np.inf
+    if len(key) > k:
+        # Everything strictly better than the k-th value, then the first ties
+        kth = key[np.argpartition(key, k - 1)[k - 1]]
+        better = np.flatnonzero(key < kth)
+        selected = np.concatenate([better, np.flatnonzero(key == kth)[:k - len(better)]])
+    else:
+        selected = np.arange(len(key))
+    return rows[selected[np.lexsort((selected, key[selected]))]]
@@ -0,0 +1,139 @@
+import hashlib
+import pandas as pd
+import numpy as np
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = [
+    'Industry_Vertical',
+    'Cloud_Platforms',
+    'Optimization_Type',
+    'Decision_Maker',
+]
+
+# Whole-number metrics
+INT_COLUMNS = [
+    'Sr_No',
+    'Cloud_Optimization_Potential',
+    'ELO_Optimization_Potential',
+    'Total_Optimization_Potential',
+    'Annual_IT_Spend_M',
+    'Number_of_Employees',
+    'IT_Team_Size',
+    'Number_of_VMs',
+    'Physical_Servers',
+    'Number_of_Databases',
+    'Number_of_Applications',
+    'Microsoft_Licenses',
+    'SAP_Licenses',
+    'Oracle_Licenses',
+    'Azure_VMs',
+    'Azure_Storage_TB',
+    'AWS_EC2_Instances',
+    'AWS_S3_Storage_TB',
+    'GCP_VMs',
+    'GCP_Storage_TB',
+    'Implementation_Cost_K',
+    'Last_Contact_Days_Ago',
+    'Engagement_Score',
+]
+
+# Fractional metrics (spend, savings, ROI)
+FLOAT_COLUMNS = [
+    'Current_Cloud_Spend_M',
+    'Current_License_Spend_M',
+    'Potential_Cloud_Savings_M',
+    'Potential_License_Savings_M',
+    'Total_Potential_Savings_M',
+    'Azure_Monthly_Spend_K',
+    'AWS_Monthly_Spend_K',
+    'GCP_Monthly_Spend_K',
+    'Monthly_Savings_K',
+    'ROI_Payback_Months',
+]
+
+# Columns computed once at load time (not part of the CSV schema)
+DERIVED_COLUMNS = ['Region', 'HQ_City', 'License_Tokens']
+
+COLUMN_DTYPES = {
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+    **{col: 'int32' for col in INT_COLUMNS},
+    **{col: 'float32' for col in FLOAT_COLUMNS},
+}
+
+def _map_unique(series, parse):
+    """Apply a parser once per distinct value and broadcast the result to every row"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    parsed = np.empty(len(uniques) + 1, dtype=object)
+    parsed[:-1] = [parse(value) for value in uniques]
+    parsed[-1] = parse(None)  # Slot used by missing values (code -1)
+    return parsed[codes]
+
+def _parse_region(value):
+    if not isinstance(value, str) or 'operates across' not in value:
+        return 'Unknown'
+    return value.split('operates across', 1)[1].strip() or 'Unknown'
+
+def _parse_hq_city(value):
+    if not isinstance(value, str) or not value.startswith('HQ:'):
+        return 'Unknown'
+    return value[3:].split(';', 1)[0].strip() or 'Unknown'
+
+def _parse_license_tokens(value):
+    if not isinstance(value, str):
+        return ()
+    return tuple(token.strip() for token in value.split(',') if token.strip())
+
+def prepare_customer_frame(df):
+    """Apply narrow dtypes and add the derived Region, HQ_City and License_Tokens columns
+
+    Existing column data is not copied (columns may be read-only views on a
+    memory-mapped snapshot); derived columns are only added when they are
+    missing (a snapshot stores Region and HQ_City) and their source column
+    is present.
+    """
+    casts = {
+        col: dtype for col, dtype in COLUMN_DTYPES.items()
+        if col in df.columns and str(df[col].dtype) != dtype
+    }
+    if casts:
+        df = df.astype(casts)
+
+    df = df.copy(deep=False)
+    if 'Geographical_Presence' in df.columns and 'Region' not in df.columns:
+        geo = df['Geographical_Presence']
+        df['Region'] = pd.Categorical(_map_unique(geo, _parse_region))
+        df['HQ_City'] = pd.Categorical(_map_unique(geo, _parse_hq_city))
+    if 'License_Ecosystem' in df.columns and 'License_Tokens' not in df.columns:
+        # Rows with the same ecosystem string share a single tuple object
+        df['License_Tokens'] = _map_unique(df['License_Ecosystem'], _parse_license_tokens)
+
+    df.index = pd.RangeIndex(len(df))
+    return df
+
+def load_customer_data(path):
+    """Load the customer CSV with explicit dtypes and precomputed derived columns"""
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {col: dtype for col, dtype in COLUMN_DTYPES.items() if col in header}
+    df = pd.read_csv(path, dtype=dtypes)
+    return prepare_customer_frame(df)
+
+def source_columns(df):
+    """Columns of the original CSV schema (derived columns excluded)"""
+    return [col for col in df.columns if col not in DERIVED_COLUMNS]
+
+def to_records(df, columns=None):
+    """Convert rows to JSON-friendly records for dcc.Store / DataTable payloads"""
+    out = df[columns or source_columns(df)].copy()
+    for col in out.columns:
+        if out[col].dtype == np.float32:
+            # float32 -> float64 would expose representation noise (35.39 -> 35.38999938)
+            out[col] = out[col].astype('float64').round(4)
+    return out.to_dict('records')
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Content hash of a data file, used as the dataset version for caches"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
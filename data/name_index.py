@@ -0,0 +1,169 @@
+import bisect
+import re
+import numpy as np
+import pandas as pd
+
+# Columns the customer typeahead looks up by default
+NAME_FIELDS = ('Customer_Name',)
+
+# Characters indexed per value (longer values are matched on their start)
+MAX_NAME_CHARS = 64
+
+_NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+def _normalize(values):
+    """Lower-case with non-alphanumerics collapsed to single spaces, padded for edge trigrams"""
+    text = pd.Series(values, dtype=object).fillna('').astype(str).str.lower()
+    text = text.str.replace(_NON_ALPHANUMERIC, ' ', regex=True).str.strip()
+    return ('  ' + text.str.slice(0, MAX_NAME_CHARS) + ' ').tolist()
+
+def _trigram_pairs(padded, first_doc=0):
+    """Sorted, distinct ``trigram << 32 | doc`` keys for padded strings (docs numbered from ``first_doc``)
+
+    Strings are laid out as a byte matrix so every trigram is computed with
+    array arithmetic instead of a Python loop over characters.
+    """
+    width = max((len(text) for text in padded), default=0)
+    if width < 3:
+        return np.zeros(0, dtype=np.int64)
+    encoded = np.array([text.encode('ascii', 'ignore') for text in padded], dtype=f'S{width}')
+    chars = encoded.view(np.uint8).reshape(len(padded), width)
+    valid = chars[:, 2:] != 0  # Positions past the end of a string are NUL padded
+    codes = (chars[:, :-2].astype(np.int64) << 16) | (chars[:, 1:-1].astype(np.int64) << 8) | chars[:, 2:]
+    docs = np.broadcast_to(np.arange(first_doc, first_doc + len(padded), dtype=np.int64)[:, None], codes.shape)
+    return np.unique((codes[valid] << 32) | docs[valid])
+
+def _trigram_codes(padded):
+    """``(doc ids, trigram codes)`` for padded strings, one pair per distinct trigram in each,
+    sorted by trigram then doc"""
+    pairs = _trigram_pairs(padded)
+    return (pairs & 0xFFFFFFFF).astype(np.int32), (pairs >> 32).astype(np.int32)
+
+class NameIndex:
+    """Prefix and trigram index for fuzzy customer lookup (typeahead)
+
+    Distinct values of each field are documents; a value shared by several
+    rows matches all of them. Exact prefixes are found by bisecting the
+    normalized values in sorted order. Fuzzy candidates come from the
+    trigram postings (CSR layout: sorted trigram codes plus doc ids sorted
+    within each trigram), read rarest trigram first up to CANDIDATE_BUDGET
+    entries, so a lookup costs the same however common the query's trigrams
+    are. The shortlist is then scored exactly by trigram (Jaccard)
+    similarity, with a bonus for values that start with or contain the query.
+    """
+
+    # Posting entries read per lookup (rarest trigrams first)
+    CANDIDATE_BUDGET = 20000
+    # Candidates scored exactly
+    SHORTLIST = 200
+    # Values normalized and split into trigrams at a time while building
+    BUILD_CHUNK = 65536
+
+    def __init__(self, df, fields=NAME_FIELDS):
+        self.fields = [field for field in fields if field in df.columns]
+        values, rows, row_counts, field_ids = [], [], [], []
+        for f, field in enumerate(self.fields):
+            codes, uniques = pd.factorize(df[field])
+            present = np.flatnonzero(codes >= 0)
+            # Rows of each value in row order (CSR, like the trigram postings)
+            rows.append(present[np.argsort(codes[present], kind='stable')].astype(np.int32))
+            row_counts.append(np.bincount(codes[present], minlength=len(uniques)))
+            values += list(uniques)
+            field_ids.append(np.full(len(uniques), f, dtype=np.int8))
+        self.values = values
+        self.rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        self.row_bounds = np.concatenate([[0], *row_counts]).cumsum()
+        self.field_ids = np.concatenate(field_ids) if field_ids else np.zeros(0, dtype=np.int8)
+
+        # Normalized and split into trigrams in chunks, so the padded strings and
+        # byte matrices of only one chunk are alive at a time
+        self.normalized, pairs = [], []
+        for start in range(0, len(values), self.BUILD_CHUNK):
+            padded = _normalize(values[start:start + self.BUILD_CHUNK])
+            self.normalized += [text.strip() for text in padded]
+            pairs.append(_trigram_pairs(padded, start))
+        pairs = np.concatenate(pairs) if pairs else np.zeros(0, dtype=np.int64)
+        pairs.sort()  # Chunks cover disjoint docs, so the keys stay distinct
+        self.lengths = np.array([len(text) for text in self.normalized], dtype=np.int32)
+        self.prefix_order = np.argsort(np.array(self.normalized, dtype=object), kind='stable')
+
+        self.doc_ids = (pairs & 0xFFFFFFFF).astype(np.int32)
+        codes = (pairs >> 32).astype(np.int32)
+        del pairs
+        self.trigram_counts = np.bincount(self.doc_ids, minlength=len(values))
+        # Postings of one trigram are contiguous: their starts are where the code changes
+        starts = np.flatnonzero(np.diff(codes, prepend=-1))
+        self.trigrams = codes[starts]
+        self.bounds = np.append(starts, len(codes))
+
+    def _postings(self, position):
+        return self.doc_ids[self.bounds[position]:self.bounds[position + 1]]
+
+    def _prefix_matches(self, needle, limit):
+        """Docs whose normalized value starts with ``needle`` (the shortest ``limit``)"""
+        value = self.normalized.__getitem__
+        start = bisect.bisect_left(self.prefix_order, needle, key=value)
+        end = bisect.bisect_left(self.prefix_order, needle + '\x7f', key=value)
+        docs = self.prefix_order[start:end]
+        if len(docs) > limit:
+            docs = docs[np.argpartition(self.lengths[docs], limit - 1)[:limit]]
+        return docs
+
+    def _fuzzy_candidates(self, positions):
+        """Docs sharing the most trigrams with the query, within the posting budget"""
+        sizes = self.bounds[positions + 1] - self.bounds[positions]
+        postings, budget = [], self.CANDIDATE_BUDGET
+        for position in positions[np.argsort(sizes, kind='stable')]:
+            if budget <= 0:
+                break
+            block = self._postings(position)[:budget]
+            postings.append(block)
+            budget -= len(block)
+        docs, shared = np.unique(np.concatenate(postings), return_counts=True)
+        if len(docs) > self.SHORTLIST:
+            # Most shared trigrams first, shorter (closer) values breaking ties
+            key = shared * (MAX_NAME_CHARS + 1) - self.lengths[docs]
+            docs = docs[np.argpartition(-key, self.SHORTLIST - 1)[:self.SHORTLIST]]
+        return docs
+
+    def lookup(self, query, limit=10):
+        """Best matches as ``[(row position, field, value, score)]``, best first
+
+        A value shared by several rows yields one match per row (in row order).
+        """
+        needle = _NON_ALPHANUMERIC.sub(' ', str(query or '').lower()).strip()[:MAX_NAME_CHARS]
+        if not needle or not self.values:
+            return []
+        # A short query is matched as a prefix: no trailing padding trigram
+        padded = '  ' + needle + (' ' if len(needle) >= 3 else '')
+        _, codes = _trigram_codes([padded])
+        positions = np.searchsorted(self.trigrams, codes)
+        known = positions < len(self.trigrams)
+        known[known] = self.trigrams[positions[known]] == codes[known]
+        positions = positions[known]
+
+        candidates = self._prefix_matches(needle, limit)
+        if len(positions):
+            candidates = np.union1d(candidates, self._fuzzy_candidates(positions))
+        if not len(candidates):
+            return []
+        # Exact shared trigram counts: each posting block is sorted by doc
+        shared = np.zeros(len(candidates), dtype=np.int64)
+        for position in positions:
+            block = self._postings(position)
+            found = np.minimum(np.searchsorted(block, candidates), len(block) - 1)
+            shared += block[found] == candidates
+        scores = shared / (len(codes) + self.trigram_counts[candidates] - shared)
+        scores += [
+            0.5 if text.startswith(needle) else 0.25 if needle in text else 0.0
+            for text in (self.normalized[doc] for doc in candidates.tolist())
+        ]
+        order = np.lexsort((candidates, -scores))[:limit]
+        matches = []
+        for doc, score in zip(candidates[order].tolist(), scores[order].tolist()):
+            if score <= 0 or len(matches) >= limit:
+                break
+            rows = self.rows[self.row_bounds[doc]:self.row_bounds[doc + 1]][:limit - len(matches)]
+            field = self.fields[self.field_ids[doc]]
+            matches += [(row, field, self.values[doc], round(float(score), 4)) for row in rows.tolist()]
+        return matches
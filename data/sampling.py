@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+from data.cube import AggregateCube, CubeSlice, DIMENSIONS
+from data.facet_index import FacetIndex
+from data.filter_state import filter_args
+
+# How page aggregates are computed: exactly, or estimated from the sample first
+AGGREGATE_MODES = ('exact', 'approximate')
+
+# Columns the sample is stratified by
+STRATA = ('Industry_Vertical', 'Cloud_Platforms')
+
+# Rows kept from every stratum (all of them when it is smaller)
+MIN_STRATUM_ROWS = 30
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959964
+
+# Population rows each sampled row stands for (column of the sample frame)
+WEIGHT = 'Sample_Weight'
+
+def format_estimate(text, margin, spec='.0f', unit=''):
+    """Display text for an estimate and its 95% margin, e.g. ``≈1204 ± 38``
+
+    A zero margin (e.g. a count over whole strata, which the sample weights
+    reproduce exactly) leaves ``text`` as it is.
+    """
+    if not margin > 0:
+        return text
+    return f"≈{text} ± {margin:{spec}}{unit}"
+
+class SampleSlice(CubeSlice):
+    """CubeSlice estimated from the sampled rows that match a filter
+
+    Cells are weighted by the sample weights, so count / sum / mean /
+    value_counts / group are population estimates (Horvitz-Thompson totals,
+    ratio means). The ``*_margin`` methods give 95% confidence half-widths
+    from the stratified-sampling variance.
+    """
+
+    approximate = True
+
+    def __init__(self, cells, sample, matched):
+        super().__init__(cells)
+        self.sample = sample
+        self.matched = matched  # Positions in sample.frame
+
+    def count(self):
+        return int(round(self.cells['count'].sum()))
+
+    def value_counts(self, dimension):
+        return super().value_counts(dimension).round().astype('int64')
+
+    def _margin(self, contributions, rows=None):
+        """95% half-width of the estimated total of ``contributions`` (one per matched row)"""
+        rows = self.matched if rows is None else rows
+        strata = self.sample.strata[rows]
+        n_strata = len(self.sample.population)
+        totals = np.bincount(strata, contributions, minlength=n_strata)
+        squares = np.bincount(strata, contributions * contributions, minlength=n_strata)
+        return Z_95 * np.sqrt(self.sample.total_variance(totals, squares))
+
+    def _values(self, measure):
+        return self.sample.frame[measure].to_numpy(dtype='float64')[self.matched]
+
+    def count_margin(self):
+        return float(self._margin(np.ones(len(self.matched))))
+
+    def sum_margin(self, measure):
+        return float(self._margin(np.nan_to_num(self._values(measure))))
+
+    def mean_margin(self, measure):
+        """Linearized (ratio estimator) margin of the mean"""
+        values = self._values(measure)
+        present = ~np.isnan(values)
+        weights = self.sample.weights[self.matched][present]
+        if weights.sum() == 0:
+            return float('nan')
+        mean = np.dot(weights, values[present]) / weights.sum()
+        return float(self._margin((values[present] - mean) / weights.sum(), self.matched[present]))
+
+    def value_counts_margin(self, dimension):
+        """Margin of every ``value_counts`` entry, indexed like it"""
+        counts = self.value_counts(dimension)
+        column = self.sample.frame[DIMENSIONS.get(dimension, dimension)].to_numpy()[self.matched]
+        return pd.Series(
+            [float(self._margin((column == value).astype('float64'))) for value in counts.index],
+            index=counts.index,
+        )
+
+class StratifiedSample:
+    """Stratified random sample of the rows, drawn once per dataset
+
+    Strata are the Industry x Cloud combinations. Every stratum keeps a share of
+    ``size`` proportional to its row count, but at least MIN_STRATUM_ROWS, so
+    small segments still get usable estimates. The sample has its own facet
+    index and weighted cube, so estimating a filter costs O(sample) however
+    large the data is.
+    """
+
+    def __init__(self, df, size, seed=0):
+        strata = df.groupby(list(STRATA), observed=True, dropna=False, sort=False).ngroup().to_numpy()
+        population = np.bincount(strata).astype(np.int64)
+        sizes = np.minimum(
+            population,
+            np.maximum(np.rint(population * (size / max(len(df), 1))), MIN_STRATUM_ROWS),
+        ).astype(np.int64)
+
+        # Shuffle within each stratum and keep its first sizes[h] rows
+        rng = np.random.default_rng(seed)
+        order = np.lexsort((rng.random(len(df)), strata))
+        starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+        rank = np.arange(len(df)) - starts[strata[order]]
+        self.rows = np.sort(order[rank < sizes[strata[order]]])
+
+        self.population = population
+        self.sizes = sizes
+        self.strata = strata[self.rows]
+        self.weights = (population / np.maximum(sizes, 1))[self.strata]
+        self.frame = df.iloc[self.rows].assign(**{WEIGHT: self.weights})
+        self.facet_index = FacetIndex(self.frame)
+        self.cube = AggregateCube.from_frame(self.frame, self.weights)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def total_variance(self, totals, squares):
+        """Variance of an estimated total from per-stratum sums (and sums of squares) of the matched rows
+
+        Unmatched sampled rows contribute zeros, so each stratum's sample
+        variance is taken over all its ``sizes[h]`` sampled rows.
+        """
+        n = self.sizes.astype('float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = np.where(n > 1, (squares - totals * totals / n) / (n - 1), 0.0)
+            per_stratum = np.where(
+                n > 0, self.population ** 2 * (1 - n / self.population) * np.maximum(variance, 0) / n, 0.0
+            )
+        return float(per_stratum.sum())
+
+    def select(self, spec):
+        """Sample-frame positions matching a filter spec"""
+        return self.facet_index.select(*filter_args(spec))
+
+    def option_counts(self, facet, spec, values):
+        """Estimated matching rows per entry of ``values`` under the other facets' selections"""
+        index = self.facet_index
+        bits = index.filter_bits(*filter_args(spec or {}), exclude=facet)
+        estimates = [
+            self.weights[index.rows(np.bitwise_and(index.facet_bits(facet, [value]), bits))].sum()
+            for value in values
+        ]
+        return np.rint(estimates).astype(np.int64)
+
+    def select_rows(self, rows):
+        """Sample-frame positions of the sampled rows among ``rows`` (dataset row positions)"""
+        return np.flatnonzero(np.isin(self.rows, rows))
+
+    def slice(self, spec, matched):
+        """SampleSlice for ``matched`` sample positions (rolled up from the cube when it can answer ``spec``)"""
+        if spec is not None and self.cube.can_answer(spec):
+            cells = self.cube.slice(spec).cells
+        else:
+            cells = AggregateCube.from_frame(self.frame.iloc[matched], self.weights[matched]).cells
+        return SampleSlice(cells, self, matched)
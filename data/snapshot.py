@@ -0,0 +1,94 @@
+import glob
+import hashlib
+import importlib.util
+import os
+from data.loader import load_customer_data, prepare_customer_frame, source_columns, file_fingerprint
+
+SNAPSHOT_DIR = os.path.join('data', '.snapshots')
+
+# Derived columns stored in the snapshot (License_Tokens is re-derived per
+# unique License_Ecosystem value, so rows keep sharing one tuple per value)
+SNAPSHOT_DERIVED_COLUMNS = ['Region', 'HQ_City']
+
+def snapshot_available():
+    """Snapshots need pyarrow; without it the CSV is parsed on every boot"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+def snapshot_path(csv_path, key, snapshot_dir=SNAPSHOT_DIR):
+    """Snapshot file for a CSV and key, e.g. data/.snapshots/customers-<key>.arrow"""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(snapshot_dir, f'{stem}-{key}.arrow')
+
+def file_state_key(path):
+    """Short key for a file's size, mtime and inode
+
+    Replacing the file (an atomic rename included) changes it, so a snapshot
+    is found without hashing the file's contents.
+    """
+    stat = os.stat(path)
+    state = f'{stat.st_size}:{stat.st_mtime_ns}:{stat.st_ino}'
+    return hashlib.sha1(state.encode('ascii')).hexdigest()[:16]
+
+def write_snapshot(df, path, version):
+    """Write the source and SNAPSHOT_DERIVED_COLUMNS as an uncompressed Arrow IPC file
+
+    Uncompressed buffers can be memory-mapped and viewed without decoding.
+    ``version`` (the CSV's content hash) is kept in the schema metadata.
+    The file is written next to its final name and moved into place, so a
+    concurrently booting worker never maps a partial snapshot. Snapshots of
+    older versions of the same CSV are removed.
+    """
+    import pyarrow as pa
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    columns = source_columns(df) + [col for col in SNAPSHOT_DERIVED_COLUMNS if col in df.columns]
+    table = pa.Table.from_pandas(df[columns], preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b'version': version.encode('ascii')})
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    stem = os.path.basename(path).rsplit('-', 1)[0]
+    for stale in glob.glob(os.path.join(directory, f'{stem}-*.arrow')):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+def read_snapshot(path):
+    """Memory-map a snapshot and return the prepared frame and its version
+
+    Every source column is read: the table, detail cards and export show them
+    all. Numeric columns stay zero-copy views on the mapped file, so workers
+    reading the same snapshot share its pages through the OS cache.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+
+    # split_blocks keeps one block per column so numeric columns are not consolidated (copied)
+    df = table.to_pandas(split_blocks=True)
+    return prepare_customer_frame(df), table.schema.metadata[b'version'].decode('ascii')
+
+def load_dataset(csv_path, snapshot_dir=SNAPSHOT_DIR):
+    """Load the customer dataset through its Arrow snapshot
+
+    The first load of a CSV file parses the text, hashes it and writes the
+    snapshot; later loads (every other worker, every restart) find the
+    snapshot by the file's size, mtime and inode and map it, without reading
+    the CSV. Returns ``(df, fingerprint)``; the fingerprint (content hash) is
+    the dataset version.
+    """
+    if not snapshot_available():
+        return load_customer_data(csv_path), file_fingerprint(csv_path)
+
+    path = snapshot_path(csv_path, file_state_key(csv_path), snapshot_dir)
+    if not os.path.exists(path):
+        write_snapshot(load_customer_data(csv_path), path, file_fingerprint(csv_path))
+    return read_snapshot(path)
@@ -0,0 +1,264 @@
+import glob
+import math
+import os
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from data.cube import DIMENSIONS, MEASURES
+from data.facet_index import pattern_matcher, PATTERN_FACETS, RANGE_COLUMN
+from data.snapshot import SNAPSHOT_DIR, snapshot_path
+
+TABLE = 'customers'
+LICENSE_TABLE = 'customer_licenses'
+
+# Only what filters and aggregates read is stored (the range column is a measure);
+# row-level data stays in the frame
+COLUMNS = list(DIMENSIONS.values()) + MEASURES
+
+# Indexed columns: the filter dimensions. The opt-potential range is left
+# unindexed; it usually spans most rows, where an index search is slower than a scan.
+INDEXED_COLUMNS = list(DIMENSIONS.values())
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _placeholders(values):
+    return ', '.join('?' for _ in values)
+
+class SqlSlice:
+    """Aggregates over the rows matching a WHERE clause
+
+    Same interface as data.cube.CubeSlice, answered with parameterized SQL.
+    """
+
+    def __init__(self, store, where, params):
+        self.store = store
+        self.where = where
+        self.params = list(params)
+
+    def _query(self, select):
+        return self.store.execute(f'SELECT {select} FROM {TABLE} WHERE {self.where}', self.params)
+
+    def count(self):
+        return int(self._query('COUNT(*)')[0][0])
+
+    def sum(self, measure):
+        total = self._query(f'TOTAL({_quote(measure)})')[0][0]
+        return float(total)
+
+    def mean(self, measure):
+        value = self._query(f'AVG({_quote(measure)})')[0][0]
+        return float('nan') if value is None else float(value)
+
+    def std(self, measure):
+        """Sample standard deviation (ddof=1), like Series.std()"""
+        column = _quote(measure)
+        n, total, squares = self._query(f'COUNT({column}), TOTAL({column}), TOTAL({column} * {column})')[0]
+        if n < 2:
+            return float('nan')
+        return float(math.sqrt(max(squares - total * total / n, 0.0) / (n - 1)))
+
+    def nunique(self, dimension):
+        column = _quote(DIMENSIONS[dimension])
+        return int(self._query(f'COUNT(DISTINCT {column})')[0][0])
+
+    def value_counts(self, dimension):
+        """Row counts per dimension value, largest first (ties in value order, like the cube)"""
+        name = DIMENSIONS[dimension]
+        column = _quote(name)
+        rows = self.store.execute(
+            f'SELECT {column}, COUNT(*) AS n FROM {TABLE} WHERE {self.where} AND {column} IS NOT NULL '
+            f'GROUP BY {column} ORDER BY n DESC, {column}',
+            self.params,
+        )
+        index = pd.Index([row[0] for row in rows], name=name)
+        return pd.Series([int(row[1]) for row in rows], index=index, name='Count', dtype='int64')
+
+    def group(self, dimension, aggregations):
+        """Per-dimension-value aggregates, e.g. ``{'Cloud_Optimization_Potential': 'mean'}``"""
+        name = DIMENSIONS[dimension]
+        column = _quote(name)
+        functions = {'mean': 'AVG', 'sum': 'TOTAL'}
+        selects = []
+        for measure, how in aggregations.items():
+            if how not in functions:
+                raise ValueError(f"Unsupported aggregation {how!r}")
+            selects.append(f'{functions[how]}({_quote(measure)})')
+        rows = self.store.execute(
+            f'SELECT {column}, {", ".join(selects)} FROM {TABLE} WHERE {self.where} AND {column} IS NOT NULL '
+            f'GROUP BY {column} ORDER BY {column}',
+            self.params,
+        )
+        index = pd.Index([row[0] for row in rows], name=name)
+        data = {measure: [row[i + 1] for row in rows] for i, measure in enumerate(aggregations)}
+        return pd.DataFrame(data, index=index, dtype='float64')
+
+class SqliteStore:
+    """Customer table in an indexed, file-based SQLite database
+
+    ``row_id`` is the row position in the in-memory frame, so row selections
+    are interchangeable with the pandas engine (FacetIndex.select). Filter
+    facets and page aggregations are translated to parameterized SQL. Each
+    thread of each process reads through its own read-only connection.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        connection = self._connection()
+        self._values = {
+            facet: [row[0] for row in connection.execute(
+                f'SELECT DISTINCT {_quote(column)} FROM {TABLE} WHERE {_quote(column)} IS NOT NULL '
+                f'ORDER BY {_quote(column)}')]
+            for facet, column in DIMENSIONS.items()
+        }
+        self._values['license'] = [
+            row[0] for row in connection.execute(f'SELECT DISTINCT token FROM {LICENSE_TABLE} ORDER BY token')
+        ]
+
+    @classmethod
+    def build(cls, df, path):
+        """Write ``df`` to a new database at ``path`` (replacing it atomically) and open it"""
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        columns = [col for col in COLUMNS if col in df.columns]
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.execute('PRAGMA journal_mode = OFF')
+            connection.execute('PRAGMA synchronous = OFF')
+            # row_id is the rowid alias, so license lookups go straight to the row
+            definitions = ['row_id INTEGER PRIMARY KEY'] + [
+                f'{_quote(col)} {"REAL" if pd.api.types.is_numeric_dtype(df[col]) else "TEXT"}' for col in columns
+            ]
+            connection.execute(f'CREATE TABLE {TABLE} ({", ".join(definitions)})')
+            connection.execute(f'CREATE TABLE {LICENSE_TABLE} (token TEXT, row_id INTEGER, '
+                               f'PRIMARY KEY (token, row_id)) WITHOUT ROWID')
+
+            frame = pd.DataFrame({'row_id': np.arange(len(df), dtype=np.int64)})
+            for col in columns:
+                series = df[col]
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    series = series.astype(object)
+                elif pd.api.types.is_float_dtype(series):
+                    series = series.astype('float64')
+                frame[col] = series.to_numpy()
+            frame.to_sql(TABLE, connection, index=False, if_exists='append', chunksize=50000)
+
+            tokens = df['License_Tokens']
+            lengths = tokens.map(len).to_numpy()
+            licenses = pd.DataFrame({
+                'token': [token for row in tokens for token in row],
+                'row_id': np.repeat(np.arange(len(df), dtype=np.int64), lengths),
+            }).drop_duplicates()
+            licenses.to_sql(LICENSE_TABLE, connection, index=False, if_exists='append', chunksize=50000)
+
+            for col in INDEXED_COLUMNS:
+                connection.execute(f'CREATE INDEX {_quote("idx_" + col)} ON {TABLE} ({_quote(col)})')
+            connection.execute('ANALYZE')
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_path, path)
+
+        stem = os.path.basename(path).rsplit('-', 1)[0]
+        for stale in glob.glob(os.path.join(os.path.dirname(path) or '.', f'{stem}-*.sqlite')):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        return cls(path)
+
+    def _connection(self):
+        # SQLite handles must not cross fork (gunicorn workers, job processes): reopen per process
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def execute(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    def where_clause(self, spec):
+        """``(sql, params)`` for a filter spec (see data.filter_state.make_filter_spec)
+
+        Pattern facets (region, license) are resolved to concrete values in
+        Python first, with the same case-insensitive matching as FacetIndex.
+        """
+        clauses, params = [], []
+        for facet, column in DIMENSIONS.items():
+            selected = (spec or {}).get(facet)
+            if not selected:
+                continue
+            if facet in PATTERN_FACETS:
+                matches = pattern_matcher(selected)
+                selected = [value for value in self._values[facet] if matches(str(value))]
+            if not selected:
+                return '0', []
+            clauses.append(f'{_quote(column)} IN ({_placeholders(selected)})')
+            params += list(selected)
+
+        licenses = (spec or {}).get('license')
+        if licenses:
+            matches = pattern_matcher(licenses)
+            tokens = [token for token in self._values['license'] if matches(token)]
+            if not tokens:
+                return '0', []
+            clauses.append(f'row_id IN (SELECT row_id FROM {LICENSE_TABLE} WHERE token IN ({_placeholders(tokens)}))')
+            params += tokens
+
+        opt_range = (spec or {}).get('opt_range')
+        if opt_range and len(opt_range) == 2:
+            clauses.append(f'{_quote(RANGE_COLUMN)} BETWEEN ? AND ?')
+            params += [float(opt_range[0]), float(opt_range[1])]
+
+        return (' AND '.join(clauses) or '1'), params
+
+    def values(self, facet):
+        """Distinct values of a facet, sorted (like FacetIndex.values)"""
+        return list(self._values[facet])
+
+    def option_counts(self, facet, spec=None):
+        """Matching rows per ``values(facet)`` entry under the other facets' selections
+
+        Each count is what selecting that value would match, so pattern facets
+        run one count per value with the selection's own pattern matching.
+        """
+        if facet in PATTERN_FACETS:
+            counts = []
+            for value in self._values[facet]:
+                where, params = self.where_clause({**(spec or {}), facet: [value]})
+                counts.append(self.execute(f'SELECT COUNT(*) FROM {TABLE} WHERE {where}', params)[0][0])
+            return np.array(counts, dtype=np.int64)
+        where, params = self.where_clause({**(spec or {}), facet: None})
+        column = _quote(DIMENSIONS[facet])
+        rows = self.execute(
+            f'SELECT {column}, COUNT(*) FROM {TABLE} WHERE {where} AND {column} IS NOT NULL GROUP BY {column}', params)
+        counts = dict(rows)
+        return np.array([counts.get(value, 0) for value in self._values[facet]], dtype=np.int64)
+
+    def select_rows(self, spec):
+        """Row positions (ascending) matching a filter spec"""
+        where, params = self.where_clause(spec)
+        rows = self.execute(f'SELECT row_id FROM {TABLE} WHERE {where} ORDER BY row_id', params)
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+    def slice(self, spec=None):
+        """SqlSlice (CubeSlice interface) for a filter spec"""
+        where, params = self.where_clause(spec)
+        return SqlSlice(self, where, params)
+
+def sqlite_path(csv_path, fingerprint, snapshot_dir=SNAPSHOT_DIR):
+    """Database file for a CSV's content hash, next to its Arrow snapshot"""
+    return os.path.splitext(snapshot_path(csv_path, fingerprint, snapshot_dir))[0] + '.sqlite'
+
+def open_store(df, csv_path, fingerprint, snapshot_dir=SNAPSHOT_DIR):
+    """SqliteStore for a dataset version, built on first use and reused by later boots"""
+    path = sqlite_path(csv_path, fingerprint, snapshot_dir)
+    if os.path.exists(path):
+        return SqliteStore(path)
+    return SqliteStore.build(df, path)
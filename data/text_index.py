@@ -0,0 +1,203 @@
+import bisect
+import re
+import numpy as np
+import pandas as pd
+
+# Narrative columns covered by the global search
+TEXT_FIELDS = ('Pain_Points', 'Trigger_Event', 'Overview', 'Product_Offering')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Expansions per prefix query (``migrat*``), most frequent terms first
+MAX_PREFIX_TERMS = 64
+
+# Dropped from free-text queries (phrases keep them)
+STOPWORDS = frozenset('a an and are as at be by for from in is of on or the to with'.split())
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_CLAUSE = re.compile(r'"([^"]*)"|(\S+)')
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+def parse_query(query):
+    """Query clauses: ``('phrase', terms)``, ``('prefix', stem)`` or ``('term', term)``
+
+    ``"data center"`` is a phrase, ``migrat*`` a prefix; other words are terms.
+    Every clause must match.
+    """
+    clauses = []
+    for phrase, word in _CLAUSE.findall(query or ''):
+        if phrase:
+            terms = tokenize(phrase)
+            if len(terms) > 1:
+                clauses.append(('phrase', tuple(terms)))
+            elif terms:
+                clauses.append(('term', terms[0]))
+            continue
+        prefix = word.endswith('*')
+        terms = tokenize(word)
+        if prefix and len(terms) == 1:
+            clauses.append(('prefix', terms[0]))
+        elif len(terms) > 1:
+            clauses.append(('phrase', tuple(terms)))  # e.g. "data-center"
+        elif terms and terms[0] not in STOPWORDS:
+            clauses.append(('term', terms[0]))
+    return clauses
+
+class TextIndex:
+    """BM25 inverted index over the narrative columns
+
+    Each distinct field value is tokenized once (positions kept for phrase
+    queries). Rows with the same four values form one group, so scoring
+    costs O(groups) and only the matching groups are expanded back to rows.
+    Document frequencies and lengths are counted over rows, so the ranking
+    is the same as indexing every row separately.
+    """
+
+    def __init__(self, df, fields=TEXT_FIELDS):
+        self.fields = [field for field in fields if field in df.columns]
+        self.n_rows = len(df)
+        # term -> field position -> {value code: token positions}
+        self.postings = {}
+        field_codes = []
+        value_lengths = []
+        for f, field in enumerate(self.fields):
+            codes, uniques = pd.factorize(df[field])
+            lengths = np.zeros(len(uniques) + 1, dtype=np.float64)  # Last slot: missing value
+            for code, text in enumerate(uniques):
+                tokens = tokenize(text)
+                lengths[code] = len(tokens)
+                positions = {}
+                for position, token in enumerate(tokens):
+                    positions.setdefault(token, []).append(position)
+                for token, found in positions.items():
+                    self.postings.setdefault(token, {}).setdefault(f, {})[code] = np.array(found, dtype=np.int32)
+            field_codes.append(codes)
+            value_lengths.append(lengths)
+        self.vocabulary = sorted(self.postings)
+
+        self.n_values = [len(lengths) - 1 for lengths in value_lengths]
+        # Group id per row: fold in one field at a time (mixed radix), refactorizing
+        # after each step so the combined key stays below n_rows * (n_values + 1)
+        group_of_row = np.zeros(self.n_rows, dtype=np.int64)
+        n_groups = 1 if self.n_rows else 0
+        for codes, n_values in zip(field_codes, self.n_values):
+            group_of_row, uniques = pd.factorize(group_of_row * (n_values + 1) + (codes + 1), sort=True)
+            n_groups = len(uniques)
+        first_rows = np.zeros(n_groups, dtype=np.int64)
+        first_rows[group_of_row[::-1]] = np.arange(self.n_rows - 1, -1, -1)
+        self.group_values = (
+            np.stack(field_codes, axis=1)[first_rows] if field_codes
+            else np.zeros((n_groups, 0), dtype=np.int64)
+        )
+        self.group_sizes = np.bincount(group_of_row, minlength=len(self.group_values)).astype(np.float64)
+        self.group_lengths = sum(
+            (lengths[self.group_values[:, f]] for f, lengths in enumerate(value_lengths)),
+            np.zeros(len(self.group_values)),
+        )
+        self.avg_length = float((self.group_lengths * self.group_sizes).sum() / self.n_rows) if self.n_rows else 0.0
+        # Rows of each group, in row order
+        self._row_order = np.argsort(group_of_row, kind='stable')
+        self._group_bounds = np.concatenate([[0], np.cumsum(self.group_sizes.astype(np.int64))])
+
+    def _value_tf(self, f, counts):
+        """Per-group term frequency from per-value counts of field ``f``"""
+        per_value = np.zeros(self.n_values[f] + 1)
+        per_value[list(counts)] = list(counts.values())
+        return per_value[self.group_values[:, f]]  # Missing (-1) reads the zero slot
+
+    def _term_tf(self, term):
+        tf = np.zeros(len(self.group_values))
+        for f, values in self.postings.get(term, {}).items():
+            tf += self._value_tf(f, {code: len(positions) for code, positions in values.items()})
+        return tf
+
+    def _prefix_tf(self, stem):
+        start = bisect.bisect_left(self.vocabulary, stem)
+        end = bisect.bisect_left(self.vocabulary, stem + '\uffff')
+        terms = self.vocabulary[start:end]
+        if len(terms) > MAX_PREFIX_TERMS:
+            frequency = {term: sum(len(values) for values in self.postings[term].values()) for term in terms}
+            terms = sorted(terms, key=frequency.get, reverse=True)[:MAX_PREFIX_TERMS]
+        tf = np.zeros(len(self.group_values))
+        for term in terms:
+            tf += self._term_tf(term)
+        return tf
+
+    def _phrase_tf(self, terms):
+        tf = np.zeros(len(self.group_values))
+        postings = [self.postings.get(term, {}) for term in terms]
+        for f in set.intersection(*(set(entry) for entry in postings)):
+            codes = set.intersection(*(set(entry[f]) for entry in postings))
+            counts = {}
+            for code in codes:
+                starts = postings[0][f][code]
+                for offset, entry in enumerate(postings[1:], start=1):
+                    starts = starts[np.isin(starts + offset, entry[f][code])]
+                if len(starts):
+                    counts[code] = len(starts)
+            if counts:
+                tf += self._value_tf(f, counts)
+        return tf
+
+    def _clause_tf(self, kind, value):
+        if kind == 'phrase':
+            return self._phrase_tf(value)
+        if kind == 'prefix':
+            return self._prefix_tf(value)
+        return self._term_tf(value)
+
+    def search(self, query, rows=None, limit=None):
+        """``(row positions, scores)`` for rows matching every clause, best first
+
+        ``rows`` restricts the result to already-filtered row positions (the
+        facet filters); ``limit`` keeps the top results only.
+        """
+        clauses = parse_query(query)
+        if not clauses or not len(self.group_values):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        scores = np.zeros(len(self.group_values))
+        matched = np.ones(len(self.group_values), dtype=bool)
+        norm = K1 * (1 - B + B * self.group_lengths / (self.avg_length or 1.0))
+        for kind, value in clauses:
+            tf = self._clause_tf(kind, value)
+            present = tf > 0
+            matched &= present
+            if not matched.any():
+                return np.zeros(0, dtype=np.int64), np.zeros(0)
+            df = self.group_sizes[present].sum()
+            idf = np.log(1 + (self.n_rows - df + 0.5) / (df + 0.5))
+            scores += idf * tf * (K1 + 1) / (tf + norm)
+
+        groups = np.flatnonzero(matched)
+        groups = groups[np.lexsort((self._row_order[self._group_bounds[groups]], -scores[groups]))]
+        # Expand the ranked groups to their rows without a Python loop
+        sizes = self.group_sizes[groups].astype(np.int64)
+        starts = np.repeat(self._group_bounds[groups] - (np.cumsum(sizes) - sizes), sizes)
+        result_rows = self._row_order[starts + np.arange(sizes.sum())]
+        result_scores = np.repeat(scores[groups], sizes)
+        if rows is not None:
+            keep = np.zeros(self.n_rows, dtype=bool)
+            keep[rows] = True
+            selected = keep[result_rows]
+            result_rows, result_scores = result_rows[selected], result_scores[selected]
+        if limit is not None:
+            result_rows, result_scores = result_rows[:limit], result_scores[:limit]
+        return result_rows, result_scores
+
+    def matched_terms(self, query):
+        """Index terms a query matches (for highlighting)"""
+        terms = set()
+        for kind, value in parse_query(query):
+            if kind == 'phrase':
+                terms.update(value)
+            elif kind == 'prefix':
+                start = bisect.bisect_left(self.vocabulary, value)
+                terms.update(self.vocabulary[start:bisect.bisect_left(self.vocabulary, value + '\uffff')])
+            else:
+                terms.add(value)
+        return terms
@@ -0,0 +1,76 @@
+"""Gunicorn settings for the dashboard (``gunicorn -c gunicorn.conf.py app:server``)
+
+The app is preloaded in the master: the dataset, facet index, cube and caches
+are built once and the forked workers share those pages copy-on-write.
+Numeric and categorical columns are NumPy arrays (or zero-copy views on the
+memory-mapped Arrow snapshot), so reading them never dirties shared pages.
+Reloads happen in the master only. Its watcher thread (DATA_WATCH_INTERVAL)
+rebuilds the dataset when the file changed and, once a new version is
+swapped in, sends the master SIGHUP; POST /admin/reload sends SIGHUP when the
+file's contents changed, and ``on_reload`` rebuilds the dataset. Either way
+the master first warms the filter states its workers used most recently,
+then gunicorn forks new workers that share the new version and its warm
+caches and gracefully stops the old ones. ``kill -HUP <master>`` reloads by hand.
+
+The garbage collector is off while the config and the preloaded app are
+imported, and frozen before forking so collections in a worker do not touch
+(and copy) the inherited objects.
+
+Settings can be overridden with GUNICORN_WORKERS, GUNICORN_THREADS,
+GUNICORN_TIMEOUT and GUNICORN_PRELOAD=false.
+"""
+import gc
+import os
+import shutil
+import signal
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8050')}"
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# /metrics aggregates the callback metrics of all workers through this directory.
+# Counters restart with the server, so files left by a previous run are dropped
+# here: the config is imported before the preloaded app creates the directory.
+# SIGHUP re-imports the config; the counters survive that
+os.environ.setdefault('METRICS_DIR', os.path.join('/tmp', 'dashboard-metrics'))
+if not os.environ.get('METRICS_DIR_RESET'):
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+    os.environ['METRICS_DIR_RESET'] = '1'
+
+# Tells app.py that the master owns dataset reloads (no watcher in the app)
+if preload_app:
+    os.environ['DATA_RELOAD_MODE'] = 'master'
+
+# No collections while the shared state is built (keeps it compact and untouched)
+gc.disable()
+
+def when_ready(server):
+    if preload_app:
+        import app
+
+        def reload_and_refork():
+            # A touched but unchanged file keeps the current workers
+            if app.datasets.reload():
+                os.kill(server.pid, signal.SIGHUP)
+
+        app.datasets.watch(float(os.getenv('DATA_WATCH_INTERVAL', 60)), on_change=reload_and_refork)
+
+def on_reload(server):
+    # Runs in the master on SIGHUP, before the replacement workers are forked;
+    # a no-op when the watcher already swapped the new version in
+    if preload_app:
+        import app
+        app.datasets.reload()
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the collector's reach; the master
+    # and the forked worker then collect only what they allocate afterwards
+    gc.freeze()
+    gc.enable()
+
+def post_fork(server, worker):
+    if preload_app:
+        import app
+        app.datasets.after_fork()
@@ -0,0 +1,276 @@
+import functools
+import glob
+import json
+import os
+import threading
+import time
+from flask import request
+from dash.exceptions import PreventUpdate
+from monitoring.timing import is_job_poll, record_phases
+
+# Histogram upper bounds (the +Inf bucket is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# metric name -> (help text, buckets)
+HISTOGRAMS = {
+    'dash_callback_duration_seconds': ("Callback execution time, including JSON serialization", LATENCY_BUCKETS),
+    'dash_callback_request_bytes': ("Size of the callback request body (inputs and state)", BYTES_BUCKETS),
+    'dash_callback_response_bytes': ("Size of the serialized callback response", BYTES_BUCKETS),
+}
+COUNTERS = {
+    'dash_callback_errors_total': "Callbacks that raised an exception (PreventUpdate excluded)",
+    'dash_callback_prevented_total': "Callbacks that raised PreventUpdate",
+}
+# Background jobs, labelled by phase ('total' is the whole job)
+JOB_HISTOGRAMS = {
+    'dash_job_duration_seconds': ("Background job time, in total and per phase", LATENCY_BUCKETS),
+}
+JOB_COUNTERS = {
+    'dash_job_errors_total': "Background jobs that raised an exception (PreventUpdate excluded)",
+}
+
+def _empty_histogram(buckets):
+    return {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+
+def _observe(histogram, buckets, value):
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            histogram['buckets'][i] += 1
+            break
+    else:
+        histogram['buckets'][-1] += 1
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _merge(total, entry, histograms, counters):
+    for name in histograms:
+        total[name]['buckets'] = [a + b for a, b in zip(total[name]['buckets'], entry[name]['buckets'])]
+        total[name]['sum'] += entry[name]['sum']
+        total[name]['count'] += entry[name]['count']
+    for name in counters:
+        total[name] += entry[name]
+
+def _render(lines, series, histograms, counters):
+    for name, (help_text, buckets) in histograms.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for entry in series:
+            labels = ','.join(f'{key}="{_escape(value)}"' for key, value in entry['labels'].items())
+            histogram = entry[name]
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], histogram['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram["sum"]}')
+            lines.append(f'{name}_count{{{labels}}} {histogram["count"]}')
+    for name, help_text in counters.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for entry in series:
+            labels = ','.join(f'{key}="{_escape(value)}"' for key, value in entry['labels'].items())
+            lines.append(f'{name}{{{labels}}} {entry[name]}')
+
+class CallbackMetrics:
+    """Per-callback latency / payload histograms and error counters, plus the
+    duration (total and per phase) of background jobs
+
+    Each process keeps its own series. With ``directory`` set (one directory
+    shared by all gunicorn workers) a process writes its series to
+    ``metrics-<pid>.json`` at most every ``flush_interval`` seconds, and
+    ``render`` merges every worker's file, so any worker can answer /metrics
+    for the whole server. Files of exited workers are kept: their counts
+    stay part of the totals, like Prometheus' multiprocess mode. Jobs run in
+    short-lived processes, so each one writes a ``job-*.json`` record that
+    the next ``collect`` in any worker folds into that worker's series; job
+    metrics need ``directory``.
+    """
+
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._series = {}
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _entry(self, callback, output):
+        key = (callback, output)
+        entry = self._series.get(key)
+        if entry is None:
+            entry = {
+                'labels': {'callback': callback, 'output': output},
+                **{name: _empty_histogram(buckets) for name, (_, buckets) in HISTOGRAMS.items()},
+                **{name: 0 for name in COUNTERS},
+            }
+            self._series[key] = entry
+        return entry
+
+    def observe(self, callback, output, seconds, request_bytes, response_bytes, error=False, prevented=False):
+        with self._lock:
+            entry = self._entry(callback, output)
+            _observe(entry['dash_callback_duration_seconds'], LATENCY_BUCKETS, seconds)
+            _observe(entry['dash_callback_request_bytes'], BYTES_BUCKETS, request_bytes)
+            if response_bytes is not None:
+                _observe(entry['dash_callback_response_bytes'], BYTES_BUCKETS, response_bytes)
+            if error:
+                entry['dash_callback_errors_total'] += 1
+            if prevented:
+                entry['dash_callback_prevented_total'] += 1
+            if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def _job_entry(self, callback, output, phase):
+        key = (callback, output, phase)
+        entry = self._jobs.get(key)
+        if entry is None:
+            entry = {
+                'labels': {'callback': callback, 'output': output, 'phase': phase},
+                **{name: _empty_histogram(buckets) for name, (_, buckets) in JOB_HISTOGRAMS.items()},
+                **{name: 0 for name in JOB_COUNTERS},
+            }
+            self._jobs[key] = entry
+        return entry
+
+    def observe_job(self, callback, output, seconds, phases, error=False):
+        """Record one finished job (called in the job process)"""
+        if not self.directory:
+            return
+        record = {'callback': callback, 'output': output, 'seconds': seconds, 'phases': phases, 'error': error}
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'job-{os.getpid()}-{time.monotonic_ns()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(record, fh)
+        os.replace(tmp_path, path)
+
+    def _fold_job_records_locked(self):
+        for path in glob.glob(os.path.join(self.directory, 'job-*.json')):
+            # Renaming claims the record, so exactly one worker folds it in
+            claimed = f'{path}.{os.getpid()}'
+            try:
+                os.rename(path, claimed)
+                with open(claimed) as fh:
+                    record = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            finally:
+                if os.path.exists(claimed):
+                    os.remove(claimed)
+            for phase, seconds in [('total', record['seconds']), *record['phases'].items()]:
+                entry = self._job_entry(record['callback'], record['output'], phase)
+                _observe(entry['dash_job_duration_seconds'], LATENCY_BUCKETS, seconds)
+            if record['error']:
+                self._job_entry(record['callback'], record['output'], 'total')['dash_job_errors_total'] += 1
+
+    def _flush_locked(self):
+        # The directory may have been cleared since __init__ (e.g. on server start)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump({'callbacks': list(self._series.values()), 'jobs': list(self._jobs.values())}, fh)
+        os.replace(tmp_path, path)
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        if self.directory:
+            with self._lock:
+                self._flush_locked()
+
+    def collect(self):
+        """Callback and job series merged over every worker (or this process only, without a directory)"""
+        if not self.directory:
+            with self._lock:
+                return json.loads(json.dumps(list(self._series.values()))), []
+
+        with self._lock:
+            self._fold_job_records_locked()
+            self._flush_locked()
+        callbacks, jobs = {}, {}
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                with open(path) as fh:
+                    series = json.load(fh)
+            except (OSError, ValueError):
+                continue  # Worker replaced its file mid-read; picked up next scrape
+            for merged, entries, histograms, counters in (
+                (callbacks, series['callbacks'], HISTOGRAMS, COUNTERS),
+                (jobs, series['jobs'], JOB_HISTOGRAMS, JOB_COUNTERS),
+            ):
+                for entry in entries:
+                    key = tuple(entry['labels'].values())
+                    if key in merged:
+                        _merge(merged[key], entry, histograms, counters)
+                    else:
+                        merged[key] = entry
+        return list(callbacks.values()), list(jobs.values())
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        callbacks, jobs = self.collect()
+        lines = []
+        _render(lines, sorted(callbacks, key=lambda entry: tuple(entry['labels'].values())), HISTOGRAMS, COUNTERS)
+        _render(lines, sorted(jobs, key=lambda entry: tuple(entry['labels'].values())), JOB_HISTOGRAMS, JOB_COUNTERS)
+        return '\n'.join(lines) + '\n'
+
+    def instrument_job(self, func, output):
+        """Wrap a background job's function so the job records its own duration
+        and ``phase`` breakdown (the requests polling it are not recorded)"""
+        @functools.wraps(func)
+        def instrumented(*args, **kwargs):
+            start = time.perf_counter()
+            error = False
+            with record_phases() as phases:
+                try:
+                    return func(*args, **kwargs)
+                except PreventUpdate:
+                    raise
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    self.observe_job(func.__name__, output, time.perf_counter() - start, phases, error=error)
+        return instrumented
+
+def _first_output(callback_id):
+    """'..a.b...c.d..' -> 'a.b' (multi-output ids list every output)"""
+    return callback_id.strip('.').split('...')[0]
+
+def instrument_callbacks(app, metrics):
+    """Wrap every registered Dash callback so each call is recorded in ``metrics``
+
+    Call after all callbacks are registered. The wrapped function is the one
+    the Dash dispatcher invokes; it returns the serialized JSON response, so
+    its length is the response payload size. Requests polling a background
+    job are skipped, so a job counts once (the request that started it).
+    """
+    for callback_id, spec in app.callback_map.items():
+        func = spec['callback']
+        if getattr(func, '_metrics_instrumented', False):
+            continue
+
+        def instrumented(*args, _func=func, _callback_id=callback_id, **kwargs):
+            if is_job_poll():
+                return _func(*args, **kwargs)
+            name = getattr(_func, '__name__', 'callback')
+            output = _first_output(_callback_id)
+            request_bytes = request.content_length or 0
+            start = time.perf_counter()
+            try:
+                response = _func(*args, **kwargs)
+            except PreventUpdate:
+                metrics.observe(name, output, time.perf_counter() - start, request_bytes, None, prevented=True)
+                raise
+            except Exception:
+                metrics.observe(name, output, time.perf_counter() - start, request_bytes, None, error=True)
+                raise
+            metrics.observe(name, output, time.perf_counter() - start, request_bytes, len(response))
+            return response
+
+        functools.update_wrapper(instrumented, func)
+        instrumented._metrics_instrumented = True
+        spec['callback'] = instrumented
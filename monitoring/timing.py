@@ -0,0 +1,125 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+
+# Server-Timing metric names, in header order
+PHASES = ('deserialize', 'filter', 'aggregate', 'figure', 'serialize')
+
+slow_request_logger = logging.getLogger('dashboard.slow_requests')
+
+# Phase totals of the block running under record_phases, per thread
+_recorded = threading.local()
+
+@contextmanager
+def record_phases():
+    """Collect the phases of a block that runs outside a request (a background job)
+
+    Yields the ``{phase: seconds}`` dict the block's ``phase`` calls add to.
+    """
+    phases = {}
+    _recorded.phases = phases
+    try:
+        yield phases
+    finally:
+        _recorded.phases = None
+
+def is_job_poll():
+    """Whether the current request polls a background job (``cacheKey``/``job`` query)
+    rather than running a callback"""
+    return 'cacheKey' in request.args or 'job' in request.args
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to the current request's ``name`` phase
+
+    Inside record_phases the time goes to that block's phases instead (a job
+    process forked in a request still sees that request's context). Otherwise,
+    outside a request (startup, benchmarks), this only runs the block.
+    """
+    timings = getattr(_recorded, 'phases', None)
+    if timings is None and has_request_context():
+        timings = getattr(g, 'server_timing', None)
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+def _install_serialization_timer():
+    """Time Dash's callback response serialization as the ``serialize`` phase
+
+    Dash serializes callback output inside its own wrapper, through the
+    module-level ``to_json`` of ``dash._callback`` (Dash 2.x); it is wrapped
+    once so the phase can be separated from the callback body.
+    """
+    import dash._callback as dash_callback
+
+    if getattr(dash_callback.to_json, '_timed', False):
+        return
+    to_json = dash_callback.to_json
+
+    def timed_to_json(value):
+        with phase('serialize'):
+            return to_json(value)
+
+    timed_to_json._timed = True
+    dash_callback.to_json = timed_to_json
+
+def _truncate(value, limit=200):
+    text = json.dumps(value, default=str)
+    return text if len(text) <= limit else text[:limit] + '...'
+
+def init_request_timing(server, slow_threshold_ms=500):
+    """Emit ``Server-Timing`` headers and log slow Dash callback requests
+
+    Every response gets one ``<phase>;dur=<ms>`` entry per phase that ran plus
+    ``total``. ``_dash-update-component`` requests slower than
+    ``slow_threshold_ms`` are logged as one JSON line with the callback
+    output, the triggering input(s) and the phase breakdown. Background job
+    polls are not logged; the job records its own duration and phases (see
+    CallbackMetrics.instrument_job).
+    """
+    _install_serialization_timer()
+
+    @server.before_request
+    def start_request_timer():
+        g.server_timing = {}
+        g.request_started = time.perf_counter()
+        if request.path.endswith('_dash-update-component'):
+            # Parsed once here; Dash's dispatcher reuses Flask's cached JSON
+            with phase('deserialize'):
+                request.get_json(silent=True)
+
+    @server.after_request
+    def add_server_timing(response):
+        started = getattr(g, 'request_started', None)
+        if started is None:
+            return response
+        total_ms = (time.perf_counter() - started) * 1000
+        timings = {name: seconds * 1000 for name, seconds in g.server_timing.items()}
+
+        entries = [f'{name};dur={timings[name]:.2f}' for name in PHASES if name in timings]
+        entries.append(f'total;dur={total_ms:.2f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+
+        if request.path.endswith('_dash-update-component') and total_ms >= slow_threshold_ms and not is_job_poll():
+            body = request.get_json(silent=True) or {}
+            changed = body.get('changedPropIds', [])
+            inputs = {f"{item.get('id')}.{item.get('property')}": item.get('value')
+                      for item in body.get('inputs', []) if isinstance(item, dict)}
+            slow_request_logger.warning(json.dumps({
+                'event': 'slow_callback',
+                'output': body.get('output'),
+                'triggered': [{'prop_id': prop_id, 'value': _truncate(inputs.get(prop_id))} for prop_id in changed],
+                'status': response.status_code,
+                'duration_ms': round(total_ms, 2),
+                'phases_ms': {name: round(ms, 2) for name, ms in timings.items()},
+                'response_bytes': response.calculate_content_length(),
+            }))
+        return response
@@ -1,46 +1,166 @@
 import dash_bootstrap_components as dbc
 from dash import html, dcc
+import numpy as np
 import pandas as pd
 from components.charts import *
 from components.demo_notice import create_demo_notice
+from data.cube import AggregateCube
+from data.leaderboard import LEADERBOARD_DEFAULT_METRIC, LEADERBOARD_METRICS, LEADERBOARD_SIZES, top_k
+from data.sampling import WEIGHT, format_estimate
 
-def create_analytics_layout(df):
-    """Create the analytics deep-dive page"""
+def _value_counts(df, values):
+    """values.value_counts(), weighted by the sample weights of an approximate (sampled) frame"""
+    if WEIGHT not in df:
+        return values.value_counts()
+    weights = df[WEIGHT].loc[values.index].to_numpy()
+    counts = pd.Series(weights).groupby(values.to_numpy()).sum().round().astype('int64')
+    return counts.sort_values(ascending=False, kind='stable').rename('count')
 
-    # Prepare data for advanced analytics
-
-    # 1. License ecosystem breakdown - OPTIMIZED
-    # Use vectorized operations instead of loops
-    license_series = df['License_Ecosystem'].str.split(',').explode().str.strip()
-    license_counts = license_series.value_counts().reset_index()
+def license_counts_frame(df):
+    """Customers per license system (tokens are split once at load time)"""
+    license_counts = _value_counts(df, df['License_Tokens'].explode().dropna()).reset_index()
     license_counts.columns = ['License', 'Count']
+    return license_counts
+
+def decision_maker_frame(df):
+    """Customers per decision-maker role"""
+    decision_makers = _value_counts(df, df['Decision_Maker'])
+    decision_makers = decision_makers[decision_makers > 0].reset_index()
+    decision_makers.columns = ['Role', 'Count']
+    return decision_makers
+
+def analytics_stats(summary):
+    """Stat card values keyed by component id (with 95% margins for a sample estimate)"""
+    if summary.count() == 0:
+        avg_cloud, avg_elo = "-", "-"
+    else:
+        avg_cloud = f"{summary.mean('Cloud_Optimization_Potential'):.1f}%"
+        avg_elo = f"{summary.mean('ELO_Optimization_Potential'):.1f}%"
+        if getattr(summary, 'approximate', False):
+            avg_cloud = format_estimate(avg_cloud, summary.mean_margin('Cloud_Optimization_Potential'), '.1f', '%')
+            avg_elo = format_estimate(avg_elo, summary.mean_margin('ELO_Optimization_Potential'), '.1f', '%')
+    return {
+        'stat-unique-industries': f"{summary.nunique('industry')}",
+        'stat-cloud-platforms': f"{summary.nunique('cloud')}",
+        'stat-avg-cloud-opt': avg_cloud,
+        'stat-avg-elo-opt': avg_elo,
+    }
 
-    # 2. Regional analysis - OPTIMIZED
-    # Use vectorized string operations
-    df['Region_Clean'] = df['Geographical_Presence'].str.split('operates across', n=1).str[-1].str.strip()
-    df['Region_Clean'] = df['Region_Clean'].fillna('Unknown')
+def license_breakdown_figure(df, summary):
+    """License ecosystem usage"""
+    return create_bar_chart(license_counts_frame(df), 'License', 'Count', '', COLORS['accent1'])
 
-    region_summary = df.groupby('Region_Clean').agg({
+def region_optimization_figure(df, summary):
+    """Average Cloud & ELO optimization potential by region (rolled up from the cube)"""
+    region_summary = summary.group('region', {
         'Total_Optimization_Potential': 'mean',
         'Cloud_Optimization_Potential': 'mean',
         'ELO_Optimization_Potential': 'mean'
     }).round(1).reset_index()
     region_summary.columns = ['Region', 'Avg Total %', 'Avg Cloud %', 'Avg ELO %']
+    return create_grouped_bar_chart(region_summary.head(10), 'Region', ['Avg Cloud %', 'Avg ELO %'], '')
 
-    # 3. Cloud vs ELO comparison by industry
-    opt_comparison = df.groupby('Industry_Vertical').agg({
+def cloud_vs_elo_figure(df, summary):
+    """Total Cloud vs ELO optimization potential by industry"""
+    opt_comparison = summary.group('industry', {
         'Cloud_Optimization_Potential': 'sum',
         'ELO_Optimization_Potential': 'sum'
     }).reset_index()
     opt_comparison.columns = ['Industry', 'Total Cloud Opt', 'Total ELO Opt']
+    return create_stacked_bar_chart(opt_comparison.head(10), 'Industry', ['Total Cloud Opt', 'Total ELO Opt'], '')
 
-    # 4. Decision maker distribution
-    decision_makers = df['Decision_Maker'].value_counts().reset_index()
-    decision_makers.columns = ['Role', 'Count']
+def decision_makers_figure(df, summary):
+    """Decision maker distribution"""
+    return create_pie_chart(decision_maker_frame(df), 'Role', 'Count', '')
+
+# Graph id -> figure builder; filter changes re-run only these and patch the figures
+ANALYTICS_FIGURES = {
+    'chart-license-breakdown': license_breakdown_figure,
+    'chart-region-optimization': region_optimization_figure,
+    'chart-cloud-vs-elo': cloud_vs_elo_figure,
+    'chart-decision-makers': decision_makers_figure,
+}
+
+def analytics_insights(df, summary):
+    """Key-insight list items for the filtered rows"""
+    if len(df) == 0:
+        return [html.Li("No customers match the current filters.")]
+
+    license_counts = license_counts_frame(df)
+    decision_makers = decision_maker_frame(df)
+    industry_counts = summary.value_counts('industry')
 
-    # 5. Trigger events analysis
-    trigger_counts = df['Trigger_Event'].value_counts().head(10).reset_index()
-    trigger_counts.columns = ['Trigger', 'Count']
+    items = []
+    if len(license_counts):
+        items.append(html.Li([
+            html.Strong("Top License System: "),
+            f"{license_counts.iloc[0]['License']} used by {license_counts.iloc[0]['Count']} customers"
+        ], className="mb-2"))
+    items += [
+        html.Li([
+            html.Strong("Highest Cloud Optimization: "),
+            f"{df.loc[df['Cloud_Optimization_Potential'].idxmax()]['Customer_Name']} "
+            f"with {df['Cloud_Optimization_Potential'].max()}% potential"
+        ], className="mb-2"),
+        html.Li([
+            html.Strong("Highest ELO Optimization: "),
+            f"{df.loc[df['ELO_Optimization_Potential'].idxmax()]['Customer_Name']} "
+            f"with {df['ELO_Optimization_Potential'].max()}% potential"
+        ], className="mb-2"),
+    ]
+    if len(decision_makers):
+        items.append(html.Li([
+            html.Strong("Most Common Decision Maker: "),
+            f"{decision_makers.iloc[0]['Role']} ({decision_makers.iloc[0]['Count']} customers)"
+        ], className="mb-2"))
+    if len(industry_counts):
+        items.append(html.Li([
+            html.Strong("Top Industry: "),
+            f"{industry_counts.index[0]} "
+            f"with {industry_counts.iloc[0]} customers"
+        ]))
+    return items
+
+def create_leaderboard(df, rows, metric):
+    """Ranked table of the customers at ``rows`` (row positions in ``df``, best first)"""
+    if len(rows) == 0:
+        return dbc.Alert("No customers match the current filters.", color="light", className="mb-0")
+    label, _ = LEADERBOARD_METRICS[metric]
+    top = df.iloc[rows][['Customer_Name', 'Industry_Vertical', 'Cloud_Platforms', metric]]
+    header = html.Thead(html.Tr([html.Th("#"), html.Th("Customer"), html.Th("Industry"), html.Th("Cloud"), html.Th(label)]))
+    body = html.Tbody([
+        html.Tr([
+            html.Td(rank),
+            html.Td(customer['Customer_Name']),
+            html.Td(customer['Industry_Vertical']),
+            html.Td(customer['Cloud_Platforms']),
+            html.Td(f"{customer[metric]:,.1f}", className="fw-bold"),
+        ])
+        for rank, (_, customer) in enumerate(top.iterrows(), start=1)
+    ])
+    return dbc.Table([header, body], size="sm", hover=True, striped=True, responsive=True, className="mb-0")
+
+def create_leaderboard_placeholder():
+    """Shown in approximate mode until the exact ranking for the current filters arrives"""
+    return dbc.Alert("Ranking the matching customers once the filters stop changing...",
+                     color="light", className="mb-0")
+
+def create_analytics_layout(df, summary=None, leaderboard=None):
+    """Create the analytics deep-dive page
+
+    Regional and industry aggregates are rolled up from ``summary`` (a CubeSlice
+    for the current filter); ``df`` holds the filtered rows. Later filter
+    changes update the stat values, figures and insights in place.
+    """
+    if summary is None:
+        summary = AggregateCube.from_frame(df).slice()
+
+    stats = analytics_stats(summary)
+    metric = LEADERBOARD_DEFAULT_METRIC
+    if leaderboard is None:
+        rows = top_k(df[metric].to_numpy(), np.arange(len(df)), LEADERBOARD_SIZES[0], LEADERBOARD_METRICS[metric][1])
+        leaderboard = create_leaderboard(df, rows, metric)
+    figures = {graph_id: build(df, summary) for graph_id, build in ANALYTICS_FIGURES.items()}
 
     layout = dbc.Container(
         [
@@ -67,7 +187,7 @@ def create_analytics_layout(df):
                             dbc.CardBody(
                                 [
                                     html.H6("Unique Industries", className="text-muted mb-2"),
-                                    html.H3(f"{df['Industry_Vertical'].nunique()}", className="mb-0 text-primary"),
+                                    html.H3(stats['stat-unique-industries'], id='stat-unique-industries', className="mb-0 text-primary"),
                                 ]
                             ),
                             className="text-center shadow-sm"
@@ -79,7 +199,7 @@ def create_analytics_layout(df):
                             dbc.CardBody(
                                 [
                                     html.H6("Cloud Platforms", className="text-muted mb-2"),
-                                    html.H3(f"{df['Cloud_Platforms'].nunique()}", className="mb-0 text-info"),
+                                    html.H3(stats['stat-cloud-platforms'], id='stat-cloud-platforms', className="mb-0 text-info"),
                                 ]
                             ),
                             className="text-center shadow-sm"
@@ -91,7 +211,7 @@ def create_analytics_layout(df):
                             dbc.CardBody(
                                 [
                                     html.H6("Avg Cloud Opt", className="text-muted mb-2"),
-                                    html.H3(f"{df['Cloud_Optimization_Potential'].mean():.1f}%", className="mb-0 text-success"),
+                                    html.H3(stats['stat-avg-cloud-opt'], id='stat-avg-cloud-opt', className="mb-0 text-success"),
                                 ]
                             ),
                             className="text-center shadow-sm"
@@ -103,7 +223,7 @@ def create_analytics_layout(df):
                             dbc.CardBody(
                                 [
                                     html.H6("Avg ELO Opt", className="text-muted mb-2"),
-                                    html.H3(f"{df['ELO_Optimization_Potential'].mean():.1f}%", className="mb-0 text-warning"),
+                                    html.H3(stats['stat-avg-elo-opt'], id='stat-avg-elo-opt', className="mb-0 text-warning"),
                                 ]
                             ),
                             className="text-center shadow-sm"
@@ -113,6 +233,53 @@ def create_analytics_layout(df):
                 ],
             ),
 
+            # Leaderboard: top customers by a metric within the current filter
+            dbc.Row(
+                dbc.Col(
+                    dbc.Card(
+                        [
+                            dbc.CardHeader(
+                                dbc.Row(
+                                    [
+                                        dbc.Col(html.H5("Leaderboard", className="mb-0"), md=6, xs=12),
+                                        dbc.Col(
+                                            dcc.Dropdown(
+                                                id='leaderboard-metric',
+                                                options=[
+                                                    {'label': label, 'value': column}
+                                                    for column, (label, _) in LEADERBOARD_METRICS.items()
+                                                ],
+                                                value=metric,
+                                                clearable=False,
+                                                className="filter-dropdown"
+                                            ),
+                                            md=4, xs=8
+                                        ),
+                                        dbc.Col(
+                                            dcc.Dropdown(
+                                                id='leaderboard-size',
+                                                options=[{'label': f"Top {size}", 'value': size} for size in LEADERBOARD_SIZES],
+                                                value=LEADERBOARD_SIZES[0],
+                                                clearable=False,
+                                                className="filter-dropdown"
+                                            ),
+                                            md=2, xs=4
+                                        ),
+                                    ],
+                                    className="align-items-center"
+                                )
+                            ),
+                            dbc.CardBody(
+                                html.Div(leaderboard, id='leaderboard'),
+                                style={'maxHeight': '600px', 'overflowY': 'auto'}
+                            ),
+                        ],
+                        className="shadow-sm"
+                    ),
+                    xs=12, className="mb-5"
+                ),
+            ),
+
             # Chart 1: License Ecosystem Usage
             dbc.Row(
                 dbc.Col(
@@ -122,13 +289,7 @@ def create_analytics_layout(df):
                                 html.H5("License Ecosystem Usage", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-license-breakdown',
-                                    figure=create_bar_chart(
-                                        license_counts,
-                                        'License',
-                                        'Count',
-                                        '',
-                                        COLORS['accent1']
-                                    ),
+                                    figure=figures['chart-license-breakdown'],
                                     config={'displayModeBar': False},
                                     style={'height': '600px'}
                                 )
@@ -149,12 +310,7 @@ def create_analytics_layout(df):
                                 html.H5("Optimization Potential by Region", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-region-optimization',
-                                    figure=create_grouped_bar_chart(
-                                        region_summary.head(10),
-                                        'Region',
-                                        ['Avg Cloud %', 'Avg ELO %'],
-                                        ''
-                                    ),
+                                    figure=figures['chart-region-optimization'],
                                     config={'displayModeBar': False},
                                     style={'height': '700px'}
                                 )
@@ -175,12 +331,7 @@ def create_analytics_layout(df):
                                 html.H5("Total Optimization Potential: Cloud vs ELO by Industry", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-cloud-vs-elo',
-                                    figure=create_stacked_bar_chart(
-                                        opt_comparison.head(10),
-                                        'Industry',
-                                        ['Total Cloud Opt', 'Total ELO Opt'],
-                                        ''
-                                    ),
+                                    figure=figures['chart-cloud-vs-elo'],
                                     config={'displayModeBar': False},
                                     style={'height': '650px'}
                                 )
@@ -201,12 +352,7 @@ def create_analytics_layout(df):
                                 html.H5("Decision Maker Distribution", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-decision-makers',
-                                    figure=create_pie_chart(
-                                        decision_makers,
-                                        'Role',
-                                        'Count',
-                                        ''
-                                    ),
+                                    figure=figures['chart-decision-makers'],
                                     config={'displayModeBar': False},
                                     style={'height': '600px'}
                                 )
@@ -230,31 +376,8 @@ def create_analytics_layout(df):
                             dbc.CardBody(
                                 [
                                     html.Ul(
-                                        [
-                                            html.Li([
-                                                html.Strong("Top License System: "),
-                                                f"{license_counts.iloc[0]['License']} used by {license_counts.iloc[0]['Count']} customers"
-                                            ], className="mb-2"),
-                                            html.Li([
-                                                html.Strong("Highest Cloud Optimization: "),
-                                                f"{df.loc[df['Cloud_Optimization_Potential'].idxmax()]['Customer_Name']} "
-                                                f"with {df['Cloud_Optimization_Potential'].max()}% potential"
-                                            ], className="mb-2"),
-                                            html.Li([
-                                                html.Strong("Highest ELO Optimization: "),
-                                                f"{df.loc[df['ELO_Optimization_Potential'].idxmax()]['Customer_Name']} "
-                                                f"with {df['ELO_Optimization_Potential'].max()}% potential"
-                                            ], className="mb-2"),
-                                            html.Li([
-                                                html.Strong("Most Common Decision Maker: "),
-                                                f"{decision_makers.iloc[0]['Role']} ({decision_makers.iloc[0]['Count']} customers)"
-                                            ], className="mb-2"),
-                                            html.Li([
-                                                html.Strong("Top Industry: "),
-                                                f"{df['Industry_Vertical'].value_counts().index[0]} "
-                                                f"with {df['Industry_Vertical'].value_counts().values[0]} customers"
-                                            ]),
-                                        ],
+                                        analytics_insights(df, summary),
+                                        id='analytics-insights',
                                         className="insights-list"
                                     )
                                 ]
@@ -1,62 +1,115 @@
+from collections import Counter
 import dash_bootstrap_components as dbc
 from dash import html, dcc, dash_table
 import pandas as pd
 from components.demo_notice import create_demo_notice
+from data.loader import to_records, source_columns
 
-def create_customer_details_layout(df):
-    """Create the customer details page with interactive table"""
+# Columns for the data table - COMPREHENSIVE VIEW (FIXED: removed invalid 'width' property)
+TABLE_COLUMNS = [
+    {"name": "Sr No", "id": "Sr_No", "type": "numeric"},
+    {"name": "Customer Name", "id": "Customer_Name", "type": "text"},
+    {"name": "Industry", "id": "Industry_Vertical", "type": "text"},
+    {"name": "Cloud Platform", "id": "Cloud_Platforms", "type": "text"},
+
+    # Financial Metrics
+    {"name": "IT Spend ($M)", "id": "Annual_IT_Spend_M", "type": "numeric", "format": {"specifier": ",.0f"}},
+    {"name": "Cloud Spend ($M)", "id": "Current_Cloud_Spend_M", "type": "numeric", "format": {"specifier": ",.2f"}},
+    {"name": "License Spend ($M)", "id": "Current_License_Spend_M", "type": "numeric", "format": {"specifier": ",.2f"}},
+    {"name": "Cloud Savings ($M)", "id": "Potential_Cloud_Savings_M", "type": "numeric", "format": {"specifier": ",.2f"}},
+    {"name": "License Savings ($M)", "id": "Potential_License_Savings_M", "type": "numeric", "format": {"specifier": ",.2f"}},
+    {"name": "Total Savings ($M)", "id": "Total_Potential_Savings_M", "type": "numeric", "format": {"specifier": ",.2f"}},
+
+    # Optimization Percentages
+    {"name": "Cloud Opt %", "id": "Cloud_Optimization_Potential", "type": "numeric"},
+    {"name": "ELO Opt %", "id": "ELO_Optimization_Potential", "type": "numeric"},
+    {"name": "Total Opt %", "id": "Total_Optimization_Potential", "type": "numeric"},
+
+    # Organization Metrics
+    {"name": "Employees", "id": "Number_of_Employees", "type": "numeric", "format": {"specifier": ","}},
+    {"name": "IT Team", "id": "IT_Team_Size", "type": "numeric", "format": {"specifier": ","}},
 
-    # Prepare columns for the data table - COMPREHENSIVE VIEW (FIXED: removed invalid 'width' property)
-    columns = [
-        {"name": "Sr No", "id": "Sr_No", "type": "numeric"},
-        {"name": "Customer Name", "id": "Customer_Name", "type": "text"},
-        {"name": "Industry", "id": "Industry_Vertical", "type": "text"},
-        {"name": "Cloud Platform", "id": "Cloud_Platforms", "type": "text"},
+    # Infrastructure
+    {"name": "VMs", "id": "Number_of_VMs", "type": "numeric", "format": {"specifier": ","}},
+    {"name": "Physical Servers", "id": "Physical_Servers", "type": "numeric", "format": {"specifier": ","}},
+    {"name": "Databases", "id": "Number_of_Databases", "type": "numeric", "format": {"specifier": ","}},
+    {"name": "Applications", "id": "Number_of_Applications", "type": "numeric", "format": {"specifier": ","}},
 
-        # Financial Metrics
-        {"name": "IT Spend ($M)", "id": "Annual_IT_Spend_M", "type": "numeric", "format": {"specifier": ",.0f"}},
-        {"name": "Cloud Spend ($M)", "id": "Current_Cloud_Spend_M", "type": "numeric", "format": {"specifier": ",.2f"}},
-        {"name": "License Spend ($M)", "id": "Current_License_Spend_M", "type": "numeric", "format": {"specifier": ",.2f"}},
-        {"name": "Cloud Savings ($M)", "id": "Potential_Cloud_Savings_M", "type": "numeric", "format": {"specifier": ",.2f"}},
-        {"name": "License Savings ($M)", "id": "Potential_License_Savings_M", "type": "numeric", "format": {"specifier": ",.2f"}},
-        {"name": "Total Savings ($M)", "id": "Total_Potential_Savings_M", "type": "numeric", "format": {"specifier": ",.2f"}},
+    # Licenses
+    {"name": "MS Licenses", "id": "Microsoft_Licenses", "type": "numeric", "format": {"specifier": ","}},
+    {"name": "SAP Licenses", "id": "SAP_Licenses", "type": "numeric", "format": {"specifier": ","}},
+    {"name": "Oracle Licenses", "id": "Oracle_Licenses", "type": "numeric", "format": {"specifier": ","}},
 
-        # Optimization Percentages
-        {"name": "Cloud Opt %", "id": "Cloud_Optimization_Potential", "type": "numeric"},
-        {"name": "ELO Opt %", "id": "ELO_Optimization_Potential", "type": "numeric"},
-        {"name": "Total Opt %", "id": "Total_Optimization_Potential", "type": "numeric"},
+    # Cloud Resources
+    {"name": "Azure VMs", "id": "Azure_VMs", "type": "numeric", "format": {"specifier": ","}},
+    {"name": "AWS EC2", "id": "AWS_EC2_Instances", "type": "numeric", "format": {"specifier": ","}},
+    {"name": "GCP VMs", "id": "GCP_VMs", "type": "numeric", "format": {"specifier": ","}},
 
-        # Organization Metrics
-        {"name": "Employees", "id": "Number_of_Employees", "type": "numeric", "format": {"specifier": ","}},
-        {"name": "IT Team", "id": "IT_Team_Size", "type": "numeric", "format": {"specifier": ","}},
+    # ROI
+    {"name": "Monthly Savings ($K)", "id": "Monthly_Savings_K", "type": "numeric", "format": {"specifier": ",.1f"}},
+    {"name": "ROI Months", "id": "ROI_Payback_Months", "type": "numeric", "format": {"specifier": ".1f"}},
 
-        # Infrastructure
-        {"name": "VMs", "id": "Number_of_VMs", "type": "numeric", "format": {"specifier": ","}},
-        {"name": "Physical Servers", "id": "Physical_Servers", "type": "numeric", "format": {"specifier": ","}},
-        {"name": "Databases", "id": "Number_of_Databases", "type": "numeric", "format": {"specifier": ","}},
-        {"name": "Applications", "id": "Number_of_Applications", "type": "numeric", "format": {"specifier": ","}},
+    # Contact & Engagement
+    {"name": "Decision Maker", "id": "Decision_Maker", "type": "text"},
+    {"name": "Phone", "id": "Phone", "type": "text"},
+    {"name": "Email", "id": "Email", "type": "text"},
+    {"name": "Engagement Score", "id": "Engagement_Score", "type": "numeric"},
+    {"name": "Last Contact (days)", "id": "Last_Contact_Days_Ago", "type": "numeric"},
+]
 
-        # Licenses
-        {"name": "MS Licenses", "id": "Microsoft_Licenses", "type": "numeric", "format": {"specifier": ","}},
-        {"name": "SAP Licenses", "id": "SAP_Licenses", "type": "numeric", "format": {"specifier": ","}},
-        {"name": "Oracle Licenses", "id": "Oracle_Licenses", "type": "numeric", "format": {"specifier": ","}},
+TABLE_PAGE_SIZE = 20
 
-        # Cloud Resources
-        {"name": "Azure VMs", "id": "Azure_VMs", "type": "numeric", "format": {"specifier": ","}},
-        {"name": "AWS EC2", "id": "AWS_EC2_Instances", "type": "numeric", "format": {"specifier": ","}},
-        {"name": "GCP VMs", "id": "GCP_VMs", "type": "numeric", "format": {"specifier": ","}},
+# Free-text columns that can overflow their cell and get per-cell tooltips
+TOOLTIP_COLUMNS = ['Customer_Name', 'Industry_Vertical', 'Cloud_Platforms', 'Decision_Maker', 'Email']
 
-        # ROI
-        {"name": "Monthly Savings ($K)", "id": "Monthly_Savings_K", "type": "numeric", "format": {"specifier": ",.1f"}},
-        {"name": "ROI Months", "id": "ROI_Payback_Months", "type": "numeric", "format": {"specifier": ".1f"}},
+# Every other column gets a single column-level (header) tooltip
+COLUMN_TOOLTIPS = {
+    column['id']: {'value': f"{column['name']} (`{column['id']}`)", 'type': 'markdown', 'use_with': 'header'}
+    for column in TABLE_COLUMNS
+    if column['id'] not in TOOLTIP_COLUMNS
+}
 
-        # Contact & Engagement
-        {"name": "Decision Maker", "id": "Decision_Maker", "type": "text"},
-        {"name": "Phone", "id": "Phone", "type": "text"},
-        {"name": "Email", "id": "Email", "type": "text"},
-        {"name": "Engagement Score", "id": "Engagement_Score", "type": "numeric"},
-        {"name": "Last Contact (days)", "id": "Last_Contact_Days_Ago", "type": "numeric"},
+def create_table_page(page_df):
+    """Records and cell tooltips for the rows of one table page
+
+    Tooltips are generated only for the visible rows and only for TOOLTIP_COLUMNS.
+    """
+    records = to_records(page_df, [column['id'] for column in TABLE_COLUMNS])
+    tooltip_data = [
+        {
+            column: {'value': str(row[column]), 'type': 'markdown'}
+            for column in TOOLTIP_COLUMNS
+            if not pd.isna(row.get(column)) and row.get(column) != ''
+        } for row in records
     ]
+    return records, tooltip_data
+
+def lookup_options(df, matches, search_value):
+    """Typeahead options for ``NameIndex.lookup`` matches, valued by Sr_No
+
+    Each option carries ``search`` set to the typed text so the dropdown's own
+    substring filter keeps fuzzy matches visible. Customers sharing a label
+    (duplicate names) are told apart by their Sr_No.
+    """
+    options = []
+    for row, field, value, _ in matches:
+        customer = df.iloc[row]
+        label = str(customer['Customer_Name'])
+        if field != 'Customer_Name':
+            label = f"{label} - {value}"
+        options.append({'label': label, 'value': int(customer['Sr_No']), 'search': search_value})
+    labels = Counter(option['label'] for option in options)
+    for option in options:
+        if labels[option['label']] > 1:
+            option['label'] = f"{option['label']} (#{option['value']})"
+    return options
+
+def create_customer_details_layout(df):
+    """Create the customer details page with interactive table
+
+    The table is paged, sorted and filtered server-side (``custom`` actions);
+    rows for the visible page are supplied by the customer-table callback.
+    """
 
     layout = dbc.Container(
         [
@@ -75,20 +128,91 @@ def create_customer_details_layout(df):
                 className="mb-4"
             ),
 
-            # Export button
+            # Export controls - the button starts an export job; the file is offered once written
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id='export-format',
+                            options=[
+                                {'label': 'CSV', 'value': 'csv'},
+                                {'label': 'CSV (gzip)', 'value': 'csv.gz'},
+                                {'label': 'Parquet', 'value': 'parquet'},
+                            ],
+                            value='csv',
+                            clearable=False,
+                            className="filter-dropdown"
+                        ),
+                        md=2, sm=4, xs=12, className="mb-3"
+                    ),
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id='export-columns',
+                            options=[{'label': col, 'value': col} for col in source_columns(df)],
+                            value=[],
+                            multi=True,
+                            placeholder="All columns",
+                            className="filter-dropdown"
+                        ),
+                        md=8, sm=8, xs=12, className="mb-3"
+                    ),
+                    dbc.Col(
+                        dbc.Button(
+                            [html.I(className="bi bi-download me-2"), "Export"],
+                            id="export-btn",
+                            color="primary",
+                            size="sm",
+                            className="w-100"
+                        ),
+                        md=2, sm=12, xs=12, className="mb-3"
+                    ),
+                ],
+                className="align-items-center"
+            ),
+
+            # Export job progress (shown while running) and the finished file's link
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.Div(
+                            dbc.Progress(id="export-progress", value=0, striped=True, animated=True),
+                            id="export-progress-container",
+                            style={'display': 'none'}
+                        ),
+                        md=10, sm=8, xs=12, className="mb-3"
+                    ),
+                    dbc.Col(
+                        dbc.Button(
+                            "Cancel",
+                            id="export-cancel-btn",
+                            color="secondary",
+                            outline=True,
+                            size="sm",
+                            className="w-100",
+                            style={'display': 'none'}
+                        ),
+                        md=2, sm=4, xs=12, className="mb-3"
+                    ),
+                    dbc.Col(html.Div(id="export-status"), width=12),
+                ],
+                className="align-items-center"
+            ),
+
+            # Customer lookup - fuzzy typeahead over names; picking one opens its detail card
             dbc.Row(
                 dbc.Col(
-                    dbc.Button(
-                        [html.I(className="bi bi-download me-2"), "Export to CSV"],
-                        id="export-csv-btn",
-                        color="primary",
-                        size="sm",
-                        className="mb-3"
+                    dcc.Dropdown(
+                        id='customer-lookup',
+                        options=[],
+                        searchable=True,
+                        clearable=True,
+                        placeholder="Find a customer by name...",
+                        className="filter-dropdown"
                     ),
                     width=12
                 ),
+                className="mb-3"
             ),
-            dcc.Download(id="download-csv"),
 
             # Data Table
             dbc.Row(
@@ -96,15 +220,23 @@ def create_customer_details_layout(df):
                     dbc.Card(
                         dbc.CardBody(
                             [
+                                html.P(
+                                    f"{len(df):,} customers",
+                                    id='customer-table-summary',
+                                    className="text-muted small mb-2"
+                                ),
                                 dash_table.DataTable(
                                     id='customer-table',
-                                    columns=columns,
-                                    data=df.to_dict('records'),
-                                    page_size=20,
-                                    page_action='native',
-                                    sort_action='native',
+                                    columns=TABLE_COLUMNS,
+                                    data=[],
+                                    page_current=0,
+                                    page_size=TABLE_PAGE_SIZE,
+                                    page_action='custom',
+                                    sort_action='custom',
                                     sort_mode='multi',
-                                    filter_action='native',
+                                    sort_by=[],
+                                    filter_action='custom',
+                                    filter_query='',
                                     style_table={'overflowX': 'auto'},
                                     style_cell={
                                         'textAlign': 'left',
@@ -188,12 +320,8 @@ def create_customer_details_layout(df):
                                         'backgroundColor': '#f1f3f5',
                                         'fontWeight': 'normal',
                                     },
-                                    tooltip_data=[
-                                        {
-                                            column: {'value': str(value), 'type': 'markdown'}
-                                            for column, value in row.items()
-                                        } for row in df.to_dict('records')
-                                    ],
+                                    tooltip=COLUMN_TOOLTIPS,
+                                    tooltip_data=[],
                                     tooltip_duration=None,
                                 ),
                             ]
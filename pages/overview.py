@@ -3,9 +3,11 @@ from dash import html, dcc
 import pandas as pd
 from components.charts import *
 from components.demo_notice import create_demo_notice
+from data.cube import AggregateCube
+from data.sampling import format_estimate
 
-def create_kpi_card(title, value, icon, color="primary", subtitle=None):
-    """Create a KPI card component"""
+def create_kpi_card(title, value, icon, color="primary", subtitle=None, value_id=None):
+    """Create a KPI card component (``value_id`` lets callbacks update the value)"""
     return dbc.Card(
         dbc.CardBody(
             [
@@ -20,7 +22,7 @@ def create_kpi_card(title, value, icon, color="primary", subtitle=None):
                         html.Div(
                             [
                                 html.H6(title, className="kpi-title mb-1"),
-                                html.H3(value, className="kpi-value mb-0"),
+                                html.H3(value, id=value_id, className="kpi-value mb-0") if value_id else html.H3(value, className="kpi-value mb-0"),
                                 html.P(subtitle, className="kpi-subtitle mt-1 mb-0") if subtitle else None,
                             ],
                             className="kpi-content"
@@ -33,33 +35,89 @@ def create_kpi_card(title, value, icon, color="primary", subtitle=None):
         className="kpi-card shadow-sm mb-3",
     )
 
-def create_overview_layout(df):
-    """Create the overview dashboard layout"""
+def overview_kpis(summary):
+    """KPI card values keyed by component id (with 95% margins for a sample estimate)"""
+    total_customers = summary.count()
+    if total_customers == 0:
+        return {
+            'kpi-total-customers': "0",
+            'kpi-avg-opt-potential': "-",
+            'kpi-total-cloud-opt': "-",
+            'kpi-total-elo-opt': "-",
+        }
+    values = {
+        'kpi-total-customers': f"{total_customers}",
+        'kpi-avg-opt-potential': f"{summary.mean('Total_Optimization_Potential'):.1f}%",
+        'kpi-total-cloud-opt': f"{summary.sum('Cloud_Optimization_Potential'):.0f}%",
+        'kpi-total-elo-opt': f"{summary.sum('ELO_Optimization_Potential'):.0f}%",
+    }
+    if getattr(summary, 'approximate', False):
+        margins = {
+            'kpi-total-customers': (summary.count_margin(), '.0f', ''),
+            'kpi-avg-opt-potential': (summary.mean_margin('Total_Optimization_Potential'), '.1f', '%'),
+            'kpi-total-cloud-opt': (summary.sum_margin('Cloud_Optimization_Potential'), '.0f', '%'),
+            'kpi-total-elo-opt': (summary.sum_margin('ELO_Optimization_Potential'), '.0f', '%'),
+        }
+        values = {key: format_estimate(value, *margins[key]) for key, value in values.items()}
+    return values
 
-    # Calculate KPIs
-    total_customers = len(df)
-    avg_opt_potential = df['Total_Optimization_Potential'].mean()
-    total_cloud_opt = df['Cloud_Optimization_Potential'].sum()
-    total_elo_opt = df['ELO_Optimization_Potential'].sum()
-
-    # Industry distribution
-    industry_counts = df['Industry_Vertical'].value_counts().reset_index()
+def industry_distribution_figure(df, summary):
+    """Top 10 industries by customer count"""
+    industry_counts = summary.value_counts('industry').reset_index()
     industry_counts.columns = ['Industry', 'Count']
+    figure = create_bar_chart(industry_counts.head(10), 'Industry', 'Count', '', COLORS['primary'])
+    if getattr(summary, 'approximate', False) and figure['data']:
+        # 95% error bars on the estimated counts
+        margins = summary.value_counts_margin('industry').head(10)
+        figure['data'][0]['error_y'] = {'type': 'data', 'array': margins.round(1).tolist(), 'visible': True}
+    return figure
 
-    # Cloud platform distribution
-    cloud_counts = df['Cloud_Platforms'].value_counts().reset_index()
+def cloud_distribution_figure(df, summary):
+    """Cloud platform distribution"""
+    cloud_counts = summary.value_counts('cloud').reset_index()
     cloud_counts.columns = ['Platform', 'Count']
+    return create_pie_chart(cloud_counts, 'Platform', 'Count', '')
 
-    # Optimization type distribution
-    opt_type_counts = df['Optimization_Type'].value_counts().reset_index()
+def optimization_type_figure(df, summary):
+    """Optimization type distribution"""
+    opt_type_counts = summary.value_counts('optimization').reset_index()
     opt_type_counts.columns = ['Type', 'Count']
+    return create_pie_chart(opt_type_counts, 'Type', 'Count', '')
 
-    # Optimization potential by industry
-    opt_by_industry = df.groupby('Industry_Vertical').agg({
+def opt_by_industry_figure(df, summary):
+    """Average Cloud & ELO optimization potential by industry"""
+    opt_by_industry = summary.group('industry', {
         'Cloud_Optimization_Potential': 'mean',
         'ELO_Optimization_Potential': 'mean'
     }).round(1).reset_index()
     opt_by_industry.columns = ['Industry', 'Cloud Opt %', 'ELO Opt %']
+    return create_grouped_bar_chart(opt_by_industry.head(8), 'Industry', ['Cloud Opt %', 'ELO Opt %'], '')
+
+def scatter_optimization_figure(df, summary):
+    """Total optimization potential per customer, colored by industry"""
+    return create_scatter_chart(df, 'Sr_No', 'Total_Optimization_Potential', 'Industry_Vertical', '')
+
+# Graph id -> figure builder; filter changes re-run only these and patch the figures
+OVERVIEW_FIGURES = {
+    'chart-industry-distribution': industry_distribution_figure,
+    'chart-cloud-distribution': cloud_distribution_figure,
+    'chart-optimization-type': optimization_type_figure,
+    'chart-opt-by-industry': opt_by_industry_figure,
+    'chart-scatter-optimization': scatter_optimization_figure,
+}
+
+def create_overview_layout(df, summary=None):
+    """Create the overview dashboard layout
+
+    KPIs and distributions are rolled up from ``summary`` (a CubeSlice for the
+    current filter); ``df`` holds the filtered rows for customer-level charts.
+    Later filter changes update the KPI values and graph figures in place.
+    """
+    if summary is None:
+        summary = AggregateCube.from_frame(df).slice()
+
+    kpis = overview_kpis(summary)
+    figures = {graph_id: build(df, summary) for graph_id, build in OVERVIEW_FIGURES.items()}
 
     layout = dbc.Container(
         [
@@ -84,40 +142,44 @@ def create_overview_layout(df):
                     dbc.Col(
                         create_kpi_card(
                             "Total Customers",
-                            f"{total_customers}",
+                            kpis['kpi-total-customers'],
                             "bi-people-fill",
                             "primary",
-                            "Active in database"
+                            "Active in database",
+                            value_id='kpi-total-customers'
                         ),
                         xs=12, sm=6, lg=3
                     ),
                     dbc.Col(
                         create_kpi_card(
                             "Avg Optimization Potential",
-                            f"{avg_opt_potential:.1f}%",
+                            kpis['kpi-avg-opt-potential'],
                             "bi-graph-up-arrow",
                             "success",
-                            "Combined Cloud + ELO"
+                            "Combined Cloud + ELO",
+                            value_id='kpi-avg-opt-potential'
                         ),
                         xs=12, sm=6, lg=3
                     ),
                     dbc.Col(
                         create_kpi_card(
                             "Total Cloud Potential",
-                            f"{total_cloud_opt:.0f}%",
+                            kpis['kpi-total-cloud-opt'],
                             "bi-cloud-arrow-up",
                             "info",
-                            "Across all customers"
+                            "Across all customers",
+                            value_id='kpi-total-cloud-opt'
                         ),
                         xs=12, sm=6, lg=3
                     ),
                     dbc.Col(
                         create_kpi_card(
                             "Total ELO Potential",
-                            f"{total_elo_opt:.0f}%",
+                            kpis['kpi-total-elo-opt'],
                             "bi-file-earmark-text",
                             "warning",
-                            "License optimization"
+                            "License optimization",
+                            value_id='kpi-total-elo-opt'
                         ),
                         xs=12, sm=6, lg=3
                     ),
@@ -138,13 +200,7 @@ def create_overview_layout(df):
                                 html.H5("Top 10 Industries by Customer Count", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-industry-distribution',
-                                    figure=create_bar_chart(
-                                        industry_counts.head(10),
-                                        'Industry',
-                                        'Count',
-                                        '',  # Empty title since we have card title
-                                        COLORS['primary']
-                                    ),
+                                    figure=figures['chart-industry-distribution'],
                                     config={'displayModeBar': False},
                                     style={'height': '580px'}
                                 )
@@ -166,12 +222,7 @@ def create_overview_layout(df):
                                 html.H5("Cloud Platform Usage Across Customers", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-cloud-distribution',
-                                    figure=create_pie_chart(
-                                        cloud_counts,
-                                        'Platform',
-                                        'Count',
-                                        ''  # Empty title since we have card title
-                                    ),
+                                    figure=figures['chart-cloud-distribution'],
                                     config={'displayModeBar': False},
                                     style={'height': '580px'}
                                 )
@@ -193,12 +244,7 @@ def create_overview_layout(df):
                                 html.H5("Cloud FinOps vs ELO Distribution", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-optimization-type',
-                                    figure=create_pie_chart(
-                                        opt_type_counts,
-                                        'Type',
-                                        'Count',
-                                        ''  # Empty title since we have card title
-                                    ),
+                                    figure=figures['chart-optimization-type'],
                                     config={'displayModeBar': False},
                                     style={'height': '580px'}
                                 )
@@ -220,12 +266,7 @@ def create_overview_layout(df):
                                 html.H5("Average Cloud & ELO Optimization Potential", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-opt-by-industry',
-                                    figure=create_grouped_bar_chart(
-                                        opt_by_industry.head(8),
-                                        'Industry',
-                                        ['Cloud Opt %', 'ELO Opt %'],
-                                        ''  # Empty title since we have card title
-                                    ),
+                                    figure=figures['chart-opt-by-industry'],
                                     config={'displayModeBar': False},
                                     style={'height': '680px'}
                                 )
@@ -247,13 +288,7 @@ def create_overview_layout(df):
                                 html.H5("Total Optimization Potential by Customer (Color = Industry)", className="chart-title text-center mb-3"),
                                 dcc.Graph(
                                     id='chart-scatter-optimization',
-                                    figure=create_scatter_chart(
-                                        df,
-                                        'Sr_No',
-                                        'Total_Optimization_Potential',
-                                        'Industry_Vertical',
-                                        ''  # Empty title since we have card title
-                                    ),
+                                    figure=figures['chart-scatter-optimization'],
                                     config={'displayModeBar': False},
                                     style={'height': '630px'}
                                 )
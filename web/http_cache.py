@@ -0,0 +1,123 @@
+import gzip
+import importlib.util
+from flask import request
+
+# Fingerprinted resources never change under the same URL
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Cacheable, but the client must revalidate (ETag / Last-Modified) before reuse
+REVALIDATE = 'no-cache'
+# Per-request data (callback responses, exports, metrics)
+NO_STORE = 'no-store'
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/html',
+    'text/plain',
+}
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def brotli_available():
+    return importlib.util.find_spec('brotli') is not None
+
+def _accepted_encoding(accept_encoding, use_brotli):
+    """Preferred supported content coding from an Accept-Encoding header"""
+    offered = {}
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            offered[token.lower()] = quality
+    if use_brotli and offered.get('br', 0) > 0:
+        return 'br'
+    if offered.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+def _compress(response, encoding):
+    body = response.get_data()
+    if encoding == 'br':
+        import brotli
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+
+def init_http_caching(app):
+    """Install the response caching and compression policy on a Dash app's server
+
+    - ``_dash-component-suites`` files with a build fingerprint and assets
+      requested with Dash's ``?m=<mtime>`` cache buster: cached for a year as
+      immutable. Unfingerprinted ones: ETag revalidation.
+    - ``_dash-layout`` / ``_dash-dependencies``: ETag from the body, answered
+      with 304 Not Modified when the client's copy is current.
+    - Callback responses and other dynamic routes: ``no-store``.
+    - JSON, JS, CSS and HTML bodies over ``COMPRESS_MIN_BYTES`` are gzip or
+      brotli compressed (brotli only when the ``brotli`` package is installed).
+    """
+    server = app.server
+    prefix = app.config.routes_pathname_prefix
+    assets_prefix = prefix + app.config.assets_url_path.strip('/') + '/'
+    revalidated = {prefix + '_dash-layout', prefix + '_dash-dependencies'}
+    use_brotli = brotli_available()
+
+    def response_encoding(response):
+        """Content coding to apply to a response, or None to send it as is"""
+        if (
+            response.status_code != 200
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return None
+        response.vary.add('Accept-Encoding')
+        if (response.calculate_content_length() or 0) < COMPRESS_MIN_BYTES:
+            return None
+        return _accepted_encoding(request.headers.get('Accept-Encoding'), use_brotli)
+
+    @server.after_request
+    def apply_cache_policy(response):
+        path = request.path
+        encoding = response_encoding(response)
+
+        if path.startswith(prefix + '_dash-component-suites/'):
+            fingerprinted = response.cache_control.max_age is not None
+            response.headers['Cache-Control'] = IMMUTABLE if fingerprinted else REVALIDATE
+            if not fingerprinted:
+                # Dash tags the identity body; each content coding needs its own
+                # tag, which Dash does not recognise, so revalidate it here
+                response.vary.add('Accept-Encoding')
+                etag, _ = response.get_etag()
+                if encoding and etag:
+                    response.set_etag(f'{etag}-{encoding}')
+                    response.make_conditional(request)
+        elif path.startswith(assets_prefix):
+            response.headers['Cache-Control'] = IMMUTABLE if request.args.get('m') else REVALIDATE
+        elif path in revalidated:
+            response.headers['Cache-Control'] = REVALIDATE
+            if response.status_code == 200:
+                response.add_etag()
+                if encoding:
+                    # Each content coding is a separate representation with its own tag
+                    etag, _ = response.get_etag()
+                    response.set_etag(f'{etag}-{encoding}')
+                response.make_conditional(request)
+        elif request.method == 'GET' and response.mimetype == 'text/html':
+            # Index page: small, references the fingerprinted bundles
+            response.headers['Cache-Control'] = REVALIDATE
+        else:
+            response.headers['Cache-Control'] = NO_STORE
+
+        if encoding and response.status_code == 200:
+            _compress(response, encoding)
+        return response
@@ -0,0 +1,108 @@
+import contextlib
+import fcntl
+import functools
+import importlib.util
+import os
+import time
+
+JOB_DIR = os.path.join('data', '.jobs')
+
+# Packages Dash's DiskcacheManager needs (the ``dash[diskcache]`` extra)
+BACKGROUND_PACKAGES = ('diskcache', 'multiprocess', 'psutil')
+
+def background_available():
+    """Background callbacks need dash[diskcache]; without it heavy callbacks run in-request"""
+    return all(importlib.util.find_spec(name) is not None for name in BACKGROUND_PACKAGES)
+
+def create_job_manager(directory=JOB_DIR, expire=3600):
+    """DiskcacheManager keeping job results under ``directory`` (None when unavailable)
+
+    Every gunicorn worker opens the same cache, so a job started through one
+    worker can be polled and cancelled through any other. Each job runs in a
+    process forked from the worker and shares its dataset pages.
+    """
+    if not background_available():
+        return None
+    import diskcache
+    from dash import DiskcacheManager
+
+    os.makedirs(directory, exist_ok=True)
+    return DiskcacheManager(diskcache.Cache(os.path.join(directory, 'cache')), expire=expire)
+
+class JobSlots:
+    """Cross-process limit on how many jobs run at once
+
+    A slot is an exclusive ``flock`` on ``slot-<n>.lock`` in ``directory``.
+    The kernel drops the lock when its holder exits, so a job process killed
+    on cancellation never leaks its slot.
+    """
+
+    def __init__(self, directory, limit, poll_interval=0.2):
+        self.directory = os.path.join(directory, 'slots')
+        self.limit = max(1, int(limit))
+        self.poll_interval = poll_interval
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _try_acquire(self):
+        for slot in range(self.limit):
+            fd = os.open(os.path.join(self.directory, f'slot-{slot}.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            return fd
+        return None
+
+    @contextlib.contextmanager
+    def acquire(self, on_wait=None):
+        """Hold a slot for the block, waiting for one to free up; ``on_wait()`` runs once if queued"""
+        fd = self._try_acquire()
+        if fd is None and on_wait is not None:
+            on_wait()
+        while fd is None:
+            time.sleep(self.poll_interval)
+            fd = self._try_acquire()
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+def _ignore_progress(*_):
+    pass
+
+def job_callback(app, manager, *dependencies, progress=None, running=None, cancel=None, interval=500,
+                 metrics=None, **kwargs):
+    """``app.callback`` for a heavy callback: a background job when ``manager`` is set
+
+    The decorated function takes ``set_progress`` as its first argument. With
+    a manager, the callback runs in a job process and reports progress,
+    ``running`` and ``cancel`` behave as in Dash, and a new trigger cancels
+    the previous job of the same callback; with ``metrics`` (a
+    CallbackMetrics) each job records its own duration and phases. Without a
+    manager it runs in the request and ``set_progress`` does nothing.
+    """
+    def decorator(func):
+        if manager is not None:
+            if progress is None:
+                # Dash only passes set_progress to callbacks that declare progress outputs
+                @functools.wraps(func)
+                def without_progress(*args):
+                    return func(_ignore_progress, *args)
+                target = without_progress
+            else:
+                target = func
+            if metrics is not None:
+                outputs = dependencies[0] if isinstance(dependencies[0], (list, tuple)) else [dependencies[0]]
+                target = metrics.instrument_job(target, f'{outputs[0].component_id}.{outputs[0].component_property}')
+            return app.callback(
+                *dependencies, background=True, manager=manager, progress=progress,
+                running=running, cancel=cancel, interval=interval, **kwargs,
+            )(target)
+
+        @functools.wraps(func)
+        def in_request(*args):
+            return func(_ignore_progress, *args)
+        return app.callback(*dependencies, **kwargs)(in_request)
+    return decorator